@@ -1,58 +1,124 @@
    # app.py - Flask web application for NFC Attendance Pro
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
-from flask_socketio import SocketIO, emit
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response, stream_with_context
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
+from werkzeug.utils import secure_filename
 from threading import Thread
 import json
 import os
 from datetime import datetime
 
 from config import Config
-from database import db
+from database import db, roster_cache
 from models import session_mgr, voice_feedback
+from models.voice import voice_queue, warm_voice_cache
+from models.session_lists import SessionLists
 from utils.webcam_capture import get_webcam
+from utils.jobs import JobQueue
+from utils.helpers import format_time
+from utils.emitter import Emitter
+from utils.report_pdf import generate_session_pdf
+from utils.photo_index import get_photo_index
+from utils.export_stream import (csv_chunks, xlsx_chunks, CSV_MIMETYPE, XLSX_MIMETYPE,
+                                 STUDENT_EXPORT_HEADER, ATTENDANCE_EXPORT_HEADER)
+from nfc.uid_reader import uid_reader
+from nfc.broker import reader_broker
+from nfc.registry import reader_registry
+from nfc.connection import reader_connections
 # Try to use Broadcom scanner first, fallback to regular scanner
 try:
-    from nfc.broadcom_scanner import nfc_scan_loop_web
+    from nfc.broadcom_scanner import nfc_scan_loop_web, run_reader_owner
     print("[INFO] Using Broadcom-compatible NFC scanner")
 except ImportError:
-    from nfc.broadcom_scanner  import nfc_scan_loop_web
+    from nfc.broadcom_scanner  import nfc_scan_loop_web, run_reader_owner
     print("[INFO] Using standard NFC scanner")
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'nfc-attendance-secret-key-2024'
 socketio = SocketIO(app, cors_allowed_origins="*")
+report_jobs = JobQueue(workers=Config.REPORT_WORKERS)
+
+# Socket.IO rooms: section dashboards only receive their own section's events;
+# clients that have not joined a section stay in the admin (overview) room,
+# which receives everything.
+ADMIN_ROOM = 'admin'
+
+def section_room(section):
+    return f"section:{str(section).strip().upper()}"
+
+def session_room(session_id):
+    return f"session:{session_id}"
+
+def scoped_rooms(section=None):
+    """Rooms for an event about a section, or None to broadcast"""
+    if not section:
+        return None
+    return [section_room(section), ADMIN_ROOM]
 
 class WebNFCHandler:
     def __init__(self, socketio):
         self.socketio = socketio
         self.scanning_thread = None
+        self.scan_pipeline = None
+        self.scan_debouncer = None
         self.last_status = { 'message': 'System Ready', 'type': 'info' }
         self.last_attendance = None
+        # Drops repeated statuses, rate-limits them and coalesces dashboard bursts
+        self.emitter = Emitter(lambda event, data, room: self.socketio.emit(event, data, to=room),
+                               spawn=self.socketio.start_background_task)
     
-    def update_status(self, msg, success=False, warning=False, error=False):
+    def update_status(self, msg, success=False, warning=False, error=False, section=None):
         status_type = 'success' if success else 'warning' if warning else 'error' if error else 'info'
         self.last_status = { 'message': msg, 'type': status_type }
-        self.socketio.emit('status_update', {
+        self.emitter.emit('status_update', {
             'message': msg,
             'type': status_type
-        })
+        }, room=scoped_rooms(section), min_interval=Config.SOCKET_STATUS_INTERVAL)
     
-    def update_dashboard(self):
+    def _dashboard_stats(self):
         total, present = db.get_today_stats()
         absent = total - present
-        self.socketio.emit('dashboard_update', {
+        return {
             'total': total,
             'present': present,
             'absent': absent
-        })
+        }
+    
+    def update_dashboard(self):
+        # Stats are read once per burst, when the window closes
+        self.emitter.emit_coalesced('dashboard_update', self._dashboard_stats,
+                                    Config.SOCKET_DASHBOARD_WINDOW, room=ADMIN_ROOM)
     
-    def add_recent_attendance(self, name):
-        time_str = datetime.now().strftime("%H:%M:%S")
+    def add_recent_attendance(self, name, uid=None, section=None, time_str=None):
+        # time_str is what log_attendance stored, so the live lists match a resync
+        time_str = time_str or format_time()
         self.last_attendance = { 'name': name, 'time': time_str }
         self.socketio.emit('new_attendance', {
             'name': name,
             'time': time_str
-        })
+        }, to=scoped_rooms(section))
+        if uid and section:
+            self._emit_lists_change('student_present', section,
+                                    session_lists.mark_present(section, uid, name, time_str))
+    
+    def remove_attendance(self, uid, section):
+        self._emit_lists_change('student_removed', section, session_lists.mark_absent(section, uid))
+    
+    def _emit_lists_change(self, event, section, delta):
+        # A section reloaded by mark_* comes back as full lists, not a delta
+        if delta:
+            if delta.get('reset'):
+                event = 'session_lists_reset'
+            self.socketio.emit(event, delta, to=scoped_rooms(section))
+    
+    def reset_session_lists(self, section=None):
+        session_lists.invalidate(section)
+        payload = {'section': section}
+        if section:
+            try:
+                payload.update(session_lists.snapshot(section), reset=True)
+            except Exception as e:
+                print(f"[DEBUG] Could not reload session lists for {section}: {e}")
+        self.socketio.emit('session_lists_reset', payload, to=scoped_rooms(section))
     
     def show_add_student_dialog(self, uid):
         self.socketio.emit('show_student_dialog', {
@@ -60,6 +126,9 @@ class WebNFCHandler:
         })
 
 web_handler = WebNFCHandler(socketio)
+# The broker starts the reader supervisor whenever a session or a
+# /api/scan_uid request needs the readers
+reader_broker.runner = lambda: run_reader_owner(web_handler)
 
 @app.route('/')
 def dashboard():
@@ -238,15 +307,11 @@ def start_class_session():
 
     # Clear today's attendance for fresh session
     print("[DEBUG] Clearing today's attendance for fresh session...")
-    try:
-        import pandas as pd
-        today = (datetime.utcnow() + Config.TIMEZONE_OFFSET).strftime("%Y-%m-%d")
-        df_att = pd.read_excel('data/attendance.xlsx', sheet_name='Attendance', dtype=str)
-        df_att = df_att[df_att['Date'] != today]
-        df_att.to_excel('data/attendance.xlsx', index=False, sheet_name='Attendance')
+    today, cleared = clear_today_attendance()
+    if cleared:
         print(f"[DEBUG] Cleared attendance records for {today}")
-    except Exception as e:
-        print(f"[DEBUG] Could not clear attendance: {e}")
+    else:
+        print(f"[DEBUG] Could not clear attendance")
     
     # Start session with class context
     username = session.get('username')
@@ -260,6 +325,7 @@ def start_class_session():
     
     # Reset session scanned UIDs
     session_mgr.scanned_uids.clear()
+    web_handler.reset_session_lists(section)
     print(f"[DEBUG] Session scanned UIDs cleared")
     
     # Start scanner if needed
@@ -268,43 +334,21 @@ def start_class_session():
     web_handler.scanning_thread = Thread(target=nfc_scan_loop_web, args=(web_handler,), daemon=True)
     web_handler.scanning_thread.start()
     
-    return jsonify({'success': True})
+    return jsonify({'success': True, 'session_id': session_mgr.current_session['id']})
 
 def read_section_excel(section):
     """Read students for section from both roster file AND main database.
     Returns a list of dicts: {name,enroll,roll,subject,section,uid}
     Combines roster file + any students in database for this section.
     """
-    import os
-    import pandas as pd
     roster = []
     uids_seen = set()  # Track UIDs to avoid duplicates
     
-    # First, read from section roster file
-    path = os.path.join('data/sections', f'{section}.xlsx')
-    if os.path.exists(path):
-        try:
-            try:
-                df = pd.read_excel(path, sheet_name=section, dtype=str)
-            except Exception:
-                df = pd.read_excel(path, dtype=str)
-            df = df.fillna('')
-            # Normalize columns
-            col = {c.strip().lower(): c for c in df.columns}
-            for idx in range(len(df)):
-                name = str(df.iloc[idx][col['name']]).strip() if 'name' in col else ''
-                if not name:
-                    continue
-                enroll = str(df.iloc[idx][col['enrollment no']]).strip() if 'enrollment no' in col else ''
-                roll = str(df.iloc[idx][col['roll no']]).strip() if 'roll no' in col else ''
-                subject = str(df.iloc[idx][col['subject']]).strip() if 'subject' in col else ''
-                sec = str(df.iloc[idx][col['section']]).strip() if 'section' in col else section
-                uid = str(df.iloc[idx][col['uid']]).strip().upper() if 'uid' in col else ''
-                if uid:
-                    uids_seen.add(uid)
-                roster.append({'name': name, 'enroll': enroll, 'roll': roll, 'subject': subject, 'section': sec, 'uid': uid})
-        except Exception as e:
-            print(f"[DEBUG] Error reading roster: {e}")
+    # First, the section roster file (parsed once, cached until it changes)
+    for r in roster_cache.get(section).rows:
+        if r['uid']:
+            uids_seen.add(r['uid'])
+        roster.append(dict(r))
     
     # Second, check main database for students in this section that aren't in roster
     try:
@@ -328,6 +372,29 @@ def read_section_excel(section):
     
     return roster
 
+def find_section_student(section, name):
+    """Roster row of a student by name (roster file first, then database)"""
+    student = roster_cache.find_by_name(section, name)
+    if student:
+        return student
+    for r in read_section_excel(section):
+        if r.get('name') == name:
+            return r
+    return None
+
+def load_session_lists(section):
+    """Roster and today's present rows of a section, for SessionLists"""
+    return read_section_excel(section), db.get_present_list_today_by_section(section)
+
+session_lists = SessionLists(load_session_lists)
+
+def clear_today_attendance():
+    """Clear today's attendance; every section's cached lists reload after"""
+    today = db.today()
+    cleared = db.clear_attendance_for_date(today)
+    session_lists.invalidate()
+    return today, cleared
+
 @app.route('/api/remove_attendance', methods=['POST'])
 def remove_attendance():
     """Remove a student from attendance (right to left drag)"""
@@ -346,12 +413,7 @@ def remove_attendance():
             return jsonify({'success': False, 'message': 'Missing section or name'})
         
         # Get the roster to find the student's UID
-        roster = read_section_excel(section)
-        student = None
-        for r in roster:
-            if r.get('name') == name:
-                student = r
-                break
+        student = find_section_student(section, name)
         
         if not student or not student.get('uid'):
             return jsonify({'success': False, 'message': 'Student not found in roster'})
@@ -365,22 +427,15 @@ def remove_attendance():
         
         # Remove attendance records for this UID today
         try:
-            import pandas as pd
-            today = (datetime.utcnow() + Config.TIMEZONE_OFFSET).strftime("%Y-%m-%d")
-            df_att = pd.read_excel('data/attendance.xlsx', sheet_name='Attendance', dtype=str)
-            df_att = df_att.fillna('')
-            
-            # Remove all attendance records for this UID today
-            df_att = df_att[~((df_att['Student UID'].astype(str).str.strip().str.upper() == uid) & 
-                             (df_att['Date'].astype(str).str.strip() == today))]
-            
-            df_att.to_excel('data/attendance.xlsx', index=False, sheet_name='Attendance')
+            if not db.remove_attendance_for_uid(uid, db.today()):
+                return jsonify({'success': False, 'message': 'Could not remove attendance'})
             
             # Remove from session tracking
             session_mgr.scanned_uids.discard(uid)
             
             # Update web handler
             web_handler.update_status(f"❌ {name} removed from attendance", warning=True)
+            web_handler.remove_attendance(uid, section)
             web_handler.update_dashboard()
             
             print(f"[DEBUG] Removed attendance: {name} (UID: {uid})")
@@ -416,12 +471,7 @@ def mark_present_manual():
             return jsonify({'success': False, 'message': 'Missing section or name'})
         
         # Get the roster to find the student's UID
-        roster = read_section_excel(section)
-        student = None
-        for r in roster:
-            if r.get('name') == name:
-                student = r
-                break
+        student = find_section_student(section, name)
         
         if not student or not student.get('uid'):
             return jsonify({'success': False, 'message': 'Student not found in roster'})
@@ -434,12 +484,12 @@ def mark_present_manual():
             return jsonify({'success': False, 'message': 'Already marked present'})
         
         # Log attendance
-        db.log_attendance(uid)
+        time_str = db.log_attendance(uid)
         session_mgr.scanned_uids.add(uid)
         
         # Update web handler
         web_handler.update_status(f"✅ Manual: {name} marked present", success=True)
-        web_handler.add_recent_attendance(name)
+        web_handler.add_recent_attendance(name, uid, section, time_str)
         web_handler.update_dashboard()
         
         print(f"[DEBUG] Manually marked present: {name} (UID: {uid})")
@@ -461,72 +511,22 @@ def api_session_lists():
     if not section:
         return jsonify({'success': False, 'message': 'No section provided'}), 400
 
-    # Read roster directly from Excel
-    roster = read_section_excel(section)
-    total = len(roster)
-
-    # Present UIDs today for this section (from DB attendance)
-    present_uids = db.get_present_uids_today_by_section(section)
-    present_uid_set = set(u.upper() for u in present_uids)
-
-    # Build waiting by excluding UIDs in present
-    waiting = []
-    uid_in_roster = set()
-    for r in roster:
-        uid = (r.get('uid') or '').upper()
-        uid_in_roster.add(uid)
-        if uid and uid in present_uid_set:
-            continue
-        waiting.append({'name': r.get('name'), 'roll_no': r.get('roll')})
-
-    # Present list with times from DB
-    from datetime import datetime as dt
-    import pandas as pd
-    today = (dt.utcnow() + Config.TIMEZONE_OFFSET).strftime("%Y-%m-%d")
-    present_list = []
-    try:
-        with db.lock:
-            # Read attendance file
-            att_df = pd.read_excel(db.attendance_file, sheet_name='Attendance', dtype=str)
-            att_df = att_df.fillna('')
-            
-            # Filter by today's date
-            today_att = att_df[att_df['Date'].astype(str) == today]
-            
-            # Read students file
-            stu_df = pd.read_excel(db.students_file, sheet_name='Students', dtype=str)
-            stu_df = stu_df.fillna('')
-            stu_df.columns = [col.strip().lower() for col in stu_df.columns]
-            
-            # Build map of UIDs to names for this section
-            uid_to_name = {}
-            for _, row in stu_df.iterrows():
-                if str(row.get('section', '')).strip().upper() == section.upper():
-                    uid = str(row.get('nfc uid', '')).strip()
-                    name = str(row.get('name', '')).strip()
-                    if uid and name:
-                        uid_to_name[uid] = name
-            
-            # Build present list
-            for _, row in today_att.iterrows():
-                uid = str(row.get('Student UID', '')).strip()
-                time_val = str(row.get('Time', '')).strip()
-                if uid in uid_to_name:
-                    present_list.append({'name': uid_to_name[uid], 'time': time_val})
-    except Exception as e:
-        print(f"[DEBUG] Error building present_list: {e}")
-        pass
+    # Full lists for initial load / resync; live changes arrive as
+    # student_present / student_removed Socket.IO events
+    if request.args.get('resync'):
+        session_lists.invalidate(section)
+    lists = session_lists.snapshot(section)
 
     # Last scan
     last_scan = web_handler.last_attendance or {}
 
     return jsonify({
         'success': True,
-        'total': total,
-        'present': len(present_list),
-        'absent': total - len(present_list),
-        'waiting': waiting,
-        'present_list': present_list,
+        'total': lists['total'],
+        'present': lists['present'],
+        'absent': lists['absent'],
+        'waiting': lists['waiting'],
+        'present_list': lists['present_list'],
         'last_scan': last_scan,
         'meta': session_mgr.current_session
     })
@@ -544,15 +544,14 @@ def reset_session():
         print("[DEBUG] Resetting session - clearing all attendance...")
         
         # Clear today's attendance
-        import pandas as pd
-        today = (datetime.utcnow() + Config.TIMEZONE_OFFSET).strftime("%Y-%m-%d")
-        df_att = pd.read_excel('data/attendance.xlsx', sheet_name='Attendance', dtype=str)
-        df_att = df_att[df_att['Date'] != today]
-        df_att.to_excel('data/attendance.xlsx', index=False, sheet_name='Attendance')
+        today, cleared = clear_today_attendance()
+        if not cleared:
+            return jsonify({'success': False, 'message': 'Could not clear attendance'})
         print(f"[DEBUG] Cleared all attendance records for {today}")
         
         # Clear scanned UIDs
         session_mgr.scanned_uids.clear()
+        web_handler.reset_session_lists(session_mgr.current_session.get('section'))
         print(f"[DEBUG] Cleared scanned UIDs")
         
         return jsonify({
@@ -598,39 +597,71 @@ def stop_session():
             if r['uid'].upper() in absent_uids:
                 absent_students_data.append((r['name'], r['enroll'], r['roll'], r['section']))
         
-        # Generate PDF
+        # Generate PDF in the background; report_ready fires when it is written
         pdf_filename = f"session_report_{section}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         pdf_path = os.path.join('static/reports', pdf_filename)
         
-        success = generate_session_pdf(
-            session_mgr.current_session,
+        photos = get_photo_index()
+        photo_paths = {s[0]: photos.latest(s[0]) for s in present_students_data}
+        job_id = report_jobs.submit(
+            'session_pdf',
+            generate_session_pdf,
+            dict(session_mgr.current_session),
             present_students_data,
             absent_students_data,
-            pdf_path
+            pdf_path,
+            photo_paths,
+            on_done=report_finished,
+            pdf_file=pdf_filename,
+            session_id=session_mgr.current_session.get('id')
         )
         
         # Reset session
         session_mgr.reset_session()
         
-        if success:
-            return jsonify({
-                'success': True,
-                'message': 'Session stopped and PDF exported',
-                'pdf_file': pdf_filename,
-                'stats': {
-                    'total': len(roster),
-                    'present': len(present_students_data),
-                    'absent': len(absent_students_data)
-                }
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Session stopped but PDF generation failed'
-            })
+        return jsonify({
+            'success': True,
+            'message': 'Session stopped, PDF is being generated',
+            'job_id': job_id,
+            'pdf_file': pdf_filename,
+            'stats': {
+                'total': len(roster),
+                'present': len(present_students_data),
+                'absent': len(absent_students_data)
+            }
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
+def report_finished(job):
+    """Tell clients a session report is ready (or failed)"""
+    success = job['status'] == 'done' and bool(job['result'])
+    if not success:
+        print(f"[ERROR] Report job {job['id']} failed: {job['error'] or 'PDF generation failed'}")
+    session_id = job.get('session_id')
+    socketio.emit('report_ready', {
+        'job_id': job['id'],
+        'success': success,
+        'pdf_file': job.get('pdf_file') if success else None
+    }, to=[session_room(session_id), ADMIN_ROOM] if session_id else None)
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """Status of a background report job."""
+    if 'authenticated' not in session:
+        return jsonify({'success': False, 'message': 'Not authenticated'})
+    job = report_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Unknown job'}), 404
+    done = job['status'] == 'done'
+    return jsonify({
+        'success': True,
+        'job_id': job['id'],
+        'status': 'failed' if done and not job['result'] else job['status'],
+        'pdf_file': job.get('pdf_file') if done and job['result'] else None,
+        'error': job['error']
+    })
+
 @app.route('/api/close_attendance', methods=['POST'])
 def close_attendance():
     if 'authenticated' not in session:
@@ -717,6 +748,7 @@ def add_student():
     success = db.add_student(name, enroll_no, roll_no, section, subject, uid)
     if success:
         session_mgr.scanned_uids.add(uid)
+        web_handler.reset_session_lists(section)
         voice_feedback(f"Student {name} added successfully")
         return jsonify({'success': True, 'message': f'Student {name} registered successfully'})
     else:
@@ -754,8 +786,24 @@ def get_recent_attendance():
 @socketio.on('connect')
 def handle_connect():
     print('Client connected')
+    join_room(ADMIN_ROOM)
     emit('connected', {'status': 'Connected to NFC Attendance System'})
 
+@socketio.on('join_section')
+def handle_join_section(data):
+    """Scope a client to one section (and session) instead of the admin room"""
+    data = data or {}
+    section = str(data.get('section') or '').strip()
+    if not section:
+        return
+    for room in rooms():
+        if room != request.sid:
+            leave_room(room)
+    join_room(section_room(section))
+    if data.get('session_id'):
+        join_room(session_room(data['session_id']))
+    emit('joined_section', {'section': section, 'session_id': data.get('session_id')})
+
 @socketio.on('disconnect')
 def handle_disconnect():
     print('Client disconnected')
@@ -770,60 +818,35 @@ def get_status():
         'stats': { 'total': total, 'present': present, 'absent': absent }
     })
 
+@app.route('/api/scanner_stats')
+def scanner_stats():
+    """Queue depth, drops and latency of the scan and voice pipelines, and socket emit counts."""
+    if 'authenticated' not in session:
+        return jsonify({'success': False, 'message': 'Not authenticated'})
+    pipeline = web_handler.scan_pipeline
+    debouncer = web_handler.scan_debouncer
+    return jsonify({
+        'success': True,
+        'pipeline': pipeline.stats() if pipeline else None,
+        'debounce': debouncer.stats() if debouncer else None,
+        'voice': voice_queue.stats(),
+        'uid_commands': uid_reader.stats(),
+        'broker': reader_broker.stats(),
+        'readers': reader_registry.stats(),
+        'connections': reader_connections.stats(),
+        'emits': web_handler.emitter.stats()
+    })
+
 @app.route('/api/scan_uid')
 def api_scan_uid():
-    """Block briefly and return the next detected card UID."""
+    """Wait for the next card tapped on any reader and return its UID."""
     try:
-        from smartcard.System import readers
-        from smartcard.Exceptions import NoCardException, CardConnectionException
-        import time
-
-        timeout_seconds = 10
-        start = time.time()
-        GET_UIDS = [
-            [0xFF, 0xCA, 0x00, 0x00, 0x00],
-            [0xFF, 0xCA, 0x00, 0x00, 0x04],
-            [0xFF, 0xCA, 0x00, 0x00, 0x07],
-        ]
-
-        while time.time() - start < timeout_seconds:
-            try:
-                rdrs = readers()
-                if not rdrs:
-                    time.sleep(0.3)
-                    continue
-                # Prefer contactless readers
-                cand = [r for r in rdrs if 'contactless' in str(r).lower()]
-                if not cand:
-                    cand = rdrs
-                for r in cand:
-                    try:
-                        conn = r.createConnection()
-                        conn.connect()
-                        for cmd in GET_UIDS:
-                            try:
-                                resp, sw1, sw2 = conn.transmit(cmd)
-                                if sw1 == 0x90 and sw2 == 0x00 and resp:
-                                    uid = ''.join(f"{b:02X}" for b in resp)
-                                    try:
-                                        conn.disconnect()
-                                    except Exception:
-                                        pass
-                                    return jsonify({'success': True, 'uid': uid})
-                            except Exception:
-                                pass
-                        try:
-                            conn.disconnect()
-                        except Exception:
-                            pass
-                    except (NoCardException, CardConnectionException):
-                        pass
-                    except Exception:
-                        pass
-                time.sleep(0.3)
-            except Exception:
-                time.sleep(0.3)
-        return jsonify({'success': False, 'message': 'Timeout: no card scanned in 10s'})
+        timeout_seconds = Config.NFC_SCAN_UID_TIMEOUT
+        # The reader broker owns the readers; this request only awaits a tap
+        uid = reader_broker.wait_for_uid(timeout=timeout_seconds)
+        if uid:
+            return jsonify({'success': True, 'uid': uid})
+        return jsonify({'success': False, 'message': f'Timeout: no card scanned in {timeout_seconds}s'})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
@@ -838,6 +861,7 @@ def available_sections():
 @app.route('/api/create_section_excels', methods=['POST'])
 def create_section_excels():
     ensure_section_excels()
+    roster_cache.start_indexing()
     return jsonify({'success': True})
 
 @app.route('/api/seed_sections', methods=['POST'])
@@ -846,6 +870,7 @@ def api_seed_sections():
         return jsonify({'success': False, 'message': 'Not authenticated'})
     try:
         seed_section_excels()
+        roster_cache.start_indexing()
         # Automatically import all seeded sections
         summary = []
         for sec in ['A2','B2','C2','D2']:
@@ -879,50 +904,24 @@ def import_section_from_excel(section, replace=False):
 
     df = df.fillna('')
 
-    added = 0
-    skipped = 0
-
     # If replace, remove existing students (and their attendance) for this section first
     if replace:
-        try:
-            with db.lock:
-                # Get existing UIDs in section from students file
-                stu_df = pd.read_excel(db.students_file, sheet_name='Students', dtype=str)
-                stu_df = stu_df.fillna('')
-                uids_to_remove = set()
-                for _, row in stu_df.iterrows():
-                    if str(row.get('Section', '')).strip().upper() == section.upper():
-                        uid = str(row.get('NFC UID', '')).strip()
-                        if uid:
-                            uids_to_remove.add(uid)
-                
-                # Remove attendance records for these UIDs
-                if uids_to_remove:
-                    att_df = pd.read_excel(db.attendance_file, sheet_name='Attendance', dtype=str)
-                    att_df = att_df.fillna('')
-                    att_df_filtered = att_df[~att_df['Student UID'].isin(uids_to_remove)]
-                    att_df_filtered.to_excel(db.attendance_file, index=False, sheet_name='Attendance')
-                
-                # Remove students from this section
-                stu_df_filtered = stu_df[stu_df['Section'].astype(str).str.strip().str.upper() != section.upper()]
-                stu_df_filtered.to_excel(db.students_file, index=False, sheet_name='Students')
-        except Exception as e:
-            print(f"[DEBUG] Replace failed: {e}")
-            pass
-
-    for _, row in df.iterrows():
-        name = str(row.get('Name') or '').strip()
-        enroll = str(row.get('Enrollment No') or '').strip()
-        roll = str(row.get('Roll No') or '').strip()
-        subj = str(row.get('Subject') or '').strip()
-        sec = str(row.get('Section') or '').strip() or section
-        uid = str(row.get('UID') or '').strip().upper()
-        if not name or not uid:
-            skipped += 1
-            continue
-        ok = db.add_student(name, enroll, roll, sec, subj, uid)
-        if ok:
-            added += 1
+        if not db.remove_section(section):
+            print(f"[DEBUG] Replace failed for section {section}")
+
+    def column(name):
+        return df[name].astype(str).str.strip() if name in df.columns else [''] * len(df)
+
+    sections = [sec or section for sec in column('Section')]
+    students = list(zip(column('Name'), column('Enrollment No'), column('Roll No'),
+                        sections, column('Subject'), column('UID')))
+
+    # One validated, de-duplicated write for the whole sheet
+    outcomes = db.add_students_bulk(students)
+    added = outcomes.count('added')
+    skipped = outcomes.count('invalid')
+    roster_cache.refresh(section)
+    session_lists.invalidate(section)
     return True, added, skipped, None
 
 @app.route('/api/import_section', methods=['POST'])
@@ -980,6 +979,48 @@ def export_attendance():
         'filename': filename if success else None
     })
 
+@app.route('/api/export_stream')
+def export_stream():
+    """Download students or attendance as CSV/XLSX, streamed in chunks.
+
+    Query: kind=attendance|students, format=csv|xlsx, section, and for
+    attendance an inclusive from/to date range (YYYY-MM-DD).
+    """
+    if 'authenticated' not in session:
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+    
+    kind = request.args.get('kind', 'attendance')
+    fmt = request.args.get('format', 'csv').lower()
+    section = (request.args.get('section') or '').strip() or None
+    date_from = request.args.get('from') or None
+    date_to = request.args.get('to') or None
+    if kind not in ('attendance', 'students') or fmt not in ('csv', 'xlsx'):
+        return jsonify({'success': False, 'message': 'Invalid kind or format'}), 400
+    try:
+        for d in (date_from, date_to):
+            if d:
+                datetime.strptime(d, '%Y-%m-%d')
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Dates must be YYYY-MM-DD'}), 400
+    
+    if kind == 'students':
+        header = STUDENT_EXPORT_HEADER
+        chunks = db.iter_students_export(section)
+    else:
+        header = ATTENDANCE_EXPORT_HEADER
+        chunks = db.iter_attendance_export(date_from, date_to, section)
+    
+    parts = [kind, section, date_from, date_to]
+    filename = secure_filename('_'.join(p.replace('-', '') for p in parts if p) + f'.{fmt}')
+    if fmt == 'xlsx':
+        body = xlsx_chunks(header, chunks, kind.capitalize())
+        mimetype = XLSX_MIMETYPE
+    else:
+        body = csv_chunks(header, chunks)
+        mimetype = CSV_MIMETYPE
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
 @app.route('/api/list_reports')
 def list_reports():
     """List all generated reports in static/reports directory."""
@@ -1224,160 +1265,9 @@ def seed_section_excels():
 
     return True
 
-def generate_session_pdf(session_data, present_students, absent_students, filename):
-    """Generate a professional PDF report with student photos."""
-    try:
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
-        from reportlab.lib import colors
-        from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-        from datetime import datetime
-        
-        doc = SimpleDocTemplate(filename, pagesize=letter,
-                               rightMargin=0.5*inch, leftMargin=0.5*inch,
-                               topMargin=0.5*inch, bottomMargin=0.5*inch)
-        
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#0066cc'),
-            spaceAfter=6,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        elements.append(Paragraph('NFC ATTENDANCE SYSTEM - SESSION REPORT', title_style))
-        elements.append(Spacer(1, 0.2*inch))
-        
-        # Session Info
-        info_style = ParagraphStyle(
-            'InfoStyle',
-            parent=styles['Normal'],
-            fontSize=11,
-            alignment=TA_LEFT
-        )
-        
-        session_info = f"""<b>Session Details:</b><br/>
-        <b>Section:</b> {session_data.get('section', 'N/A')}<br/>
-        <b>Subject:</b> {session_data.get('subject', 'N/A')}<br/>
-        <b>Start Time:</b> {session_data.get('start_time', 'N/A')}<br/>
-        <b>End Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br/>
-        <b>Report Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-        """
-        elements.append(Paragraph(session_info, info_style))
-        elements.append(Spacer(1, 0.2*inch))
-        
-        # Statistics
-        total = len(present_students) + len(absent_students)
-        attendance_rate = (len(present_students) / total * 100) if total > 0 else 0
-        
-        stats_text = f"""<b>Attendance Statistics:</b><br/>
-        <b>Total Students:</b> {total}<br/>
-        <b>Present:</b> {len(present_students)} ({attendance_rate:.1f}%)<br/>
-        <b>Absent:</b> {len(absent_students)} ({100-attendance_rate:.1f}%)
-        """
-        elements.append(Paragraph(stats_text, info_style))
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Present Students with Photos
-        elements.append(Paragraph('<b>PRESENT STUDENTS</b>', styles['Heading2']))
-        if present_students:
-            for idx, student in enumerate(present_students):
-                # Student name and info
-                student_name = student[0]
-                student_enroll = student[1]
-                student_roll = student[2]
-                
-                student_info = f"<b>{idx + 1}. {student_name}</b><br/>Enrollment: {student_enroll} | Roll: {student_roll}"
-                
-                # Try to find and add photo
-                photo_found = False
-                if os.path.exists('static/photos'):
-                    # Search for most recent photo with this student's name
-                    for filename_photo in sorted(os.listdir('static/photos'), reverse=True):
-                        if student_name.upper().replace(' ', '_') in filename_photo.upper() and filename_photo.endswith('.jpg'):
-                            try:
-                                photo_path = os.path.join('static/photos', filename_photo)
-                                photo_img = Image(photo_path, width=1.5*inch, height=1.125*inch)
-                                
-                                # Create table with info and photo
-                                photo_table = Table([
-                                    [Paragraph(student_info, info_style), photo_img]
-                                ], colWidths=[2.5*inch, 1.8*inch])
-                                photo_table.setStyle(TableStyle([
-                                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                                    ('LEFTPADDING', (0, 0), (0, 0), 10),
-                                    ('RIGHTPADDING', (1, 0), (1, 0), 10),
-                                    ('BORDER', (0, 0), (-1, -1), 1, colors.grey)
-                                ]))
-                                elements.append(photo_table)
-                                elements.append(Spacer(1, 0.15*inch))
-                                photo_found = True
-                                break
-                            except Exception as e:
-                                print(f"[WARN] Could not add photo for {student_name}: {e}")
-                
-                # If no photo found, just add student info
-                if not photo_found:
-                    elements.append(Paragraph(student_info, info_style))
-                    elements.append(Spacer(1, 0.15*inch))
-                
-                # Add page break if too many students
-                if (idx + 1) % 5 == 0 and idx + 1 < len(present_students):
-                    elements.append(PageBreak())
-                    elements.append(Paragraph('<b>PRESENT STUDENTS (Continued)</b>', styles['Heading2']))
-                    elements.append(Spacer(1, 0.2*inch))
-        else:
-            elements.append(Paragraph('<i>No students present</i>', styles['Normal']))
-        
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Add new page for absent students
-        if absent_students:
-            elements.append(PageBreak())
-        
-        # Absent Students Table
-        elements.append(Paragraph('<b>ABSENT STUDENTS</b>', styles['Heading2']))
-        if absent_students:
-            absent_data = [['#', 'Name', 'Enrollment No', 'Roll No']]
-            for i, student in enumerate(absent_students, 1):
-                absent_data.append([str(i), student[0], student[1], student[2]])
-            
-            absent_table = Table(absent_data, colWidths=[0.5*inch, 2.5*inch, 1.5*inch, 0.8*inch])
-            absent_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#cc0000')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.lightcoral),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ffe6e6')])
-            ]))
-            elements.append(absent_table)
-        else:
-            elements.append(Paragraph('<i>All students present</i>', styles['Normal']))
-        
-        # Build PDF
-        doc.build(elements)
-        return True
-    except Exception as e:
-        print(f"[ERROR] PDF generation failed: {e}")
-        return False
-
 def initialize_sections_if_empty():
     try:
-        import pandas as pd
-        with db.lock:
-            stu_df = pd.read_excel(db.students_file, sheet_name='Students', dtype=str)
-            count = len(stu_df)
+        count = db.count_students()
         if count == 0:
             print('[INIT] No students found. Seeding and importing demo sections...')
             seed_section_excels()
@@ -1396,6 +1286,8 @@ if __name__ == '__main__':
     os.makedirs('data/sections', exist_ok=True)
     ensure_section_excels()
     initialize_sections_if_empty()
+    roster_cache.start_indexing()
+    warm_voice_cache()
     
     # Run the Flask-SocketIO app
     socketio.run(app, host='127.0.0.1', port=5000, debug=True)
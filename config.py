@@ -3,7 +3,41 @@ from datetime import timedelta
 
 class Config:
     NFC_READ_DELAY = 0.5
+    NFC_SCAN_MODE = "event"     # "event" (PC/SC card insertion) or "poll"
+    NFC_EVENT_TIMEOUT = 1       # seconds between stop_flag checks in event mode
+    NFC_READER_REFRESH = 2      # seconds between reader hot-plug checks
+    NFC_WORKERS = 2             # attendance processing threads
+    NFC_QUEUE_SIZE = 64         # pending taps before new ones are dropped
+    NFC_DEBOUNCE_READER = 2.0   # seconds a UID is ignored on the reader that read it
+    NFC_DEBOUNCE_GLOBAL = 1.0   # seconds a UID is ignored on every reader (0 = off)
+    NFC_SCAN_UID_TIMEOUT = 10   # seconds /api/scan_uid waits for a tap
+
+    # Socket.IO: repeated statuses are dropped, changes rate-limited
+    SOCKET_STATUS_INTERVAL = 0.25   # min seconds between status_update messages
+    SOCKET_DASHBOARD_WINDOW = 0.5   # dashboard_update bursts within this merge into one
+
+    # Voice feedback (spoken on a background thread)
+    VOICE_ENABLED = True
+    VOICE_QUEUE_SIZE = 4        # pending prompts before the oldest is dropped
+    VOICE_CACHE_DIR = "data/voice_cache"
     TIMEZONE_OFFSET = timedelta(hours=5, minutes=30)
+
+    # Storage backend: 'sqlite' (live store) or 'excel' (legacy workbooks)
+    DB_BACKEND = "sqlite"
+    SQLITE_FILE = "data/attendance.db"
+    SECTIONS_DIR = "data/sections"  # one roster workbook per section
+
+    # Session report PDFs are rendered on a background thread pool
+    REPORT_WORKERS = 2
+    PHOTO_THUMBNAIL_PROFILE = "pdf"  # "small", "pdf", "print" or "full"
+
+    # Excel backend: taps are appended to a journal and folded into
+    # attendance.xlsx in the background
+    JOURNAL_FILE = "data/attendance.journal"
+    JOURNAL_SYNC_BATCH = 32         # fsync after this many taps...
+    JOURNAL_SYNC_INTERVAL = 1.0     # ...or this many seconds
+    JOURNAL_COMPACT_INTERVAL = 60   # seconds between compactions
+    JOURNAL_COMPACT_RECORDS = 500   # compact early once this many taps queue up
     
     # Modern Color Scheme
     GUI_BG = "#0f0f23"  # Dark blue-black
@@ -1,5 +1,18 @@
 # database/__init__.py
+from config import Config
+from .base import DatabaseManager
 from .manager import ExcelDatabaseManager
+from .sqlite_manager import SQLiteDatabaseManager
+from .roster import RosterCache, roster_cache
+
+BACKENDS = {
+    'sqlite': SQLiteDatabaseManager,
+    'excel': ExcelDatabaseManager,
+}
+
+def create_database_manager(backend=None):
+    """Create the storage backend selected by Config.DB_BACKEND"""
+    return BACKENDS[(backend or Config.DB_BACKEND).lower()]()
 
 # Global database instance
-db = ExcelDatabaseManager()
+db = create_database_manager()
@@ -0,0 +1,159 @@
+# database/base.py - Storage backend interface shared by all database managers
+from abc import ABC, abstractmethod
+from datetime import datetime
+from config import Config
+
+class DatabaseManager(ABC):
+    """Interface every storage backend behind the global `db` implements.
+
+    Student tuples are (name, enrollment no, roll no, section, subject, uid)
+    and UIDs compare case-insensitively, matching the original Excel store.
+    A backend missing any abstract method fails at construction.
+    """
+
+    def today(self):
+        """Current local date string used to partition attendance"""
+        return (datetime.utcnow() + Config.TIMEZONE_OFFSET).strftime("%Y-%m-%d")
+
+    # --- Students -----------------------------------------------------
+    @abstractmethod
+    def get_student_by_uid(self, uid):
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_student(self, name, enroll_no, roll_no, section, subject, uid):
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_students_bulk(self, students):
+        """Add many student tuples in a single write.
+
+        Returns one outcome per input row: 'added', 'duplicate' (UID already
+        registered or repeated in the batch), 'invalid' (no name or UID) or
+        'error' (the write failed).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_all_students(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_students_by_section(self, section):
+        raise NotImplementedError
+
+    @abstractmethod
+    def count_students(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove_section(self, section):
+        """Remove all students of a section together with their attendance"""
+        raise NotImplementedError
+
+    # --- Attendance ---------------------------------------------------
+    @abstractmethod
+    def log_attendance(self, uid):
+        """Record a tap; returns the time it was stored with, or None on failure"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_today_stats(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_recent_attendance(self, limit=10):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_present_uids_today(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_present_uids_today_by_section(self, section):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_present_list_today_by_section(self, section):
+        """Get (name, time, uid) tuples for today's scans of a section"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_absent_students(self, present_uids):
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear_attendance_for_date(self, date):
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove_attendance_for_uid(self, uid, date):
+        raise NotImplementedError
+
+    # --- Admins -------------------------------------------------------
+    @abstractmethod
+    def authenticate_admin(self, username, password, nfc_uid=None):
+        raise NotImplementedError
+
+    # --- Import / export ----------------------------------------------
+    @abstractmethod
+    def export_students_to_excel(self, filename):
+        raise NotImplementedError
+
+    @abstractmethod
+    def export_attendance_to_excel(self, filename, date=None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_students_export(self, section=None, chunk_size=1000):
+        """Yield lists of student tuples, optionally for one section"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_attendance_export(self, date_from=None, date_to=None, section=None, chunk_size=1000):
+        """Yield lists of (name, enroll, roll, section, subject, time, date)
+        rows in scan order, filtered by inclusive date range and section"""
+        raise NotImplementedError
+
+    # --- Shared helpers -----------------------------------------------
+    def get_all_students_dict(self):
+        """Get all students as list of dictionaries"""
+        return [self._student_dict(s) for s in self.get_all_students()]
+
+    def get_students_by_section_dict(self, section):
+        """Get students by section as list of dictionaries"""
+        return [self._student_dict(s) for s in self.get_students_by_section(section)]
+
+    @staticmethod
+    def _prepare_bulk(students, is_registered):
+        """Validate and de-duplicate a batch in memory.
+
+        Returns (outcomes, rows) where rows are the (position, student) pairs
+        to write, with fields stripped and the UID upper-cased.
+        """
+        outcomes = []
+        rows = []
+        seen = set()
+        for student in students:
+            name, enroll, roll, section, subject, uid = (str(v or '').strip() for v in student)
+            uid = uid.upper()
+            if not name or not uid:
+                outcomes.append('invalid')
+            elif uid in seen or is_registered(uid):
+                outcomes.append('duplicate')
+            else:
+                seen.add(uid)
+                rows.append((len(outcomes), (name, enroll, roll, section, subject, uid)))
+                outcomes.append('added')
+        return outcomes, rows
+
+    @staticmethod
+    def _student_dict(student):
+        return {
+            'name': student[0],
+            'enroll_no': student[1],
+            'roll_no': student[2],
+            'section': student[3],
+            'subject': student[4],
+            'uid': student[5]
+        }
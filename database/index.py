@@ -0,0 +1,262 @@
+# database/index.py - In-memory indexes over the live store
+import os
+from collections import OrderedDict
+from threading import Lock, RLock
+
+def normalize_uid(uid):
+    """Canonical form used as index key for NFC UIDs"""
+    return str(uid or '').strip().upper()
+
+def file_signature(path):
+    """(mtime, size) of a backing file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+class StudentIndex:
+    """Hash index of normalised UID -> (name, enroll, roll, section, subject).
+
+    `loader` returns student tuples (name, enroll, roll, section, subject, uid)
+    and `signature` returns a token that changes whenever the backing store
+    is modified outside this process; the index is rebuilt only then.
+    """
+
+    def __init__(self, loader, signature):
+        self.loader = loader
+        self.signature = signature
+        self.lock = Lock()
+        self._by_uid = None
+        self._signature = None
+        self._count = 0
+
+    def _ensure_fresh(self):
+        sig = self.signature()
+        if self._by_uid is None or sig != self._signature:
+            by_uid = {}
+            count = 0
+            for student in self.loader():
+                count += 1
+                key = normalize_uid(student[5])
+                if key and key not in by_uid:
+                    by_uid[key] = tuple(student[:5])
+            self._by_uid = by_uid
+            self._count = count
+            self._signature = sig
+            print(f"[DEBUG] Built student index ({len(by_uid)} UIDs)")
+
+    def get(self, uid):
+        """Student tuple for a UID, or None"""
+        with self.lock:
+            self._ensure_fresh()
+            return self._by_uid.get(normalize_uid(uid))
+
+    def cached(self, uid):
+        """(fresh, student) without touching the store.
+
+        fresh is False when the index must be rebuilt first; callers then
+        fall back to `get` under whatever lock guards the backing file.
+        """
+        with self.lock:
+            if self._by_uid is None or self.signature() != self._signature:
+                return False, None
+            return True, self._by_uid.get(normalize_uid(uid))
+
+    def snapshot(self):
+        """Copy of the UID -> student map"""
+        with self.lock:
+            self._ensure_fresh()
+            return dict(self._by_uid)
+
+    def __contains__(self, uid):
+        return self.get(uid) is not None
+
+    def count(self):
+        """Number of student rows, including ones without a UID"""
+        with self.lock:
+            self._ensure_fresh()
+            return self._count
+
+    def add(self, student):
+        """Record a student written by this process and adopt the new signature"""
+        with self.lock:
+            if self._by_uid is None:
+                return
+            key = normalize_uid(student[5])
+            if key and key not in self._by_uid:
+                self._by_uid[key] = tuple(student[:5])
+            self._count += 1
+            self._signature = self.signature()
+
+    def invalidate(self):
+        """Force a rebuild on next lookup"""
+        with self.lock:
+            self._by_uid = None
+
+
+class _DayPartition:
+    """Attendance of one date: scan rows plus derived present sets"""
+
+    def __init__(self):
+        self.rows = []              # (key, uid, time) in scan order
+        self.present = {}           # key -> uid as first logged
+        self.by_section = {}        # SECTION -> set of keys
+        self.unresolved = set()     # keys not (yet) known as students
+
+
+class AttendanceIndex:
+    """Date-partitioned view of attendance kept in step with the store.
+
+    `loader(date)` returns (uid, time) rows of one date in scan order. The
+    managers call `record`, `remove` and `clear` alongside their writes so
+    present sets and counts stay O(1) reads; `signature` detects changes
+    made outside this process and drops every partition. Writers that can
+    race a partition load hold `lock` around the store write and `record`;
+    a delete that can race a tap calls `drop` instead of `remove`/`clear`.
+    """
+
+    MAX_PARTITIONS = 3
+
+    def __init__(self, loader, student_index, signature=None):
+        self.loader = loader
+        self.student_index = student_index
+        self.signature = signature or (lambda: None)
+        self.lock = RLock()
+        self._days = OrderedDict()
+        self._signature = None
+
+    def _add_row(self, day, uid, time_str, resolve):
+        key = normalize_uid(uid)
+        day.rows.append((key, str(uid).strip(), time_str))
+        if key in day.present:
+            return
+        day.present[key] = str(uid).strip()
+        student = resolve(key)
+        section = str(student[3] or '').strip().upper() if student else None
+        if section is None:
+            day.unresolved.add(key)
+        else:
+            day.by_section.setdefault(section, set()).add(key)
+
+    def _day(self, date):
+        sig = self.signature()
+        if sig != self._signature:
+            self._days.clear()
+            self._signature = sig
+        day = self._days.get(date)
+        if day is None:
+            day = _DayPartition()
+            for uid, time_str in self.loader(date):
+                self._add_row(day, uid, time_str, self.student_index.get)
+            self._days[date] = day
+            while len(self._days) > self.MAX_PARTITIONS:
+                self._days.popitem(last=False)
+        else:
+            self._days.move_to_end(date)
+        return day
+
+    # --- Updates ------------------------------------------------------
+    def record(self, uid, date, time_str):
+        """A scan was written to the store.
+
+        Never reads the store: when the student index is stale, or the
+        update fails, the partition is dropped and the next query rebuilds
+        it from the store.
+        """
+        with self.lock:
+            day = self._days.get(date)
+            if day is None:
+                return
+            try:
+                fresh, student = self.student_index.cached(uid)
+                if not fresh:
+                    del self._days[date]
+                    return
+                self._add_row(day, uid, time_str, lambda key: student)
+            except Exception:
+                self._days.pop(date, None)
+                raise
+
+    def remove(self, uid, date):
+        """All scans of a UID on a date were deleted from the store"""
+        key = normalize_uid(uid)
+        with self.lock:
+            day = self._days.get(date)
+            if day is None:
+                return
+            day.rows = [r for r in day.rows if r[0] != key]
+            day.present.pop(key, None)
+            day.unresolved.discard(key)
+            for keys in day.by_section.values():
+                keys.discard(key)
+
+    def clear(self, date):
+        """Every scan of a date was deleted from the store"""
+        with self.lock:
+            if date in self._days:
+                self._days[date] = _DayPartition()
+
+    def drop(self, date):
+        """Reload a date from the store on next access"""
+        with self.lock:
+            self._days.pop(date, None)
+
+    def student_added(self, uid, section):
+        """A UID already scanned today may now belong to a section"""
+        key = normalize_uid(uid)
+        with self.lock:
+            for day in self._days.values():
+                if key in day.unresolved:
+                    day.unresolved.discard(key)
+                    day.by_section.setdefault(str(section or '').strip().upper(), set()).add(key)
+
+    def sync_signature(self):
+        """Adopt the store signature after a write made by this process"""
+        with self.lock:
+            self._signature = self.signature()
+
+    def invalidate(self):
+        with self.lock:
+            self._days.clear()
+
+    # --- Queries ------------------------------------------------------
+    def present_count(self, date):
+        with self.lock:
+            return len(self._day(date).present)
+
+    def present_uids(self, date):
+        with self.lock:
+            return set(self._day(date).present.values())
+
+    def present_uids_by_section(self, date, section):
+        with self.lock:
+            day = self._day(date)
+            keys = day.by_section.get(str(section or '').strip().upper(), ())
+            return {day.present[k] for k in keys}
+
+    def recent(self, date, limit=10):
+        """(name, time) of the latest scans of known students, newest first"""
+        with self.lock:
+            result = []
+            for key, _, time_str in reversed(self._day(date).rows):
+                student = self.student_index.get(key)
+                if student:
+                    result.append((student[0], time_str))
+                    if len(result) >= limit:
+                        break
+            return result
+
+    def section_rows(self, date, section):
+        """(name, time, uid) of every scan of a section's students, in scan order"""
+        with self.lock:
+            day = self._day(date)
+            keys = day.by_section.get(str(section or '').strip().upper(), set())
+            result = []
+            for key, _, time_str in day.rows:
+                if key in keys:
+                    student = self.student_index.get(key)
+                    if student and student[0]:
+                        result.append((student[0], time_str, key))
+            return result
@@ -0,0 +1,131 @@
+# database/journal.py - Append-only attendance journal
+import json
+import os
+import time
+from threading import Lock
+
+class AttendanceJournal:
+    """JSON-lines journal that records one attendance row per line.
+
+    Appends are O(1) and fsync'd in batches: at most every `batch_size`
+    records or `sync_interval` seconds, whichever comes first. `rotate`
+    hands the current segment to a compactor while new taps keep going
+    to a fresh file.
+    """
+
+    def __init__(self, path, batch_size=32, sync_interval=1.0):
+        self.path = path
+        self.compacting_path = path + ".compacting"
+        self.batch_size = batch_size
+        self.sync_interval = sync_interval
+        self.lock = Lock()
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._count = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._count = len(self._read_file(path))
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            if self._file.tell() and not self._ends_with_newline(self.path):
+                # Terminate a torn line so the next record is not glued to it
+                self._file.write("\n")
+        return self._file
+
+    @staticmethod
+    def _ends_with_newline(path):
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def append(self, record):
+        """Append one record (a dict) to the journal"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            f = self._open()
+            f.write(line)
+            f.flush()
+            self._unsynced += 1
+            self._count += 1
+            if (self._unsynced >= self.batch_size or
+                    time.monotonic() - self._last_sync >= self.sync_interval):
+                self._sync_locked()
+
+    def sync(self):
+        """fsync any records appended since the last sync"""
+        with self.lock:
+            self._sync_locked()
+
+    def _sync_locked(self):
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def __len__(self):
+        return self._count
+
+    def rotate(self):
+        """Move the live segment aside for compaction.
+
+        Returns False when there is nothing to compact. A segment left over
+        from an interrupted compaction is merged with the live one.
+        """
+        with self.lock:
+            self._sync_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if not os.path.exists(self.path):
+                return os.path.exists(self.compacting_path)
+            if os.path.exists(self.compacting_path):
+                with open(self.path, "r", encoding="utf-8") as src, \
+                        open(self.compacting_path, "a", encoding="utf-8") as dst:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.compacting_path)
+            self._count = 0
+            return True
+
+    def compacting_records(self):
+        """Records of the segment currently being compacted"""
+        return self._read_file(self.compacting_path)
+
+    def finish_compaction(self):
+        """Drop the compacted segment once it has been materialised"""
+        try:
+            os.remove(self.compacting_path)
+        except FileNotFoundError:
+            pass
+
+    def records(self):
+        """All records not yet materialised, oldest first"""
+        with self.lock:
+            if self._file is not None:
+                self._file.flush()
+            return self._read_file(self.compacting_path) + self._read_file(self.path)
+
+    @staticmethod
+    def _read_file(path):
+        if not os.path.exists(path):
+            return []
+        result = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    result.append(json.loads(line))
+                except ValueError:
+                    # Torn write from a crash mid-append
+                    continue
+        return result
@@ -1,17 +1,130 @@
 # database/manager.py - Excel-based database operations
 import pandas as pd
 import os
+import shutil
+import tempfile
+import time
 from datetime import datetime
-from threading import Lock
+from threading import Lock, Thread
 from config import Config
+from .base import DatabaseManager
+from .journal import AttendanceJournal
+from .index import StudentIndex, AttendanceIndex, file_signature, normalize_uid
 
-class ExcelDatabaseManager:
+STUDENT_COLUMNS = ['Name', 'Enrollment No', 'Roll No', 'Section', 'Subject', 'NFC UID']
+ATTENDANCE_COLUMNS = ['Student UID', 'Date', 'Time', 'Timestamp']
+EXPORT_COLUMNS = ['Name', 'Enrollment No', 'Roll No', 'Section', 'Subject', 'Time', 'Date']
+
+def _lower_columns(df):
+    df = df.fillna('').copy()
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    return df
+
+def join_attendance_students(attendance_df, students_df):
+    """Attendance rows joined to their student by normalised UID, in scan order.
+
+    One hash merge instead of scanning the students for every attendance row;
+    scans of unregistered UIDs are dropped and the first student row wins for
+    a UID registered twice.
+    """
+    students = _lower_columns(students_df)
+    students['_key'] = students['nfc uid'].astype(str).str.strip().str.upper()
+    students = students[students['_key'] != ''].drop_duplicates('_key')
+    attendance = _lower_columns(attendance_df)
+    attendance['_key'] = attendance['student uid'].astype(str).str.strip().str.upper()
+    joined = attendance.merge(students, on='_key', how='inner', sort=False)
+    return pd.DataFrame({
+        'Name': joined.get('name', ''),
+        'Enrollment No': joined.get('enrollment no', ''),
+        'Roll No': joined.get('roll no', ''),
+        'Section': joined.get('section', ''),
+        'Subject': joined.get('subject', ''),
+        'Time': joined.get('time', ''),
+        'Date': joined.get('date', ''),
+    }, columns=EXPORT_COLUMNS)
+
+class ExcelDatabaseManager(DatabaseManager):
     def __init__(self):
         self.lock = Lock()
         self.students_file = "data/students.xlsx"
         self.attendance_file = "data/attendance.xlsx"
         self.admins_file = "data/admins.xlsx"
         self.ensure_files_exist()
+        self.student_index = StudentIndex(
+            self._load_students,
+            lambda: file_signature(self.students_file)
+        )
+        self.journal = AttendanceJournal(
+            Config.JOURNAL_FILE,
+            batch_size=Config.JOURNAL_SYNC_BATCH,
+            sync_interval=Config.JOURNAL_SYNC_INTERVAL
+        )
+        self.attendance_index = AttendanceIndex(
+            self._load_attendance_day,
+            self.student_index,
+            lambda: file_signature(self.attendance_file)
+        )
+        self._compactor = Thread(target=self._compactor_loop, daemon=True)
+        self._compactor.start()
+
+    def _compactor_loop(self):
+        """Background thread: fsync the journal and fold it into attendance.xlsx"""
+        last_compaction = time.monotonic()
+        while True:
+            time.sleep(Config.JOURNAL_SYNC_INTERVAL)
+            try:
+                self.journal.sync()
+                due = time.monotonic() - last_compaction >= Config.JOURNAL_COMPACT_INTERVAL
+                if len(self.journal) >= Config.JOURNAL_COMPACT_RECORDS or (due and len(self.journal)):
+                    self.compact_journal()
+                    last_compaction = time.monotonic()
+            except Exception as e:
+                print(f"[DEBUG] Journal compaction failed: {e}")
+
+    def compact_journal(self):
+        """Materialise journaled taps into attendance.xlsx"""
+        with self.lock:
+            self._rewrite_attendance(None)
+
+    def _read_attendance_df(self):
+        """attendance.xlsx plus taps still in the journal. Caller holds self.lock"""
+        df = pd.read_excel(self.attendance_file, sheet_name='Attendance', dtype=str)
+        df = df.fillna('')
+        return self._merge_journal(df, self.journal.records())
+
+    def _load_attendance_day(self, date):
+        """(uid, time) rows of one date. Caller holds self.lock"""
+        df = self._read_attendance_df()
+        day = df[df['Date'].astype(str) == date]
+        return list(zip(day['Student UID'].astype(str), day['Time'].astype(str)))
+
+    def _rewrite_attendance(self, transform):
+        """Compact the journal, apply transform to the full attendance frame and
+        write it back. Taps arriving meanwhile go to a fresh journal segment.
+        Caller holds self.lock"""
+        if not self.journal.rotate() and transform is None:
+            return
+        df = pd.read_excel(self.attendance_file, sheet_name='Attendance', dtype=str)
+        df = df.fillna('')
+        df = self._merge_journal(df, self.journal.compacting_records())
+        if transform is not None:
+            df = transform(df)
+        df.to_excel(self.attendance_file, index=False, sheet_name='Attendance')
+        self.journal.finish_compaction()
+        self.attendance_index.sync_signature()
+
+    @staticmethod
+    def _merge_journal(df, records):
+        if not records:
+            return df
+        # A compaction interrupted after writing the workbook leaves its
+        # segment behind; skip rows that already made it into the file.
+        existing = set(zip(df['Student UID'].astype(str), df['Timestamp'].astype(str)))
+        rows = [r for r in records
+                if (str(r.get('Student UID', '')), str(r.get('Timestamp', ''))) not in existing]
+        if not rows:
+            return df
+        return pd.concat([df, pd.DataFrame(rows, columns=ATTENDANCE_COLUMNS)], ignore_index=True)
 
     def ensure_files_exist(self):
         """Create Excel files if they don't exist"""
@@ -19,7 +132,7 @@ class ExcelDatabaseManager:
         
         # Create students file
         if not os.path.exists(self.students_file):
-            df = pd.DataFrame(columns=['Name', 'Enrollment No', 'Roll No', 'Section', 'Subject', 'NFC UID'])
+            df = pd.DataFrame(columns=STUDENT_COLUMNS)
             df.to_excel(self.students_file, index=False, sheet_name='Students')
             print(f"[DEBUG] Created {self.students_file}")
         
@@ -39,44 +152,42 @@ class ExcelDatabaseManager:
             df.to_excel(self.admins_file, index=False, sheet_name='Admins')
             print(f"[DEBUG] Created {self.admins_file}")
 
+    def _load_students(self):
+        """Read students.xlsx as student tuples. Caller holds self.lock"""
+        df = pd.read_excel(self.students_file, sheet_name='Students', dtype=str)
+        df = df.fillna('')
+        # Normalize column names
+        df.columns = [col.strip().lower() for col in df.columns]
+        cols = [df[c] if c in df.columns else [''] * len(df)
+                for c in ('name', 'enrollment no', 'roll no', 'section', 'subject', 'nfc uid')]
+        return list(zip(*cols))
+
     def get_student_by_uid(self, uid):
-        """Get student by NFC UID"""
-        with self.lock:
-            try:
-                df = pd.read_excel(self.students_file, sheet_name='Students', dtype=str)
-                df = df.fillna('')
-                # Normalize column names
-                df.columns = [col.strip().lower() for col in df.columns]
-                
-                for _, row in df.iterrows():
-                    if str(row.get('nfc uid', '')).strip().upper() == uid.upper():
-                        return (
-                            row.get('name', ''),
-                            row.get('enrollment no', ''),
-                            row.get('roll no', ''),
-                            row.get('section', ''),
-                            row.get('subject', '')
-                        )
-                return None
-            except Exception as e:
-                print(f"[DEBUG] Error in get_student_by_uid: {e}")
-                return None
+        """Get student by NFC UID (served from the in-memory index).
+
+        Only a stale index waits for self.lock, which guards the reload."""
+        try:
+            fresh, student = self.student_index.cached(uid)
+            if fresh:
+                return student
+            with self.lock:
+                return self.student_index.get(uid)
+        except Exception as e:
+            print(f"[DEBUG] Error in get_student_by_uid: {e}")
+            return None
 
     def add_student(self, name, enroll_no, roll_no, section, subject, uid):
         """Add new student to Excel"""
         with self.lock:
             try:
+                # Check if UID already exists
+                if uid in self.student_index:
+                    print(f"[DEBUG] UID already exists: {uid}")
+                    return False
+
                 df = pd.read_excel(self.students_file, sheet_name='Students', dtype=str)
                 df = df.fillna('')
                 
-                # Check if UID already exists
-                df_normalized = df.copy()
-                df_normalized.columns = [col.strip().lower() for col in df_normalized.columns]
-                for _, row in df_normalized.iterrows():
-                    if str(row.get('nfc uid', '')).strip().upper() == uid.upper():
-                        print(f"[DEBUG] UID already exists: {uid}")
-                        return False
-                
                 # Add new row
                 new_row = {
                     'Name': name,
@@ -88,52 +199,67 @@ class ExcelDatabaseManager:
                 }
                 df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
                 df.to_excel(self.students_file, index=False, sheet_name='Students')
+                self.student_index.add((name, enroll_no, roll_no, section, subject, uid))
+                self.attendance_index.student_added(uid, section)
                 print(f"[DEBUG] Added student: {name} with UID: {uid}")
                 return True
             except Exception as e:
                 print(f"[DEBUG] Error in add_student: {e}")
                 return False
 
-    def log_attendance(self, uid):
-        """Log attendance for a student"""
+    def add_students_bulk(self, students):
+        """Add many students with one read and one write of students.xlsx"""
         with self.lock:
+            outcomes, rows = self._prepare_bulk(students, lambda uid: uid in self.student_index)
+            if not rows:
+                return outcomes
             try:
-                now = datetime.utcnow() + Config.TIMEZONE_OFFSET
-                date = now.strftime("%Y-%m-%d")
-                time_str = now.strftime("%H:%M:%S")
-                timestamp = now.isoformat()
-                
-                df = pd.read_excel(self.attendance_file, sheet_name='Attendance', dtype=str)
+                df = pd.read_excel(self.students_file, sheet_name='Students', dtype=str)
                 df = df.fillna('')
-                
-                new_row = {
+                new_rows = pd.DataFrame([s for _, s in rows], columns=STUDENT_COLUMNS)
+                df = pd.concat([df, new_rows], ignore_index=True)
+                df.to_excel(self.students_file, index=False, sheet_name='Students')
+            except Exception as e:
+                print(f"[DEBUG] Error in add_students_bulk: {e}")
+                for i, _ in rows:
+                    outcomes[i] = 'error'
+                return outcomes
+            for _, student in rows:
+                self.student_index.add(student)
+                self.attendance_index.student_added(student[5], student[3])
+            print(f"[DEBUG] Bulk added {len(rows)} students")
+            return outcomes
+
+    def log_attendance(self, uid):
+        """Log attendance for a student (appended to the journal, see compact_journal);
+        returns the stored time (HH:MM:SS)"""
+        try:
+            now = datetime.utcnow() + Config.TIMEZONE_OFFSET
+            date = now.strftime("%Y-%m-%d")
+            time_str = now.strftime("%H:%M:%S")
+            # Not self.lock: taps must not wait for a compaction. The index
+            # lock keeps a partition load from seeing the append twice, and
+            # record() never reads the workbooks.
+            with self.attendance_index.lock:
+                self.journal.append({
                     'Student UID': uid,
                     'Date': date,
                     'Time': time_str,
-                    'Timestamp': timestamp
-                }
-                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-                df.to_excel(self.attendance_file, index=False, sheet_name='Attendance')
-                print(f"[DEBUG] Logged attendance for UID: {uid}")
-            except Exception as e:
-                print(f"[DEBUG] Error in log_attendance: {e}")
+                    'Timestamp': now.isoformat()
+                })
+                self.attendance_index.record(uid, date, time_str)
+            print(f"[DEBUG] Logged attendance for UID: {uid}")
+            return time_str
+        except Exception as e:
+            print(f"[DEBUG] Error in log_attendance: {e}")
+            return None
 
     def get_today_stats(self):
         """Get today's attendance statistics"""
         with self.lock:
             try:
-                today = (datetime.utcnow() + Config.TIMEZONE_OFFSET).strftime("%Y-%m-%d")
-                
-                # Total students
-                students_df = pd.read_excel(self.students_file, sheet_name='Students', dtype=str)
-                total = len(students_df)
-                
-                # Present today
-                attendance_df = pd.read_excel(self.attendance_file, sheet_name='Attendance', dtype=str)
-                attendance_df = attendance_df.fillna('')
-                today_attendance = attendance_df[attendance_df['Date'].astype(str) == today]
-                present = len(today_attendance['Student UID'].unique())
-                
+                total = self.student_index.count()
+                present = self.attendance_index.present_count(self.today())
                 return total, present
             except Exception as e:
                 print(f"[DEBUG] Error in get_today_stats: {e}")
@@ -184,39 +310,47 @@ class ExcelDatabaseManager:
         """Get recent attendance records"""
         with self.lock:
             try:
-                today = (datetime.utcnow() + Config.TIMEZONE_OFFSET).strftime("%Y-%m-%d")
-                
-                attendance_df = pd.read_excel(self.attendance_file, sheet_name='Attendance', dtype=str)
-                students_df = pd.read_excel(self.students_file, sheet_name='Students', dtype=str)
-                
-                attendance_df = attendance_df.fillna('')
-                students_df = students_df.fillna('')
-                
-                # Get today's attendance
-                today_attendance = attendance_df[attendance_df['Date'].astype(str) == today].copy()
-                
-                # Join with students to get names
-                students_df_lower = students_df.copy()
-                students_df_lower.columns = [col.strip().lower() for col in students_df_lower.columns]
-                today_attendance_lower = today_attendance.copy()
-                today_attendance_lower.columns = [col.strip().lower() for col in today_attendance_lower.columns]
-                
-                result = []
-                for _, att_row in today_attendance_lower.iloc[-limit:].iterrows():
-                    uid = str(att_row.get('student uid', '')).strip()
-                    time_val = str(att_row.get('time', '')).strip()
-                    
-                    # Find student name
-                    for _, stu_row in students_df_lower.iterrows():
-                        if str(stu_row.get('nfc uid', '')).strip().upper() == uid.upper():
-                            result.append((stu_row.get('name', 'Unknown'), time_val))
-                            break
-                
-                return result[::-1]  # Most recent first
+                return self.attendance_index.recent(self.today(), limit)
             except Exception as e:
                 print(f"[DEBUG] Error in get_recent_attendance: {e}")
                 return []
 
+    def count_students(self):
+        """Get number of registered students"""
+        with self.lock:
+            try:
+                df = pd.read_excel(self.students_file, sheet_name='Students', dtype=str)
+                return len(df)
+            except Exception as e:
+                print(f"[DEBUG] Error in count_students: {e}")
+                return 0
+
+    def remove_section(self, section):
+        """Remove all students of a section together with their attendance"""
+        with self.lock:
+            try:
+                stu_df = pd.read_excel(self.students_file, sheet_name='Students', dtype=str)
+                stu_df = stu_df.fillna('')
+                uids_to_remove = set()
+                for _, row in stu_df.iterrows():
+                    if str(row.get('Section', '')).strip().upper() == section.upper():
+                        uid = str(row.get('NFC UID', '')).strip()
+                        if uid:
+                            uids_to_remove.add(uid)
+
+                # Remove attendance records for these UIDs
+                if uids_to_remove:
+                    self._rewrite_attendance(lambda df: df[~df['Student UID'].isin(uids_to_remove)])
+
+                stu_df = stu_df[stu_df['Section'].astype(str).str.strip().str.upper() != section.upper()]
+                stu_df.to_excel(self.students_file, index=False, sheet_name='Students')
+                self.student_index.invalidate()
+                self.attendance_index.invalidate()
+                return True
+            except Exception as e:
+                print(f"[DEBUG] Error in remove_section: {e}")
+                return False
+
     def get_all_students(self):
         """Get all students"""
         with self.lock:
@@ -266,14 +400,7 @@ class ExcelDatabaseManager:
         """Get all UIDs present today"""
         with self.lock:
             try:
-                today = (datetime.utcnow() + Config.TIMEZONE_OFFSET).strftime("%Y-%m-%d")
-                
-                attendance_df = pd.read_excel(self.attendance_file, sheet_name='Attendance', dtype=str)
-                attendance_df = attendance_df.fillna('')
-                
-                today_attendance = attendance_df[attendance_df['Date'].astype(str) == today]
-                uids = set(today_attendance['Student UID'].unique())
-                return uids
+                return self.attendance_index.present_uids(self.today())
             except Exception as e:
                 print(f"[DEBUG] Error in get_present_uids_today: {e}")
                 return set()
@@ -282,30 +409,47 @@ class ExcelDatabaseManager:
         """Get UIDs present today for a specific section"""
         with self.lock:
             try:
-                today = (datetime.utcnow() + Config.TIMEZONE_OFFSET).strftime("%Y-%m-%d")
-                
-                attendance_df = pd.read_excel(self.attendance_file, sheet_name='Attendance', dtype=str)
-                students_df = pd.read_excel(self.students_file, sheet_name='Students', dtype=str)
-                
-                attendance_df = attendance_df.fillna('')
-                students_df = students_df.fillna('')
-                
-                # Get students in section
-                section_uids = set()
-                for _, row in students_df.iterrows():
-                    if str(row.get('Section', '')).strip().upper() == section.upper():
-                        section_uids.add(str(row.get('NFC UID', '')).strip())
-                
-                # Get today's attendance
-                today_attendance = attendance_df[attendance_df['Date'].astype(str) == today]
-                present_uids = set(today_attendance['Student UID'].unique())
-                
-                # Intersection
-                return present_uids & section_uids
+                return self.attendance_index.present_uids_by_section(self.today(), section)
             except Exception as e:
                 print(f"[DEBUG] Error in get_present_uids_today_by_section: {e}")
                 return set()
 
+    def get_present_list_today_by_section(self, section):
+        """Get (name, time, uid) tuples for today's scans of a section"""
+        with self.lock:
+            try:
+                return self.attendance_index.section_rows(self.today(), section)
+            except Exception as e:
+                print(f"[DEBUG] Error in get_present_list_today_by_section: {e}")
+                return []
+
+    def clear_attendance_for_date(self, date):
+        """Remove every attendance record of a date"""
+        with self.lock:
+            try:
+                self._rewrite_attendance(lambda df: df[df['Date'] != date])
+                # Taps logged since the rotate are in the journal, not the
+                # rewrite; reload the day rather than clearing it
+                self.attendance_index.drop(date)
+                return True
+            except Exception as e:
+                print(f"[DEBUG] Error in clear_attendance_for_date: {e}")
+                return False
+
+    def remove_attendance_for_uid(self, uid, date):
+        """Remove all attendance records of a UID on a date"""
+        with self.lock:
+            try:
+                self._rewrite_attendance(
+                    lambda df: df[~((df['Student UID'].astype(str).str.strip().str.upper() == uid.upper()) &
+                                    (df['Date'].astype(str).str.strip() == date))]
+                )
+                self.attendance_index.drop(date)
+                return True
+            except Exception as e:
+                print(f"[DEBUG] Error in remove_attendance_for_uid: {e}")
+                return False
+
     def get_absent_students(self, present_uids):
         """Get absent students (not in present_uids)"""
         with self.lock:
@@ -345,36 +489,6 @@ class ExcelDatabaseManager:
                 print(f"[DEBUG] Error in get_absent_students: {e}")
                 return []
 
-    def get_all_students_dict(self):
-        """Get all students as list of dictionaries"""
-        students_tuples = self.get_all_students()
-        result = []
-        for student in students_tuples:
-            result.append({
-                'name': student[0],
-                'enroll_no': student[1],
-                'roll_no': student[2],
-                'section': student[3],
-                'subject': student[4],
-                'uid': student[5]
-            })
-        return result
-    
-    def get_students_by_section_dict(self, section):
-        """Get students by section as list of dictionaries"""
-        students_tuples = self.get_students_by_section(section)
-        result = []
-        for student in students_tuples:
-            result.append({
-                'name': student[0],
-                'enroll_no': student[1],
-                'roll_no': student[2],
-                'section': student[3],
-                'subject': student[4],
-                'uid': student[5]
-            })
-        return result
-
     def export_students_to_excel(self, filename):
         """Export all students data to Excel file"""
         with self.lock:
@@ -388,6 +502,80 @@ class ExcelDatabaseManager:
             except Exception as e:
                 return False, f"Export failed: {str(e)}"
 
+    def iter_students_export(self, section=None, chunk_size=1000):
+        """Stream students in chunks"""
+        with self.lock:
+            students = self._load_students()
+        if section:
+            key = str(section).strip().upper()
+            students = [s for s in students if str(s[3]).strip().upper() == key]
+        for start in range(0, len(students), chunk_size):
+            yield students[start:start + chunk_size]
+
+    def iter_attendance_export(self, date_from=None, date_to=None, section=None, chunk_size=1000):
+        """Stream attendance.xlsx (read-only openpyxl) plus journaled taps,
+        joined to students, without loading the whole sheet. The workbook,
+        journal and students are snapshotted under self.lock, which is
+        released before the first chunk, so a slow download does not block
+        other calls."""
+        from openpyxl import load_workbook
+        section_key = str(section).strip().upper() if section else None
+
+        with self.lock:
+            students = self.student_index.snapshot()
+            records = self.journal.records()
+            fd, snapshot_file = tempfile.mkstemp(suffix='.xlsx')
+            os.close(fd)
+            try:
+                shutil.copyfile(self.attendance_file, snapshot_file)
+            except Exception:
+                os.remove(snapshot_file)
+                raise
+
+        def export_row(uid, date, time_str):
+            date = str(date or '')
+            if (date_from and date < date_from) or (date_to and date > date_to):
+                return None
+            student = students.get(normalize_uid(uid))
+            if not student or (section_key and str(student[3]).strip().upper() != section_key):
+                return None
+            return tuple(student) + (str(time_str or ''), date)
+
+        try:
+            # Journal rows that already reached the workbook (interrupted
+            # compaction) are skipped, as in _merge_journal
+            pending = {(str(r.get('Student UID', '')), str(r.get('Timestamp', ''))): r
+                       for r in records}
+            wb = load_workbook(snapshot_file, read_only=True)
+            try:
+                rows = wb['Attendance'].iter_rows(values_only=True)
+                header = [str(c or '').strip() for c in next(rows, ())]
+                idx = [header.index(c) if c in header else None for c in ATTENDANCE_COLUMNS]
+                chunk = []
+                for values in rows:
+                    uid, date, time_str, stamp = ('' if i is None or i >= len(values) or values[i] is None
+                                                  else str(values[i]) for i in idx)
+                    pending.pop((uid, stamp), None)
+                    row = export_row(uid, date, time_str)
+                    if row:
+                        chunk.append(row)
+                        if len(chunk) >= chunk_size:
+                            yield chunk
+                            chunk = []
+            finally:
+                wb.close()
+            for record in pending.values():
+                row = export_row(record.get('Student UID'), record.get('Date'), record.get('Time'))
+                if row:
+                    chunk.append(row)
+            if chunk:
+                yield chunk
+        finally:
+            try:
+                os.remove(snapshot_file)
+            except OSError:
+                pass
+
     def export_attendance_to_excel(self, filename, date=None):
         """Export attendance data to Excel file"""
         with self.lock:
@@ -395,43 +583,21 @@ class ExcelDatabaseManager:
                 if not date:
                     date = (datetime.utcnow() + Config.TIMEZONE_OFFSET).strftime("%Y-%m-%d")
                 
-                attendance_df = pd.read_excel(self.attendance_file, sheet_name='Attendance', dtype=str)
+                attendance_df = self._read_attendance_df()
                 students_df = pd.read_excel(self.students_file, sheet_name='Students', dtype=str)
                 
-                attendance_df = attendance_df.fillna('')
-                students_df = students_df.fillna('')
-                
                 # Filter by date
+                attendance_df = attendance_df.fillna('')
                 today_attendance = attendance_df[attendance_df['Date'].astype(str) == date]
                 if len(today_attendance) == 0:
                     return False, f"No attendance data for {date}"
                 
                 # Join with students
-                students_df.columns = [col.strip().lower() for col in students_df.columns]
-                today_attendance_lower = today_attendance.copy()
-                today_attendance_lower.columns = [col.strip().lower() for col in today_attendance_lower.columns]
-                
-                result = []
-                for _, att_row in today_attendance_lower.iterrows():
-                    uid = str(att_row.get('student uid', '')).strip()
-                    for _, stu_row in students_df.iterrows():
-                        if str(stu_row.get('nfc uid', '')).strip().upper() == uid.upper():
-                            result.append({
-                                'Name': stu_row.get('name', ''),
-                                'Enrollment No': stu_row.get('enrollment no', ''),
-                                'Roll No': stu_row.get('roll no', ''),
-                                'Section': stu_row.get('section', ''),
-                                'Subject': stu_row.get('subject', ''),
-                                'Time': att_row.get('time', ''),
-                                'Date': att_row.get('date', '')
-                            })
-                            break
-                
-                if not result:
+                df_export = join_attendance_students(today_attendance, students_df)
+                if len(df_export) == 0:
                     return False, f"No attendance data for {date}"
                 
-                df_export = pd.DataFrame(result)
                 df_export.to_excel(filename, index=False, sheet_name='Attendance')
-                return True, f"Exported {len(result)} attendance records to {filename}"
+                return True, f"Exported {len(df_export)} attendance records to {filename}"
             except Exception as e:
                 return False, f"Export failed: {str(e)}"
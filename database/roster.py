@@ -0,0 +1,186 @@
+# database/roster.py - Cached section roster workbooks
+import os
+from threading import Lock, Thread
+from config import Config
+from .index import normalize_uid, file_signature
+
+# Signature that never matches a file, marking a roster for re-read
+_STALE = object()
+
+class SectionRoster:
+    """Parsed rows of one section workbook with UID and name lookups"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.by_uid = {}
+        self.by_name = {}
+        for row in self.rows:
+            if row['uid']:
+                self.by_uid.setdefault(row['uid'], row)
+            self.by_name.setdefault(row['name'], row)
+
+def _parse_roster(path, section):
+    """Rows {name, enroll, roll, subject, section, uid} of a section workbook"""
+    import pandas as pd
+    try:
+        df = pd.read_excel(path, sheet_name=section, dtype=str)
+    except Exception:
+        df = pd.read_excel(path, dtype=str)
+    df = df.fillna('')
+    # Normalize columns
+    col = {str(c).strip().lower(): c for c in df.columns}
+    def column(key):
+        return [str(v).strip() for v in df[col[key]]] if key in col else [''] * len(df)
+    rows = []
+    for name, enroll, roll, subject, sec, uid in zip(
+            column('name'), column('enrollment no'), column('roll no'),
+            column('subject'), column('section'), column('uid')):
+        if not name:
+            continue
+        rows.append({'name': name, 'enroll': enroll, 'roll': roll, 'subject': subject,
+                     'section': sec or section, 'uid': normalize_uid(uid)})
+    return rows
+
+class RosterCache:
+    """Section rosters parsed once and re-read only when the workbook changes.
+
+    Each lookup costs one os.stat of the section file; the workbook is
+    parsed again only if its (mtime, size) changed or `invalidate` was called.
+    Every loaded roster also feeds a UID -> section index across all
+    sections, built in the background by `start_indexing` and kept current
+    by `refresh`; callers that change the section workbooks use one of the
+    two. A UID listed in several workbooks belongs to the most recently
+    modified one.
+    """
+
+    def __init__(self, base_dir, parser=_parse_roster):
+        self.base_dir = base_dir
+        self.parser = parser
+        self.lock = Lock()
+        self._rosters = {}  # section -> (signature, SectionRoster)
+        self._owner = {}    # UID -> section
+        self._mtimes = {}   # section -> mtime of the loaded workbook
+        self._indexed = False
+        self._index_lock = Lock()
+
+    def path_for(self, section):
+        return os.path.join(self.base_dir, f'{section}.xlsx')
+
+    def sections(self):
+        """Sections that have a roster workbook"""
+        if not os.path.isdir(self.base_dir):
+            return []
+        return [f.rsplit('.', 1)[0] for f in os.listdir(self.base_dir) if f.lower().endswith('.xlsx')]
+
+    def _newest_owner(self, uid):
+        """Section with the newest workbook listing uid. Caller holds self.lock"""
+        owners = [s for s, (_, roster) in self._rosters.items() if uid in roster.by_uid]
+        return max(owners, key=lambda s: (self._mtimes.get(s, -1), s)) if owners else None
+
+    def _store(self, section, sig, roster):
+        with self.lock:
+            old = self._rosters.get(section)
+            self._rosters[section] = (sig, roster)
+            mtime = sig[0] if isinstance(sig, tuple) else -1
+            self._mtimes[section] = mtime
+            for uid in roster.by_uid:
+                owner = self._owner.get(uid)
+                if owner is None or owner == section or self._mtimes.get(owner, -1) <= mtime:
+                    self._owner[uid] = section
+            if old is not None:
+                # UIDs dropped from this workbook fall back to another section
+                for uid in old[1].by_uid:
+                    if uid not in roster.by_uid and self._owner.get(uid) == section:
+                        owner = self._newest_owner(uid)
+                        if owner is None:
+                            del self._owner[uid]
+                        else:
+                            self._owner[uid] = owner
+
+    def get(self, section):
+        """SectionRoster of a section (empty if it has no workbook)"""
+        path = self.path_for(section)
+        sig = file_signature(path)
+        with self.lock:
+            cached = self._rosters.get(section)
+            if cached is not None and cached[0] == sig:
+                return cached[1]
+        roster = SectionRoster()
+        if sig is not None:
+            try:
+                roster = SectionRoster(self.parser(path, section))
+                print(f"[DEBUG] Loaded roster {section} ({len(roster.rows)} students)")
+            except Exception as e:
+                print(f"[DEBUG] Error reading roster: {e}")
+        self._store(section, sig, roster)
+        return roster
+
+    def find_by_uid(self, section, uid):
+        row = self.get(section).by_uid.get(normalize_uid(uid))
+        return dict(row) if row else None
+
+    def find_by_name(self, section, name):
+        row = self.get(section).by_name.get(str(name or '').strip())
+        return dict(row) if row else None
+
+    def build_index(self):
+        """Load every section workbook (unchanged ones are skipped) and drop
+        sections whose workbook was deleted"""
+        with self._index_lock:
+            sections = self.sections()
+            for section in sections:
+                self.get(section)
+            with self.lock:
+                gone = [s for s in self._rosters if s not in sections]
+            for section in gone:
+                self._store(section, None, SectionRoster())
+                with self.lock:
+                    del self._rosters[section]
+                    self._mtimes.pop(section, None)
+            if not self._indexed:
+                print(f"[DEBUG] Roster UID index covers {len(self._owner)} UIDs in {len(sections)} sections")
+            self._indexed = True
+
+    def start_indexing(self):
+        """Build (or refresh) the UID -> section index on a background thread"""
+        Thread(target=self.build_index, daemon=True, name="roster-index").start()
+
+    def _indexed_row(self, key):
+        """Row of the owning section, re-reading that workbook if it changed"""
+        with self.lock:
+            section = self._owner.get(key)
+        if section is None:
+            return None
+        self.get(section)
+        with self.lock:
+            section = self._owner.get(key)
+            row = self._rosters[section][1].by_uid.get(key) if section in self._rosters else None
+        return row
+
+    def find_in_any_section(self, uid):
+        """Roster row of the section owning a UID, or None.
+
+        A miss is a dict lookup and never touches the filesystem; workbooks
+        added or edited outside `start_indexing`/`refresh` are picked up by
+        the next rebuild.
+        """
+        if not self._indexed:
+            self.build_index()
+        row = self._indexed_row(normalize_uid(uid))
+        return dict(row) if row else None
+
+    def invalidate(self, section=None):
+        """Force a re-read of one section (or all) on next lookup; the UID
+        index keeps the old rows until then"""
+        with self.lock:
+            for name in ([section] if section is not None else list(self._rosters)):
+                if name in self._rosters:
+                    self._rosters[name] = (_STALE, self._rosters[name][1])
+
+    def refresh(self, section):
+        """Re-read a section now, e.g. after its workbook was rewritten"""
+        self.invalidate(section)
+        return self.get(section)
+
+# Shared by the web app and the scanner
+roster_cache = RosterCache(Config.SECTIONS_DIR)
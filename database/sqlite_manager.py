@@ -0,0 +1,483 @@
+# database/sqlite_manager.py - SQLite-based database operations
+import os
+import sqlite3
+from datetime import datetime
+from threading import Lock
+from config import Config
+from .base import DatabaseManager
+from .index import StudentIndex, AttendanceIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL DEFAULT '',
+    enrollment_no TEXT NOT NULL DEFAULT '',
+    roll_no TEXT NOT NULL DEFAULT '',
+    section TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    subject TEXT NOT NULL DEFAULT '',
+    nfc_uid TEXT NOT NULL DEFAULT '' COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS idx_students_nfc_uid ON students (nfc_uid);
+CREATE INDEX IF NOT EXISTS idx_students_section ON students (section);
+
+CREATE TABLE IF NOT EXISTS attendance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_uid TEXT NOT NULL COLLATE NOCASE,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL DEFAULT '',
+    timestamp TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance (date, student_uid);
+CREATE INDEX IF NOT EXISTS idx_attendance_uid ON attendance (student_uid);
+
+CREATE TABLE IF NOT EXISTS admins (
+    name TEXT NOT NULL,
+    password TEXT NOT NULL DEFAULT '',
+    nfc_card TEXT NOT NULL DEFAULT ''
+);
+"""
+
+DEFAULT_ADMINS = [
+    ('admin', 'admin123', 'not_required'),
+    ('hod', 'hod123', '893002029932'),
+    ('class', 'class123', 'not_required'),
+]
+
+STUDENT_COLUMNS = "name, enrollment_no, roll_no, section, subject, nfc_uid"
+EXPORT_COLUMNS = "s.name, s.enrollment_no, s.roll_no, s.section, s.subject, a.time, a.date"
+# Each scan joined to the first student registered with its UID, like the
+# Excel backend; scans of unregistered UIDs are dropped
+EXPORT_JOIN = ("attendance a JOIN students s ON s.id = "
+               "(SELECT MIN(id) FROM students WHERE nfc_uid = a.student_uid)")
+
+
+class SQLiteDatabaseManager(DatabaseManager):
+    """Live store backed by SQLite in WAL mode.
+
+    The Excel files used by ExcelDatabaseManager are imported once when the
+    database is created and remain available through the export methods.
+    """
+
+    def __init__(self, db_file=None):
+        self.lock = Lock()
+        # Absolute, so export streams opening their own connection do not
+        # depend on the working directory at download time
+        self.db_file = os.path.abspath(db_file or Config.SQLITE_FILE)
+        self.students_file = "data/students.xlsx"
+        self.attendance_file = "data/attendance.xlsx"
+        self.admins_file = "data/admins.xlsx"
+        self.conn = self._connect()
+        # data_version only moves when another connection commits, so
+        # writes made through this manager update the index in place
+        self.student_index = StudentIndex(
+            lambda: self.conn.execute(f"SELECT {STUDENT_COLUMNS} FROM students ORDER BY id").fetchall(),
+            self._data_version
+        )
+        self.attendance_index = AttendanceIndex(
+            lambda date: self.conn.execute(
+                "SELECT student_uid, time FROM attendance WHERE date = ? ORDER BY id", (date,)
+            ).fetchall(),
+            self.student_index,
+            self._data_version
+        )
+        self.ensure_schema()
+
+    def _data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _connect(self):
+        directory = os.path.dirname(self.db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Shared by the scanner thread and Flask workers, serialised by self.lock
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def ensure_schema(self):
+        """Create tables and indexes, importing legacy Excel data on first run"""
+        with self.lock:
+            is_new = self.conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name = 'students'"
+            ).fetchone()[0] == 0
+            self.conn.executescript(SCHEMA)
+            self.conn.commit()
+
+        if is_new:
+            self.import_from_excel()
+        with self.lock:
+            if self.conn.execute("SELECT COUNT(*) FROM admins").fetchone()[0] == 0:
+                self.conn.executemany(
+                    "INSERT INTO admins (name, password, nfc_card) VALUES (?, ?, ?)",
+                    DEFAULT_ADMINS
+                )
+                self.conn.commit()
+                print(f"[DEBUG] Created default admins in {self.db_file}")
+
+    def import_from_excel(self, students_file=None, attendance_file=None, admins_file=None):
+        """Load students, attendance and admins from the Excel workbooks"""
+        students_file = students_file or self.students_file
+        attendance_file = attendance_file or self.attendance_file
+        admins_file = admins_file or self.admins_file
+        if not any(os.path.exists(f) for f in (students_file, attendance_file, admins_file)):
+            return False
+        try:
+            import pandas as pd
+        except ImportError:
+            print("[WARN] pandas not installed. Skipping Excel import.")
+            return False
+
+        def read(path, sheet_name=0):
+            if not os.path.exists(path):
+                return None
+            df = pd.read_excel(path, sheet_name=sheet_name, dtype=str)
+            return df.fillna('')
+
+        try:
+            students_df = read(students_file, 'Students')
+            attendance_df = read(attendance_file, 'Attendance')
+            admins_df = read(admins_file)
+            with self.lock:
+                if students_df is not None:
+                    self.conn.executemany(
+                        f"INSERT INTO students ({STUDENT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                        [tuple(str(row.get(c, '')).strip() for c in
+                               ('Name', 'Enrollment No', 'Roll No', 'Section', 'Subject', 'NFC UID'))
+                         for _, row in students_df.iterrows()]
+                    )
+                if attendance_df is not None:
+                    self.conn.executemany(
+                        "INSERT INTO attendance (student_uid, date, time, timestamp) VALUES (?, ?, ?, ?)",
+                        [tuple(str(row.get(c, '')).strip() for c in
+                               ('Student UID', 'Date', 'Time', 'Timestamp'))
+                         for _, row in attendance_df.iterrows()]
+                    )
+                if admins_df is not None:
+                    self.conn.executemany(
+                        "INSERT INTO admins (name, password, nfc_card) VALUES (?, ?, ?)",
+                        [tuple(str(row.get(c, '')).strip() for c in ('Name', 'Password', 'NFCCard'))
+                         for _, row in admins_df.iterrows()]
+                    )
+                self.conn.commit()
+            self.student_index.invalidate()
+            self.attendance_index.invalidate()
+            print(f"[DEBUG] Imported Excel data into {self.db_file}")
+            return True
+        except Exception as e:
+            print(f"[DEBUG] Error in import_from_excel: {e}")
+            return False
+
+    def get_student_by_uid(self, uid):
+        """Get student by NFC UID"""
+        with self.lock:
+            try:
+                return self.student_index.get(uid)
+            except Exception as e:
+                print(f"[DEBUG] Error in get_student_by_uid: {e}")
+                return None
+
+    def add_student(self, name, enroll_no, roll_no, section, subject, uid):
+        """Add new student"""
+        with self.lock:
+            try:
+                uid = str(uid or '').strip()
+                exists = self.student_index.get(uid) or self.conn.execute(
+                    "SELECT 1 FROM students WHERE nfc_uid = ? LIMIT 1", (uid,)
+                ).fetchone()
+                if exists:
+                    print(f"[DEBUG] UID already exists: {uid}")
+                    return False
+
+                student = (name, enroll_no or '', roll_no or '', str(section or '').strip(), subject or '', uid)
+                self.conn.execute(
+                    f"INSERT INTO students ({STUDENT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                    student
+                )
+                self.conn.commit()
+                self.student_index.add(student)
+                self.attendance_index.student_added(uid, student[3])
+                print(f"[DEBUG] Added student: {name} with UID: {uid}")
+                return True
+            except Exception as e:
+                print(f"[DEBUG] Error in add_student: {e}")
+                return False
+
+    def add_students_bulk(self, students):
+        """Add many students in one transaction"""
+        with self.lock:
+            outcomes, rows = self._prepare_bulk(students, lambda uid: uid in self.student_index)
+            if not rows:
+                return outcomes
+            try:
+                self.conn.executemany(
+                    f"INSERT INTO students ({STUDENT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                    [s for _, s in rows]
+                )
+                self.conn.commit()
+            except Exception as e:
+                print(f"[DEBUG] Error in add_students_bulk: {e}")
+                self.conn.rollback()
+                for i, _ in rows:
+                    outcomes[i] = 'error'
+                return outcomes
+            for _, student in rows:
+                self.student_index.add(student)
+                self.attendance_index.student_added(student[5], student[3])
+            print(f"[DEBUG] Bulk added {len(rows)} students")
+            return outcomes
+
+    def log_attendance(self, uid):
+        """Log attendance for a student; returns the stored time (HH:MM:SS)"""
+        with self.lock:
+            try:
+                now = datetime.utcnow() + Config.TIMEZONE_OFFSET
+                date = now.strftime("%Y-%m-%d")
+                time_str = now.strftime("%H:%M:%S")
+                self.conn.execute(
+                    "INSERT INTO attendance (student_uid, date, time, timestamp) VALUES (?, ?, ?, ?)",
+                    (uid, date, time_str, now.isoformat())
+                )
+                self.conn.commit()
+                self.attendance_index.record(uid, date, time_str)
+                print(f"[DEBUG] Logged attendance for UID: {uid}")
+                return time_str
+            except Exception as e:
+                print(f"[DEBUG] Error in log_attendance: {e}")
+                return None
+
+    def get_today_stats(self):
+        """Get today's attendance statistics"""
+        with self.lock:
+            try:
+                total = self.student_index.count()
+                present = self.attendance_index.present_count(self.today())
+                return total, present
+            except Exception as e:
+                print(f"[DEBUG] Error in get_today_stats: {e}")
+                return 0, 0
+
+    def authenticate_admin(self, username, password, nfc_uid=None):
+        """Authenticate admin against the admins table"""
+        with self.lock:
+            try:
+                rows = self.conn.execute("SELECT name, password, nfc_card FROM admins").fetchall()
+                for name, admin_pass, admin_nfc in rows:
+                    admin_name = str(name).strip().lower()
+                    admin_nfc = str(admin_nfc).strip().upper()
+
+                    if username and password:
+                        if admin_name == username.lower() and str(admin_pass).strip() == password:
+                            return True, admin_name
+
+                    if nfc_uid:
+                        nfc_uid_clean = str(nfc_uid).strip().upper()
+                        if admin_nfc and admin_nfc != 'NOT_REQUIRED' and admin_nfc == nfc_uid_clean:
+                            return True, admin_name
+
+                print(f"[DEBUG] No authentication match found")
+                return False, None
+            except Exception as e:
+                print(f"[DEBUG] Error in authenticate_admin: {e}")
+                if username == "admin" and password == "admin123":
+                    return True, "admin"
+                return False, None
+
+    def get_recent_attendance(self, limit=10):
+        """Get recent attendance records"""
+        with self.lock:
+            try:
+                return self.attendance_index.recent(self.today(), limit)
+            except Exception as e:
+                print(f"[DEBUG] Error in get_recent_attendance: {e}")
+                return []
+
+    def get_all_students(self):
+        """Get all students"""
+        with self.lock:
+            try:
+                rows = self.conn.execute(
+                    f"SELECT {STUDENT_COLUMNS} FROM students ORDER BY id"
+                ).fetchall()
+                return [tuple(r) for r in rows]
+            except Exception as e:
+                print(f"[DEBUG] Error in get_all_students: {e}")
+                return []
+
+    def get_students_by_section(self, section):
+        """Get students by section"""
+        with self.lock:
+            try:
+                rows = self.conn.execute(
+                    f"SELECT {STUDENT_COLUMNS} FROM students WHERE section = ? ORDER BY id",
+                    (str(section).strip(),)
+                ).fetchall()
+                return [tuple(r) for r in rows]
+            except Exception as e:
+                print(f"[DEBUG] Error in get_students_by_section: {e}")
+                return []
+
+    def count_students(self):
+        """Get number of registered students"""
+        with self.lock:
+            try:
+                return self.conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+            except Exception as e:
+                print(f"[DEBUG] Error in count_students: {e}")
+                return 0
+
+    def remove_section(self, section):
+        """Remove all students of a section together with their attendance"""
+        with self.lock:
+            try:
+                section = str(section).strip()
+                self.conn.execute(
+                    "DELETE FROM attendance WHERE student_uid IN "
+                    "(SELECT nfc_uid FROM students WHERE section = ? AND nfc_uid != '')",
+                    (section,)
+                )
+                self.conn.execute("DELETE FROM students WHERE section = ?", (section,))
+                self.conn.commit()
+                self.student_index.invalidate()
+                self.attendance_index.invalidate()
+                return True
+            except Exception as e:
+                print(f"[DEBUG] Error in remove_section: {e}")
+                return False
+
+    def get_present_uids_today(self):
+        """Get all UIDs present today"""
+        with self.lock:
+            try:
+                return self.attendance_index.present_uids(self.today())
+            except Exception as e:
+                print(f"[DEBUG] Error in get_present_uids_today: {e}")
+                return set()
+
+    def get_present_uids_today_by_section(self, section):
+        """Get UIDs present today for a specific section"""
+        with self.lock:
+            try:
+                return self.attendance_index.present_uids_by_section(self.today(), section)
+            except Exception as e:
+                print(f"[DEBUG] Error in get_present_uids_today_by_section: {e}")
+                return set()
+
+    def get_present_list_today_by_section(self, section):
+        """Get (name, time, uid) tuples for today's scans of a section"""
+        with self.lock:
+            try:
+                return self.attendance_index.section_rows(self.today(), section)
+            except Exception as e:
+                print(f"[DEBUG] Error in get_present_list_today_by_section: {e}")
+                return []
+
+    def get_absent_students(self, present_uids):
+        """Get absent students (not in present_uids)"""
+        students = self.get_all_students()
+        if not present_uids:
+            return students
+        present = {str(u).strip().upper() for u in present_uids}
+        return [s for s in students if s[5] and s[5].upper() not in present]
+
+    def clear_attendance_for_date(self, date):
+        """Remove every attendance record of a date"""
+        with self.lock:
+            try:
+                self.conn.execute("DELETE FROM attendance WHERE date = ?", (date,))
+                self.conn.commit()
+                self.attendance_index.clear(date)
+                return True
+            except Exception as e:
+                print(f"[DEBUG] Error in clear_attendance_for_date: {e}")
+                return False
+
+    def remove_attendance_for_uid(self, uid, date):
+        """Remove all attendance records of a UID on a date"""
+        with self.lock:
+            try:
+                self.conn.execute(
+                    "DELETE FROM attendance WHERE student_uid = ? AND date = ?",
+                    (str(uid).strip(), date)
+                )
+                self.conn.commit()
+                self.attendance_index.remove(uid, date)
+                return True
+            except Exception as e:
+                print(f"[DEBUG] Error in remove_attendance_for_uid: {e}")
+                return False
+
+    def export_students_to_excel(self, filename):
+        """Export all students data to Excel file"""
+        try:
+            import pandas as pd
+            students = self.get_all_students()
+            if not students:
+                return False, "No students to export"
+
+            df = pd.DataFrame(students, columns=['Name', 'Enrollment No', 'Roll No', 'Section', 'Subject', 'NFC UID'])
+            df.to_excel(filename, index=False, sheet_name='Students')
+            return True, f"Exported {len(df)} students to {filename}"
+        except Exception as e:
+            return False, f"Export failed: {str(e)}"
+
+    def _iter_query(self, sql, params, chunk_size):
+        # Own connection so a slow download never holds self.lock; WAL
+        # lets it read a consistent snapshot while taps keep committing
+        conn = sqlite3.connect(self.db_file)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def iter_students_export(self, section=None, chunk_size=1000):
+        """Stream students in chunks"""
+        sql = f"SELECT {STUDENT_COLUMNS} FROM students"
+        params = ()
+        if section:
+            sql += " WHERE section = ?"
+            params = (str(section).strip(),)
+        return self._iter_query(sql + " ORDER BY id", params, chunk_size)
+
+    def iter_attendance_export(self, date_from=None, date_to=None, section=None, chunk_size=1000):
+        """Stream attendance joined to students in chunks"""
+        sql = f"SELECT {EXPORT_COLUMNS} FROM {EXPORT_JOIN} WHERE 1 = 1"
+        params = []
+        if date_from:
+            sql += " AND a.date >= ?"
+            params.append(date_from)
+        if date_to:
+            sql += " AND a.date <= ?"
+            params.append(date_to)
+        if section:
+            sql += " AND s.section = ?"
+            params.append(str(section).strip())
+        return self._iter_query(sql + " ORDER BY a.id", params, chunk_size)
+
+    def export_attendance_to_excel(self, filename, date=None):
+        """Export attendance data to Excel file"""
+        try:
+            import pandas as pd
+            if not date:
+                date = self.today()
+
+            with self.lock:
+                rows = self.conn.execute(
+                    f"SELECT {EXPORT_COLUMNS} FROM {EXPORT_JOIN} WHERE a.date = ? ORDER BY a.id",
+                    (date,)
+                ).fetchall()
+            if not rows:
+                return False, f"No attendance data for {date}"
+
+            df_export = pd.DataFrame(
+                rows, columns=['Name', 'Enrollment No', 'Roll No', 'Section', 'Subject', 'Time', 'Date']
+            )
+            df_export.to_excel(filename, index=False, sheet_name='Attendance')
+            return True, f"Exported {len(rows)} attendance records to {filename}"
+        except Exception as e:
+            return False, f"Export failed: {str(e)}"
@@ -1,4 +1,5 @@
 # models/session.py - Session management
+import uuid
 from datetime import datetime
 from config import Config
 
@@ -10,6 +11,7 @@ class SessionManager:
 
     def start_session(self, name, duration_minutes=60, **kwargs):
         self.current_session = {
+            'id': uuid.uuid4().hex[:12],  # names the session's Socket.IO room
             'name': name,
             'start_time': datetime.utcnow() + Config.TIMEZONE_OFFSET,
             'duration': duration_minutes,
@@ -0,0 +1,116 @@
+# models/session_lists.py - Live waiting/present lists per section
+import threading
+from collections import OrderedDict
+
+def _section_key(section):
+    return str(section or '').strip().upper()
+
+class SessionLists:
+    """Waiting and present lists of each section, kept in memory.
+
+    `loader(section)` returns (roster, present_rows): roster dicts with
+    name/roll/uid and (name, time, uid) rows of today's attendance. A section is
+    loaded once; afterwards `mark_present` / `mark_absent` apply single taps
+    and return the delta to broadcast, or None if nothing changed.
+
+    Callers write the store before calling `mark_*`, so a section that has
+    to be (re)loaded at that point already contains the change. Such calls
+    return the full lists with `reset: True` instead of a delta.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.lock = threading.Lock()
+        self._sections = {}
+
+    def _state(self, section):
+        """(state, loaded): loaded is True if the section was just read from the store"""
+        key = _section_key(section)
+        state = self._sections.get(key)
+        if state is not None:
+            return state, False
+        roster, present_rows = self.loader(section)
+        present = OrderedDict()
+        for name, time_val, uid in present_rows:
+            present.setdefault(str(uid or '').strip().upper(), {'name': name, 'time': time_val})
+        state = {
+            'roster': [{'name': r.get('name'), 'roll_no': r.get('roll'),
+                        'uid': (r.get('uid') or '').upper()} for r in roster],
+            'present': present
+        }
+        self._sections[key] = state
+        return state, True
+
+    @staticmethod
+    def _counts(state):
+        total = len(state['roster'])
+        present = len(state['present'])
+        return {'total': total, 'present': present, 'absent': total - present}
+
+    def _roster_entry(self, state, uid):
+        for r in state['roster']:
+            if r['uid'] and r['uid'] == uid:
+                return r
+        return None
+
+    def _snapshot(self, state):
+        waiting = [{'name': r['name'], 'roll_no': r['roll_no']} for r in state['roster']
+                   if not (r['uid'] and r['uid'] in state['present'])]
+        result = self._counts(state)
+        result['waiting'] = waiting
+        result['present_list'] = list(state['present'].values())
+        return result
+
+    def _reset(self, section, state):
+        result = self._snapshot(state)
+        result.update({'section': section, 'reset': True})
+        return result
+
+    def snapshot(self, section):
+        """Full lists for initial load or resync"""
+        with self.lock:
+            state, _ = self._state(section)
+            return self._snapshot(state)
+
+    def mark_present(self, section, uid, name, time_val):
+        """Record a tap; returns the `student_present` delta"""
+        uid = str(uid or '').strip().upper()
+        with self.lock:
+            state, loaded = self._state(section)
+            if loaded:
+                return self._reset(section, state)
+            if not uid or uid in state['present']:
+                return None
+            entry = self._roster_entry(state, uid)
+            if entry is None:
+                # Registered after the roster was loaded
+                entry = {'name': name, 'roll_no': '', 'uid': uid}
+                state['roster'].append(entry)
+            state['present'][uid] = {'name': entry['name'] or name, 'time': time_val}
+            delta = {'section': section, 'name': entry['name'] or name,
+                     'roll_no': entry['roll_no'], 'time': time_val}
+            delta.update(self._counts(state))
+            return delta
+
+    def mark_absent(self, section, uid):
+        """Undo a tap; returns the `student_removed` delta"""
+        uid = str(uid or '').strip().upper()
+        with self.lock:
+            state, loaded = self._state(section)
+            if loaded:
+                return self._reset(section, state)
+            row = state['present'].pop(uid, None)
+            if row is None:
+                return None
+            entry = self._roster_entry(state, uid) or {}
+            delta = {'section': section, 'name': row['name'], 'roll_no': entry.get('roll_no') or ''}
+            delta.update(self._counts(state))
+            return delta
+
+    def invalidate(self, section=None):
+        """Reload one section (or all) from the store on next access"""
+        with self.lock:
+            if section is None:
+                self._sections.clear()
+            else:
+                self._sections.pop(_section_key(section), None)
@@ -1,7 +1,17 @@
 # models/voice.py - Voice feedback system
+import hashlib
+import os
+import platform
+import shutil
+import subprocess
+import threading
+from collections import deque
 import pyttsx3
+from config import Config
 
 class VoiceEngine:
+    RATE = 150
+    VOLUME = 0.8
     _engine = None
 
     @classmethod
@@ -9,17 +19,182 @@ class VoiceEngine:
         if cls._engine is None:
             try:
                 cls._engine = pyttsx3.init()
-                cls._engine.setProperty('rate', 150)
-                cls._engine.setProperty('volume', 0.8)
+                cls._engine.setProperty('rate', cls.RATE)
+                cls._engine.setProperty('volume', cls.VOLUME)
             except Exception:
                 cls._engine = None
         return cls._engine
 
-def voice_feedback(text):
-    try:
+# Fixed prompts rendered to audio once and replayed from disk
+FIXED_PROMPTS = (
+    "Not from this session",
+    "Unknown card detected. Please register student.",
+    "Session started. Ready for scanning.",
+    "Session ended",
+    "Attendance closed and report generated",
+)
+
+def play_wav(path):
+    """Play an audio file synchronously; returns False if no player is available"""
+    system = platform.system()
+    if system == 'Windows':
+        import winsound
+        winsound.PlaySound(path, winsound.SND_FILENAME)
+        return True
+    player = 'afplay' if system == 'Darwin' else 'aplay'
+    if not shutil.which(player):
+        return False
+    return subprocess.run([player, path], stdout=subprocess.DEVNULL,
+                          stderr=subprocess.DEVNULL).returncode == 0
+
+class PromptCache:
+    """On-disk cache of rendered prompts keyed by text, rate and volume"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def path_for(self, text):
+        key = f"{text}|{VoiceEngine.RATE}|{VoiceEngine.VOLUME}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.wav")
+
+    def get(self, text):
+        """Path of the cached clip for text, or None"""
+        path = self.path_for(text)
+        return path if os.path.exists(path) else None
+
+    def render(self, engine, text):
+        """Synthesise text to the cache (must run on the voice worker thread)"""
+        path = self.path_for(text)
+        if os.path.exists(path):
+            return path
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = path + '.tmp.wav'
+        engine.save_to_file(text, tmp)
+        engine.runAndWait()
+        if not os.path.exists(tmp):
+            return None
+        os.replace(tmp, path)
+        print(f"[DEBUG] Cached voice prompt: {text}")
+        return path
+
+# Messages sharing one of these prefixes replace each other while queued,
+# so a burst of taps speaks only the latest name.
+COALESCE_PREFIXES = ('Welcome', 'Already scanned', 'Not from this session', 'Unknown card')
+
+def _coalesce_key(text):
+    for prefix in COALESCE_PREFIXES:
+        if text.startswith(prefix):
+            return prefix
+    return text
+
+class VoiceQueue:
+    """Single TTS worker thread fed by a bounded queue.
+
+    pyttsx3 is driven only from the worker thread; callers never block.
+    A queued message with the same coalesce key is replaced in place, and
+    when the queue is full the oldest message is dropped. Fixed prompts
+    are played from the prompt cache, which the worker fills while idle.
+    """
+
+    def __init__(self, maxsize=4, prompt_cache=None):
+        self.maxsize = maxsize
+        self.prompt_cache = prompt_cache
+        self._pending = deque()
+        self._renders = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self.spoken = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True, name="voice-worker")
+            self._thread.start()
+
+    def put(self, text):
+        key = _coalesce_key(text)
+        with self._cond:
+            for i, (pending_key, _) in enumerate(self._pending):
+                if pending_key == key:
+                    self._pending[i] = (key, text)
+                    self.coalesced += 1
+                    return
+            if len(self._pending) >= self.maxsize:
+                self._pending.popleft()
+                self.dropped += 1
+            self._pending.append((key, text))
+            self._ensure_worker()
+            self._cond.notify()
+
+    def warm(self, texts=FIXED_PROMPTS):
+        """Render prompts into the cache in the background, behind any speech"""
+        if self.prompt_cache is None:
+            return
+        with self._cond:
+            self._renders.extend(t for t in texts if not self.prompt_cache.get(t))
+            if self._renders:
+                self._ensure_worker()
+                self._cond.notify()
+
+    def _speak(self, text):
+        if self.prompt_cache is not None and text in FIXED_PROMPTS:
+            path = self.prompt_cache.get(text)
+            if path and play_wav(path):
+                return
         engine = VoiceEngine.init()
         if engine:
             engine.say(text)
             engine.runAndWait()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._renders:
+                    self._cond.wait()
+                # Speech always goes before cache warming
+                speak = bool(self._pending)
+                if speak:
+                    _, text = self._pending.popleft()
+                else:
+                    text = self._renders.popleft()
+            try:
+                if speak:
+                    self._speak(text)
+                    self.spoken += 1
+                else:
+                    self._render(text)
+            except Exception:
+                pass
+
+    def _render(self, text):
+        engine = VoiceEngine.init()
+        if engine:
+            self.prompt_cache.render(engine, text)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'pending': len(self._pending),
+                'spoken': self.spoken,
+                'coalesced': self.coalesced,
+                'dropped': self.dropped
+            }
+
+voice_queue = VoiceQueue(maxsize=Config.VOICE_QUEUE_SIZE,
+                         prompt_cache=PromptCache(Config.VOICE_CACHE_DIR))
+
+def warm_voice_cache():
+    """Pre-render the fixed prompts on the voice worker thread"""
+    if Config.VOICE_ENABLED:
+        voice_queue.warm()
+
+def voice_feedback(text):
+    """Queue text for speech and return immediately"""
+    if not Config.VOICE_ENABLED:
+        return
+    try:
+        voice_queue.put(text)
     except Exception:
-        pass
\ No newline at end of file
+        pass
@@ -1,262 +1,314 @@
 # nfc/broadcom_scanner.py - Improved scanner for Broadcom NFC readers
+import threading
 import time
-from smartcard.System import readers
-from smartcard.Exceptions import NoCardException, CardConnectionException
+from smartcard.Exceptions import CardRequestTimeoutException
 from smartcard.CardType import AnyCardType
 from smartcard.CardRequest import CardRequest
 from config import Config
-from database import db
+from database import db, roster_cache
 from models import session_mgr, voice_feedback
+from .broker import reader_broker
+from .debounce import Debouncer
+from .registry import reader_registry
+from .pipeline import ScanPipeline
+from .connection import reader_connections
 
 # Excel helpers for roster lookup
 def _excel_find_by_uid(section, uid):
     try:
-        import os, pandas as pd
-        path = os.path.join('data/sections', f'{section}.xlsx')
-        if not os.path.exists(path):
-            return None
-        try:
-            df = pd.read_excel(path, sheet_name=section, dtype=str)
-        except Exception:
-            df = pd.read_excel(path, dtype=str)
-        df = df.fillna('')
-        # Normalize
-        cols = {c.strip().lower(): c for c in df.columns}
-        def get(row, key):
-            c = cols.get(key)
-            return str(row[c]).strip() if c in row else ''
-        for _, row in df.iterrows():
-            ruid = str(row.get(cols.get('uid',''), '')).strip().upper() if 'uid' in cols else ''
-            if ruid and ruid.upper() == uid.upper():
-                return {
-                    'name': get(row, 'name'),
-                    'enroll': get(row, 'enrollment no'),
-                    'roll': get(row, 'roll no'),
-                    'subject': get(row, 'subject'),
-                    'section': get(row, 'section') or section,
-                    'uid': ruid
-                }
-        return None
+        return roster_cache.find_by_uid(section, uid)
     except Exception:
         return None
 
 def _excel_find_in_any_section(uid):
     try:
-        import os, pandas as pd
-        base = 'data/sections'
-        if not os.path.isdir(base):
-            return None
-        for fname in os.listdir(base):
-            if not fname.lower().endswith('.xlsx'):
-                continue
-            section = fname.rsplit('.',1)[0]
-            rec = _excel_find_by_uid(section, uid)
-            if rec:
-                return rec
-        return None
+        return roster_cache.find_in_any_section(uid)
     except Exception:
         return None
 
+def contactless_readers_of(rdrs):
+    """Focus on contactless readers (for NFC), falling back to all readers"""
+    contactless = [r for r in rdrs if 'contactless' in str(r).lower()]
+    return contactless or list(rdrs)
+
+def process_uid(web_handler, reader, uid):
+    """Mark attendance (or report why not) for a UID read from a reader"""
+    # Status messages go to the session section's room (broadcast if none)
+    room_section = session_mgr.current_session.get('section') if session_mgr.current_session else None
+
+    # If already scanned this session, treat as duplicate (even if same-reader)
+    if uid in session_mgr.scanned_uids:
+        student = db.get_student_by_uid(uid)
+        name = student[0] if student else "Unknown"
+        web_handler.update_status(f"⚠️ Duplicate scan: {name}", warning=True, section=room_section)
+        voice_feedback(f"Already scanned {name}")
+        print(f"[DEBUG] Duplicate scan for: {name}")
+        return
+
+    print(f"[DEBUG] Processing new UID: {uid}")
+    
+    # Check if student exists
+    student = db.get_student_by_uid(uid)
+    if student:
+        # Student found - check section
+        name, enroll, roll, section, subject = student
+        print(f"[DEBUG] Student found: {name} (Section: {section})")
+
+        # Enforce session section, if provided
+        session_section = None
+        try:
+            if session_mgr.current_session:
+                session_section = session_mgr.current_session.get('section')
+        except Exception:
+            session_section = None
+
+        if session_section and str(section or '').strip().upper() != str(session_section).strip().upper():
+            # Different section -> do not mark
+            msg = f"Not from this session: {name} (belongs to {section or 'Unknown'})"
+            web_handler.update_status(msg, warning=True, section=room_section)
+            voice_feedback("Not from this session")
+            print(f"[DEBUG] Section mismatch for UID {uid}: card {section} vs session {session_section}")
+        else:
+            # Mark attendance
+            time_str = db.log_attendance(uid)
+            session_mgr.scanned_uids.add(uid)
+            
+            # Update web interface
+            web_handler.update_status(f"✅ Attendance marked: {name}", success=True, section=room_section)
+            web_handler.add_recent_attendance(name, uid, section, time_str)
+            web_handler.update_dashboard()
+            
+            # Voice feedback
+            voice_feedback(f"Welcome {name}. Scan next card.")
+            print(f"[DEBUG] Attendance marked for: {name}")
+    else:
+        # Unknown student - try Excel roster for current session
+        session_section = session_mgr.current_session.get('section') if session_mgr.current_session else None
+        roster_rec = _excel_find_by_uid(session_section, uid) if session_section else None
+        if roster_rec and str(roster_rec.get('section','')).strip().upper() == str(session_section or '').strip().upper():
+            # Auto-add from roster and mark
+            name = roster_rec['name']; enroll = roster_rec.get('enroll',''); roll = roster_rec.get('roll','');
+            section = roster_rec.get('section'); subject = roster_rec.get('subject','');
+            added = db.add_student(name, enroll, roll, section, subject, uid)
+            if added:
+                time_str = db.log_attendance(uid)
+                session_mgr.scanned_uids.add(uid)
+                web_handler.update_status(f"✅ Attendance marked: {name}", success=True, section=room_section)
+                web_handler.add_recent_attendance(name, uid, section, time_str)
+                web_handler.update_dashboard()
+                voice_feedback(f"Welcome {name}. Scan next card.")
+                print(f"[DEBUG] Auto-added from Excel and marked: {name}")
+            else:
+                web_handler.update_status("⚠️ Could not add student from Excel", warning=True, section=room_section)
+        else:
+            # See if this UID exists in any other section Excel
+            other = _excel_find_in_any_section(uid)
+            if other and (not session_section or str(other.get('section','')).strip().upper() != str(session_section).strip().upper()):
+                web_handler.update_status("Not from this session", warning=True, section=room_section)
+                voice_feedback("Not from this session")
+                print(f"[DEBUG] UID belongs to section {other.get('section')} not current {session_section}")
+            else:
+                web_handler.update_status(f"❓ Unknown NFC card: {uid}", warning=True, section=room_section)
+                voice_feedback("Unknown card detected. Please register student.")
+                print(f"[DEBUG] Unknown card: {uid}")
+
+def start_scan_pipeline(web_handler):
+    """Start the worker pool that runs process_uid off the reader thread"""
+    pipeline = ScanPipeline(
+        lambda reader, uid, ts: process_uid(web_handler, reader, uid),
+        workers=Config.NFC_WORKERS,
+        maxsize=Config.NFC_QUEUE_SIZE
+    ).start()
+    web_handler.scan_pipeline = pipeline
+    return pipeline
+
 def nfc_scan_loop_web(web_handler):
     """
-    Improved web-compatible NFC scanning loop for Broadcom readers
+    Attendance consumer for one session.
+
+    Subscribes to the reader broker, so taps that no registration or login
+    request is waiting for are debounced and queued on the scan pipeline.
+    Runs until the session stops; the readers themselves are owned by
+    run_reader_owner.
     """
-    print("[DEBUG] Starting Broadcom-compatible NFC scanner")
+    session = session_mgr.current_session
+    debouncer = Debouncer(reader_window=Config.NFC_DEBOUNCE_READER,
+                          global_window=Config.NFC_DEBOUNCE_GLOBAL)
+    web_handler.scan_debouncer = debouncer
+    pipeline = start_scan_pipeline(web_handler)
     
-    # Common APDU commands for NFC cards
-    GET_UID_COMMANDS = [
-        [0xFF, 0xCA, 0x00, 0x00, 0x00],  # Standard UID command
-        [0xFF, 0xCA, 0x00, 0x00, 0x04],  # UID with 4-byte response
-        [0xFF, 0xCA, 0x00, 0x00, 0x07],  # UID with 7-byte response
-    ]
+    def on_tap(reader, uid):
+        if debouncer.accept(reader, uid):
+            pipeline.submit(reader, uid)
+    
+    token = reader_broker.subscribe(on_tap)
+    print("[DEBUG] Attendance scanning subscribed to reader broker")
+    try:
+        # A newer session replaces this one's subscription
+        while not session_mgr.stop_flag and session_mgr.current_session is session:
+            time.sleep(0.2)
+    finally:
+        reader_broker.unsubscribe(token)
+        pipeline.stop()
+        print(f"[DEBUG] Scan pipeline stats: {pipeline.stats()}")
+        print(f"[DEBUG] Debouncer stats: {debouncer.stats()}")
+    web_handler.update_status("🛑 NFC scanning stopped", warning=True)
+    print("[DEBUG] NFC scanning stopped")
+
+def run_reader_owner(web_handler):
+    """
+    Reader supervisor, run by the reader broker while anyone needs the readers.
+
+    It takes the reader list from the reader registry, which is updated on
+    hot-plug, and wakes when that list changes (or every NFC_READER_REFRESH
+    seconds). It starts one worker thread per new contactless reader and
+    stops workers whose reader was unplugged. Workers publish each new card to the broker.
+    Config.NFC_SCAN_MODE selects PC/SC card events ("event") or polling ("poll").
+    """
+    event_mode = str(Config.NFC_SCAN_MODE).lower() == 'event'
+    print(f"[DEBUG] Starting Broadcom-compatible NFC scanner ({'event' if event_mode else 'poll'} mode)")
     
-    last_uid_per_reader = {}
     consecutive_errors = 0
     max_consecutive_errors = 5
+    workers = {}  # reader name -> (thread, stop event)
+    target = nfc_event_reader_loop if event_mode else nfc_poll_reader_loop
+    
+    web_handler.update_status(f"🔍 NFC scanning started (Broadcom {'event ' if event_mode else ''}mode)", success=True)
     
-    web_handler.update_status("🔍 NFC scanning started (Broadcom mode)", success=True)
-    print("[DEBUG] Status updated: NFC scanning started")
+    reader_registry.start()
+    version = reader_registry.version
     
-    while not session_mgr.stop_flag:
+    while reader_broker.wanted():
         try:
-            rdrs = readers()
-            print(f"[DEBUG] Found {len(rdrs) if rdrs else 0} NFC readers")
+            rdrs, version = reader_registry.snapshot()
+            current = {str(r): r for r in contactless_readers_of(rdrs or [])}
             
-            if not rdrs:
-                web_handler.update_status("❌ No NFC readers detected", error=True)
-                print("[DEBUG] No readers found, sleeping...")
-                time.sleep(2)
-                continue
+            # Retire workers whose reader disappeared (or that died)
+            for name in list(workers):
+                thread, stop_event = workers[name]
+                if name not in current or not thread.is_alive():
+                    stop_event.set()
+                    del workers[name]
+                    print(f"[DEBUG] Reader removed: {name}")
             
-            # Focus on contactless readers (for NFC)
-            contactless_readers = [r for r in rdrs if 'contactless' in str(r).lower()]
-            if not contactless_readers:
-                contactless_readers = rdrs  # Fallback to all readers
+            # Spawn workers for newly attached readers
+            added = False
+            for name, reader in current.items():
+                if name in workers:
+                    continue
+                stop_event = threading.Event()
+                thread = threading.Thread(
+                    target=target,
+                    args=(web_handler, reader, stop_event),
+                    daemon=True,
+                    name=f"nfc-reader-{len(workers)}"
+                )
+                thread.start()
+                workers[name] = (thread, stop_event)
+                added = True
+                print(f"[DEBUG] Reader added: {name}")
             
-            card_found = False
+            if not workers:
+                web_handler.update_status("❌ No NFC readers detected", error=True)
+            elif added:
+                web_handler.update_status(f"🔍 Scanning for NFC cards... ({len(workers)} reader(s))", success=True)
+            consecutive_errors = 0
             
-            for reader in contactless_readers:
-                try:
-                    print(f"[DEBUG] Checking reader: {reader}")
-                    
-                    # Use direct connection method
-                    connection = reader.createConnection()
-                    try:
-                        connection.connect()
-                    except (NoCardException, CardConnectionException):
-                        # No card present, skip this reader
-                        last_uid_per_reader[reader] = None
-                        continue
-                    except Exception as e:
-                        print(f"[DEBUG] Connection error: {e}")
-                        continue
-                    
-                    print("[DEBUG] Card detected and connected")
-                    
-                    uid = None
-                    # Try different UID commands
-                    for cmd in GET_UID_COMMANDS:
-                        try:
-                            resp, sw1, sw2 = connection.transmit(cmd)
-                            print(f"[DEBUG] Command {cmd}: SW1={sw1:02X}, SW2={sw2:02X}, Resp={resp}")
-                            
-                            if sw1 == 0x90 and sw2 == 0x00 and resp:
-                                uid = ''.join(f"{b:02X}" for b in resp)
-                                print(f"[DEBUG] UID extracted: {uid}")
-                                break
-                                
-                        except Exception as e:
-                            print(f"[DEBUG] UID command failed: {e}")
-                            continue
-                    
-                    # Only proceed if we got a UID
-                    if uid:
-                        card_found = True
-                        consecutive_errors = 0
-                        
-                        # If already scanned this session, treat as duplicate (even if same-reader)
-                        if uid in session_mgr.scanned_uids:
-                            student = db.get_student_by_uid(uid)
-                            name = student[0] if student else "Unknown"
-                            web_handler.update_status(f"⚠️ Duplicate scan: {name}", warning=True)
-                            voice_feedback(f"Already scanned {name}")
-                            print(f"[DEBUG] Duplicate scan for: {name}")
-                            # Update last seen to keep UI responsive
-                            last_uid_per_reader[reader] = uid
-                        else:
-                            # For new scans, do NOT block on same-reader duplicate the first time
-                            if last_uid_per_reader.get(reader) == uid:
-                                print(f"[DEBUG] Same-reader UID seen again quickly, but not yet in session set; proceeding: {uid}")
-                            
-                            last_uid_per_reader[reader] = uid
-                            print(f"[DEBUG] Processing new UID: {uid}")
-                            
-                            # Clear the duplicate detection after a short delay to allow re-scanning
-                            def clear_duplicate(r, u):
-                                time.sleep(2)  # Allow re-scan after 2 seconds
-                                if last_uid_per_reader.get(r) == u:
-                                    last_uid_per_reader[r] = None
-                                    print(f"[DEBUG] Cleared duplicate lock for: {u}")
-                            
-                            import threading
-                            threading.Thread(target=clear_duplicate, args=(reader, uid), daemon=True).start()
-                            
-                            # Check if student exists
-                            student = db.get_student_by_uid(uid)
-                            if student:
-                                # Student found - check section
-                                name, enroll, roll, section, subject = student
-                                print(f"[DEBUG] Student found: {name} (Section: {section})")
+        except Exception as e:
+            print(f"[DEBUG] Scanner error: {e}")
+            consecutive_errors += 1
+            if consecutive_errors >= max_consecutive_errors:
+                web_handler.update_status(f"❌ Scanner error: {str(e)}", error=True)
+                consecutive_errors = 0  # Reset after showing error
+        
+        reader_registry.wait_for_change(version, timeout=Config.NFC_READER_REFRESH)
+    
+    reader_registry.stop()
+    for thread, stop_event in workers.values():
+        stop_event.set()
+    for thread, _ in workers.values():
+        thread.join(timeout=Config.NFC_EVENT_TIMEOUT + 1)
+    print("[DEBUG] Reader owner idle, readers released")
 
-                                # Enforce session section, if provided
-                                session_section = None
-                                try:
-                                    if session_mgr.current_session:
-                                        session_section = session_mgr.current_session.get('section')
-                                except Exception:
-                                    session_section = None
+def _reader_stopped(stop_event):
+    # Set by run_reader_owner when the reader goes away or demand ends
+    return stop_event.is_set()
 
-                                if session_section and str(section or '').strip().upper() != str(session_section).strip().upper():
-                                    # Different section -> do not mark
-                                    msg = f"Not from this session: {name} (belongs to {section or 'Unknown'})"
-                                    web_handler.update_status(msg, warning=True)
-                                    voice_feedback("Not from this session")
-                                    print(f"[DEBUG] Section mismatch for UID {uid}: card {section} vs session {session_section}")
-                                else:
-                                    # Mark attendance
-                                    db.log_attendance(uid)
-                                    session_mgr.scanned_uids.add(uid)
-                                    
-                                    # Update web interface
-                                    web_handler.update_status(f"✅ Attendance marked: {name}", success=True)
-                                    web_handler.add_recent_attendance(name)
-                                    web_handler.update_dashboard()
-                                    
-                                    # Voice feedback
-                                    voice_feedback(f"Welcome {name}. Scan next card.")
-                                    print(f"[DEBUG] Attendance marked for: {name}")
-                            else:
-                                # Unknown student - try Excel roster for current session
-                                session_section = session_mgr.current_session.get('section') if session_mgr.current_session else None
-                                roster_rec = _excel_find_by_uid(session_section, uid) if session_section else None
-                                if roster_rec and str(roster_rec.get('section','')).strip().upper() == str(session_section or '').strip().upper():
-                                    # Auto-add from roster and mark
-                                    name = roster_rec['name']; enroll = roster_rec.get('enroll',''); roll = roster_rec.get('roll','');
-                                    section = roster_rec.get('section'); subject = roster_rec.get('subject','');
-                                    added = db.add_student(name, enroll, roll, section, subject, uid)
-                                    if added:
-                                        db.log_attendance(uid)
-                                        session_mgr.scanned_uids.add(uid)
-                                        web_handler.update_status(f"✅ Attendance marked: {name}", success=True)
-                                        web_handler.add_recent_attendance(name)
-                                        web_handler.update_dashboard()
-                                        voice_feedback(f"Welcome {name}. Scan next card.")
-                                        print(f"[DEBUG] Auto-added from Excel and marked: {name}")
-                                    else:
-                                        web_handler.update_status("⚠️ Could not add student from Excel", warning=True)
-                                else:
-                                    # See if this UID exists in any other section Excel
-                                    other = _excel_find_in_any_section(uid)
-                                    if other and (not session_section or str(other.get('section','')).strip().upper() != str(session_section).strip().upper()):
-                                        web_handler.update_status("Not from this session", warning=True)
-                                        voice_feedback("Not from this session")
-                                        print(f"[DEBUG] UID belongs to section {other.get('section')} not current {session_section}")
-                                    else:
-                                        web_handler.update_status(f"❓ Unknown NFC card: {uid}", warning=True)
-                                        voice_feedback("Unknown card detected. Please register student.")
-                                        print(f"[DEBUG] Unknown card: {uid}")
-                    
-                    # Disconnect card
-                    try:
-                        connection.disconnect()
-                    except:
-                        pass
-                            
-                except (NoCardException, CardConnectionException):
-                    # No card present - this is normal
-                    last_uid_per_reader[reader] = None
-                    
-                except Exception as e:
-                    print(f"[DEBUG] Reader error: {e}")
-                    consecutive_errors += 1
-                    if consecutive_errors < max_consecutive_errors:
-                        continue
-                    else:
-                        web_handler.update_status(f"⚠️ Reader error: {str(e)}", warning=True)
+def nfc_event_reader_loop(web_handler, reader, stop_event):
+    """
+    Event-driven worker for one reader: blocks in SCardGetStatusChange (via
+    CardRequest) until a card arrives, waking every NFC_EVENT_TIMEOUT seconds
+    to honour stop requests.
+    """
+    consecutive_errors = 0
+    max_consecutive_errors = 5
+    card_type = AnyCardType()
+    request = None
+    conn = reader_connections.get(reader)
+    
+    while not _reader_stopped(stop_event):
+        try:
+            if request is None:
+                # Only cards inserted after this point wake us up, so a card
+                # left on the reader is not re-read on every wake-up
+                request = CardRequest(timeout=Config.NFC_EVENT_TIMEOUT, cardType=card_type,
+                                      readers=[reader], newcardonly=True)
             
-            # Update status if no cards found
-            if not card_found:
-                if consecutive_errors < max_consecutive_errors:
-                    web_handler.update_status("🔍 Scanning for NFC cards...", success=True)
-                time.sleep(Config.NFC_READ_DELAY)
+            try:
+                request.waitforcard()
+            except CardRequestTimeoutException:
+                continue
+            
+            print(f"[DEBUG] Card arrived on reader: {reader}")
+            # A new card needs a new card handle; the connection object is reused.
+            # None means the card was removed before we could read it
+            uid = conn.read_uid(new_card=True)
+            if uid:
+                consecutive_errors = 0
+                reader_broker.publish(reader, uid)
             
         except Exception as e:
-            print(f"[DEBUG] Scanner error: {e}")
+            print(f"[DEBUG] Reader error ({reader}): {e}")
+            request = None
             consecutive_errors += 1
             if consecutive_errors >= max_consecutive_errors:
-                web_handler.update_status(f"❌ Scanner error: {str(e)}", error=True)
+                web_handler.update_status(f"⚠️ Reader error: {str(e)}", warning=True)
                 time.sleep(2)
-                consecutive_errors = 0  # Reset after showing error
+                consecutive_errors = 0
     
-    web_handler.update_status("🛑 NFC scanning stopped", warning=True)
-    print("[DEBUG] NFC scanning stopped")
\ No newline at end of file
+    reader_connections.release(reader)
+
+def nfc_poll_reader_loop(web_handler, reader, stop_event):
+    """
+    Polling worker for one reader: reads the card every NFC_READ_DELAY
+    seconds over a persistent connection (reconnecting only when the card
+    is removed or swapped) and submits a UID only when it differs from the
+    card already resting on the reader, like newcardonly in event mode.
+    """
+    consecutive_errors = 0
+    max_consecutive_errors = 5
+    resting_uid = None
+    conn = reader_connections.get(reader)
+    
+    while not _reader_stopped(stop_event):
+        try:
+            # None when there is no card (or it was just removed)
+            uid = conn.read_uid()
+            
+            # Only proceed if we got a UID of a newly placed card
+            if uid and uid != resting_uid:
+                print(f"[DEBUG] Card detected on {reader}")
+                consecutive_errors = 0
+                reader_broker.publish(reader, uid)
+            resting_uid = uid
+            
+        except Exception as e:
+            print(f"[DEBUG] Reader error ({reader}): {e}")
+            consecutive_errors += 1
+            if consecutive_errors >= max_consecutive_errors:
+                web_handler.update_status(f"⚠️ Reader error: {str(e)}", warning=True)
+                consecutive_errors = 0
+        
+        time.sleep(Config.NFC_READ_DELAY)
+    
+    reader_connections.release(reader)
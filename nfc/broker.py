@@ -0,0 +1,108 @@
+# nfc/broker.py - Single owner of the PC/SC readers, shared by all consumers
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+class ReaderBroker:
+    """Hands card taps from the reader workers to whoever is waiting.
+
+    Only the broker's owner thread (`runner`, the reader supervisor) talks
+    to the hardware. It runs while there is demand: an attendance
+    subscriber (an active session) or a pending `wait_for_uid` call
+    (registration, NFC login). A tap goes to the pending waiters if there
+    are any; otherwise it goes to the subscriber.
+    """
+
+    def __init__(self, runner=None):
+        self.runner = runner
+        self.lock = threading.Lock()
+        self._thread = None
+        self._subscriber = None
+        self._waiters = []
+        self.claimed = 0      # taps handed to waiters
+        self.dispatched = 0   # taps handed to the subscriber
+        self.unclaimed = 0    # taps nobody wanted
+
+    def _wanted_locked(self):
+        return self._subscriber is not None or bool(self._waiters)
+
+    def wanted(self):
+        """True while someone needs the readers running"""
+        with self.lock:
+            return self._wanted_locked()
+
+    def _ensure_running_locked(self):
+        if self._thread is None and self.runner is not None:
+            self._thread = threading.Thread(target=self._owner, daemon=True, name="nfc-broker")
+            self._thread.start()
+
+    def _owner(self):
+        while True:
+            try:
+                self.runner()
+            except Exception as e:
+                print(f"[DEBUG] Reader owner error: {e}")
+            with self.lock:
+                # Demand may have arrived while the runner was winding down
+                if not self._wanted_locked():
+                    self._thread = None
+                    return
+
+    def subscribe(self, handler):
+        """Send taps nobody is waiting for to handler(reader, uid).
+        Returns a token for unsubscribe."""
+        with self.lock:
+            self._subscriber = handler
+            self._ensure_running_locked()
+        return handler
+
+    def unsubscribe(self, token):
+        with self.lock:
+            if self._subscriber is token:
+                self._subscriber = None
+
+    def wait_for_uid(self, timeout=10.0):
+        """Block until the next tap on any reader; None on timeout"""
+        future = Future()
+        with self.lock:
+            self._waiters.append(future)
+            self._ensure_running_locked()
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            return None
+        finally:
+            with self.lock:
+                if future in self._waiters:
+                    self._waiters.remove(future)
+
+    def publish(self, reader, uid):
+        """Called by reader workers for every new card on a reader"""
+        with self.lock:
+            waiters, self._waiters = self._waiters, []
+            handler = self._subscriber
+            if waiters:
+                self.claimed += 1
+            elif handler is not None:
+                self.dispatched += 1
+            else:
+                self.unclaimed += 1
+        if waiters:
+            for future in waiters:
+                if not future.done():
+                    future.set_result(uid)
+        elif handler is not None:
+            handler(reader, uid)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'running': self._thread is not None,
+                'subscribed': self._subscriber is not None,
+                'waiting': len(self._waiters),
+                'claimed': self.claimed,
+                'dispatched': self.dispatched,
+                'unclaimed': self.unclaimed,
+            }
+
+# Global broker; the reader supervisor is attached as its runner at startup
+reader_broker = ReaderBroker()
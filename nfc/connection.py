@@ -0,0 +1,138 @@
+# nfc/connection.py - One long-lived PC/SC connection per reader
+import threading
+import time
+
+from .uid_reader import uid_reader
+
+try:
+    from smartcard.Exceptions import CardConnectionException
+    _NO_CARD = (CardConnectionException,)  # includes NoCardException
+except ImportError:
+    _NO_CARD = ()
+
+class ReaderConnection:
+    """Keeps one connection object per reader and the card connected.
+
+    The connection object (and its PC/SC context) is created once. While
+    a card rests on the reader, GET UID is sent on the open card handle
+    without reconnecting. A failed read means the card was removed or
+    swapped, so the handle is released and the next read reconnects.
+    Connect and transmit times are recorded for `stats`.
+    """
+
+    def __init__(self, reader, clock=time.perf_counter):
+        self.reader = reader
+        self.clock = clock
+        self.lock = threading.Lock()
+        self._connection = None
+        self._connected = False
+        self.connects = 0
+        self.connect_failures = 0
+        self.connect_ms = 0.0
+        self.transmits = 0
+        self.transmit_ms = 0.0
+        self.max_transmit_ms = 0.0
+        self.reconnects = 0
+
+    def _connect(self):
+        """Connect the card if needed; False if there is no card"""
+        if self._connected:
+            return True
+        if self._connection is None:
+            self._connection = self.reader.createConnection()
+        started = self.clock()
+        try:
+            self._connection.connect()
+        except _NO_CARD:
+            self.connect_failures += 1
+            return False
+        self.connect_ms += (self.clock() - started) * 1000
+        self.connects += 1
+        self._connected = True
+        return True
+
+    def _disconnect(self):
+        if self._connected:
+            try:
+                self._connection.disconnect()
+            except Exception:
+                pass
+            self._connected = False
+
+    def read_uid(self, new_card=False):
+        """UID of the card on the reader, or None if there is none.
+        new_card drops the current handle first (a card arrival event)."""
+        with self.lock:
+            if new_card and self._connected:
+                self._disconnect()
+                self.reconnects += 1
+            try:
+                if not self._connect():
+                    return None
+                started = self.clock()
+                uid = uid_reader.read_uid(self._connection, self.reader)
+                elapsed_ms = (self.clock() - started) * 1000
+            except Exception:
+                # Unexpected failure: start over with a fresh connection object
+                self._disconnect()
+                self._connection = None
+                raise
+            self.transmits += 1
+            self.transmit_ms += elapsed_ms
+            self.max_transmit_ms = max(self.max_transmit_ms, elapsed_ms)
+            if uid is None:
+                # Card removed or swapped under the open handle
+                self._disconnect()
+                self.reconnects += 1
+            return uid
+
+    def close(self):
+        with self.lock:
+            self._disconnect()
+            self._connection = None
+
+    def stats(self):
+        with self.lock:
+            return {
+                'connected': self._connected,
+                'connects': self.connects,
+                'connect_failures': self.connect_failures,
+                'avg_connect_ms': self.connect_ms / self.connects if self.connects else 0.0,
+                'transmits': self.transmits,
+                'avg_transmit_ms': self.transmit_ms / self.transmits if self.transmits else 0.0,
+                'max_transmit_ms': self.max_transmit_ms,
+                'reconnects': self.reconnects,
+            }
+
+class ConnectionPool:
+    """ReaderConnection per reader name, shared by that reader's worker"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._connections = {}
+
+    def get(self, reader):
+        with self.lock:
+            conn = self._connections.get(str(reader))
+            if conn is None or conn.reader is not reader:
+                # New reader, or the same one plugged in again
+                if conn is not None:
+                    conn.close()
+                conn = self._connections[str(reader)] = ReaderConnection(reader)
+            return conn
+
+    def release(self, reader):
+        """Close a reader's connection (reader unplugged or scanning idle);
+        its stats are kept"""
+        with self.lock:
+            conn = self._connections.get(str(reader))
+        if conn is not None:
+            conn.close()
+
+    def stats(self):
+        with self.lock:
+            connections = dict(self._connections)
+        return {name: conn.stats() for name, conn in connections.items()}
+
+# Used by the reader workers
+reader_connections = ConnectionPool()
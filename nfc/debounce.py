@@ -0,0 +1,67 @@
+# nfc/debounce.py - Time-window duplicate suppression for card taps
+import threading
+import time
+
+class Debouncer:
+    """TTL map of recently accepted taps.
+
+    A tap is suppressed if the same UID was accepted on the same reader
+    within `reader_window` seconds, or on any reader within `global_window`
+    seconds (0 disables a window). Entries expire lazily on lookup, and
+    expired ones are swept every `sweep_every` accepted taps, so no timer
+    threads are needed.
+    """
+
+    def __init__(self, reader_window=2.0, global_window=0.0, clock=time.monotonic, sweep_every=256):
+        self.reader_window = reader_window
+        self.global_window = global_window
+        self.clock = clock
+        self.sweep_every = sweep_every
+        self.lock = threading.Lock()
+        self._expiry = {}  # (reader, UID) or (None, UID) -> expiry time
+        self.accepted = 0
+        self.suppressed = 0
+
+    def _active(self, key, now):
+        expires = self._expiry.get(key)
+        if expires is None:
+            return False
+        if expires <= now:
+            del self._expiry[key]
+            return False
+        return True
+
+    def _sweep(self, now):
+        for key in [k for k, expires in self._expiry.items() if expires <= now]:
+            del self._expiry[key]
+
+    def accept(self, reader, uid):
+        """True if the tap should be processed, False if it is a duplicate"""
+        uid = str(uid).strip().upper()
+        reader_key = (str(reader), uid)
+        global_key = (None, uid)
+        with self.lock:
+            now = self.clock()
+            if self._active(reader_key, now) or self._active(global_key, now):
+                self.suppressed += 1
+                return False
+            if self.reader_window > 0:
+                self._expiry[reader_key] = now + self.reader_window
+            if self.global_window > 0:
+                self._expiry[global_key] = now + self.global_window
+            self.accepted += 1
+            if self.accepted % self.sweep_every == 0:
+                self._sweep(now)
+            return True
+
+    def reset(self):
+        with self.lock:
+            self._expiry.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'accepted': self.accepted,
+                'suppressed': self.suppressed,
+                'tracked': len(self._expiry)
+            }
@@ -0,0 +1,108 @@
+# nfc/pipeline.py - Decouples UID acquisition from attendance processing
+import queue
+import threading
+import time
+
+class ScanPipeline:
+    """Bounded producer/consumer queue between reader threads and workers.
+
+    Reader threads call `submit(reader, uid)` which only enqueues a
+    `(reader, uid, monotonic_ts)` event. Worker threads run `handler` for
+    each event. Events are sharded by UID so taps of the same card are
+    always handled in order by the same worker. When a shard is full the
+    event is dropped and counted rather than blocking the reader.
+    """
+
+    def __init__(self, handler, workers=2, maxsize=64, name="scan"):
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.name = name
+        self._queues = [queue.Queue(maxsize=max(1, maxsize // self.workers))
+                        for _ in range(self.workers)]
+        self._threads = []
+        self._running = False
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'processed': 0,
+            'dropped': 0,
+            'errors': 0,
+            'max_depth': 0,
+            'max_wait_ms': 0.0,
+            'total_wait_ms': 0.0,
+            'max_handle_ms': 0.0,
+            'total_handle_ms': 0.0,
+        }
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        for i, q in enumerate(self._queues):
+            t = threading.Thread(target=self._worker, args=(q,), daemon=True,
+                                 name=f"{self.name}-worker-{i}")
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self, timeout=5.0):
+        """Process what is already queued, then stop the workers"""
+        self._running = False
+        deadline = time.monotonic() + timeout
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def submit(self, reader, uid):
+        """Enqueue a UID event; returns False if it was dropped"""
+        q = self._queues[hash(str(uid).upper()) % self.workers]
+        try:
+            q.put_nowait((reader, uid, time.monotonic()))
+        except queue.Full:
+            with self._stats_lock:
+                self._stats['dropped'] += 1
+            print(f"[WARN] Scan queue full, dropped UID {uid}")
+            return False
+        with self._stats_lock:
+            self._stats['submitted'] += 1
+            self._stats['max_depth'] = max(self._stats['max_depth'], self.depth())
+        return True
+
+    def depth(self):
+        return sum(q.qsize() for q in self._queues)
+
+    def _worker(self, q):
+        while self._running or not q.empty():
+            try:
+                reader, uid, ts = q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            started = time.monotonic()
+            try:
+                self.handler(reader, uid, ts)
+                failed = False
+            except Exception as e:
+                print(f"[DEBUG] Scan worker error for {uid}: {e}")
+                failed = True
+            finished = time.monotonic()
+            wait_ms = (started - ts) * 1000
+            handle_ms = (finished - started) * 1000
+            with self._stats_lock:
+                self._stats['processed'] += 1
+                self._stats['errors'] += int(failed)
+                self._stats['total_wait_ms'] += wait_ms
+                self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], wait_ms)
+                self._stats['total_handle_ms'] += handle_ms
+                self._stats['max_handle_ms'] = max(self._stats['max_handle_ms'], handle_ms)
+
+    def stats(self):
+        """Snapshot of throughput and backpressure counters"""
+        with self._stats_lock:
+            result = dict(self._stats)
+        processed = result['processed'] or 1
+        result['avg_wait_ms'] = result.pop('total_wait_ms') / processed
+        result['avg_handle_ms'] = result.pop('total_handle_ms') / processed
+        result['depth'] = self.depth()
+        result['capacity'] = sum(q.maxsize for q in self._queues)
+        result['workers'] = self.workers
+        return result
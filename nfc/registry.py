@@ -0,0 +1,122 @@
+# nfc/registry.py - Cached PC/SC reader list, updated on hot-plug
+import threading
+from config import Config
+
+def _pcsc_readers():
+    from smartcard.System import readers
+    return readers() or []
+
+class ReaderRegistry:
+    """Keeps the current reader list so scanners do not re-enumerate.
+
+    `start` registers with pyscard's ReaderMonitor, which reports readers
+    being added or removed. If the monitor is unavailable, a background
+    thread re-enumerates every `poll_interval` seconds. The list is only
+    replaced when the set of reader names changes, and each change bumps
+    `version` and wakes `wait_for_change` callers.
+    """
+
+    def __init__(self, enumerate=_pcsc_readers, poll_interval=2.0, use_monitor=True):
+        self.enumerate = enumerate
+        self.poll_interval = poll_interval
+        self.use_monitor = use_monitor
+        self.cond = threading.Condition()
+        self._readers = None
+        self.version = 0
+        self.mode = None
+        self.enumerations = 0
+        self._monitor = None
+        self._observer = None
+        self._stop = None
+
+    def refresh(self):
+        """Enumerate now; returns True if the reader set changed"""
+        rdrs = list(self.enumerate())
+        with self.cond:
+            self.enumerations += 1
+            if self._readers is not None and \
+                    [str(r) for r in rdrs] == [str(r) for r in self._readers]:
+                return False
+            self._readers = rdrs
+            self.version += 1
+            self.cond.notify_all()
+            return True
+
+    def snapshot(self):
+        """(readers, version), enumerating once if nothing is cached yet"""
+        with self.cond:
+            cached = self._readers is not None
+        if not cached:
+            self.refresh()
+        with self.cond:
+            return list(self._readers), self.version
+
+    def readers(self):
+        return self.snapshot()[0]
+
+    def wait_for_change(self, version, timeout=None):
+        """Block until the version moves past `version`; returns the current version"""
+        with self.cond:
+            self.cond.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def start(self):
+        """Begin watching for hot-plug; safe to call when already started"""
+        if self.mode is not None:
+            return
+        if self.use_monitor:
+            try:
+                from smartcard.ReaderMonitoring import ReaderMonitor, ReaderObserver
+
+                registry = self
+
+                class _Observer(ReaderObserver):
+                    def update(self, observable, changes):
+                        registry.refresh()
+
+                self._monitor = ReaderMonitor()
+                self._observer = _Observer()
+                self._monitor.addObserver(self._observer)
+                self.mode = 'monitor'
+                return
+            except Exception as e:
+                print(f"[DEBUG] Reader monitor unavailable, polling instead: {e}")
+        self._stop = threading.Event()
+        threading.Thread(target=self._poll, args=(self._stop,), daemon=True,
+                         name="nfc-reader-registry").start()
+        self.mode = 'poll'
+
+    def _poll(self, stop):
+        while not stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[DEBUG] Reader enumeration failed: {e}")
+            stop.wait(self.poll_interval)
+
+    def stop(self):
+        """Stop watching; the cached list is dropped so the next use re-enumerates"""
+        if self._monitor is not None:
+            try:
+                self._monitor.deleteObserver(self._observer)
+            except Exception:
+                pass
+            self._monitor = self._observer = None
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+        with self.cond:
+            self._readers = None
+            self.mode = None
+
+    def stats(self):
+        with self.cond:
+            return {
+                'mode': self.mode,
+                'readers': [str(r) for r in self._readers or []],
+                'version': self.version,
+                'enumerations': self.enumerations,
+            }
+
+# Global registry used by the reader supervisor
+reader_registry = ReaderRegistry(poll_interval=Config.NFC_READER_REFRESH)
@@ -0,0 +1,96 @@
+# nfc/uid_reader.py - GET UID with per-reader APDU memory
+import threading
+import time
+
+# Common APDU commands for NFC cards
+GET_UID_COMMANDS = [
+    [0xFF, 0xCA, 0x00, 0x00, 0x00],  # Standard UID command
+    [0xFF, 0xCA, 0x00, 0x00, 0x04],  # UID with 4-byte response
+    [0xFF, 0xCA, 0x00, 0x00, 0x07],  # UID with 7-byte response
+]
+
+def _apdu_hex(cmd):
+    return ' '.join(f"{b:02X}" for b in cmd)
+
+class UIDReader:
+    """Reads card UIDs, trying first the APDU that last worked for the
+    same reader and card ATR, and keeps per-command success/latency stats.
+    """
+
+    def __init__(self, commands=None):
+        self.commands = [list(c) for c in (commands or GET_UID_COMMANDS)]
+        self.lock = threading.Lock()
+        self._preferred = {}  # (reader, ATR) -> command index
+        self._stats = [{'attempts': 0, 'successes': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+                       for _ in self.commands]
+
+    @staticmethod
+    def _key(connection, reader):
+        if reader is None:
+            try:
+                reader = connection.getReader()
+            except Exception:
+                reader = None
+        try:
+            atr = tuple(connection.getATR() or ())
+        except Exception:
+            atr = ()
+        return (str(reader), atr)
+
+    def _order(self, key):
+        with self.lock:
+            first = self._preferred.get(key)
+        order = list(range(len(self.commands)))
+        if first is not None:
+            order.remove(first)
+            order.insert(0, first)
+        return order
+
+    def _record(self, index, ok, elapsed_ms):
+        with self.lock:
+            stats = self._stats[index]
+            stats['attempts'] += 1
+            stats['successes'] += int(ok)
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+    def read_uid(self, connection, reader=None):
+        """Send GET UID APDUs on a connected card and return the UID hex string"""
+        key = self._key(connection, reader)
+        for index in self._order(key):
+            cmd = self.commands[index]
+            started = time.perf_counter()
+            try:
+                resp, sw1, sw2 = connection.transmit(cmd)
+                ok = sw1 == 0x90 and sw2 == 0x00 and bool(resp)
+            except Exception as e:
+                print(f"[DEBUG] UID command {_apdu_hex(cmd)} failed: {e}")
+                resp, ok = None, False
+            self._record(index, ok, (time.perf_counter() - started) * 1000)
+            if ok:
+                with self.lock:
+                    self._preferred[key] = index
+                return ''.join(f"{b:02X}" for b in resp)
+        return None
+
+    def stats(self):
+        """Per-command attempts, success rate and latency, plus learned preferences"""
+        with self.lock:
+            commands = []
+            for cmd, stats in zip(self.commands, self._stats):
+                attempts = stats['attempts']
+                commands.append({
+                    'apdu': _apdu_hex(cmd),
+                    'attempts': attempts,
+                    'successes': stats['successes'],
+                    'avg_ms': stats['total_ms'] / attempts if attempts else 0.0,
+                    'max_ms': stats['max_ms'],
+                })
+            preferred = [
+                {'reader': reader, 'atr': _apdu_hex(atr), 'apdu': _apdu_hex(self.commands[i])}
+                for (reader, atr), i in self._preferred.items()
+            ]
+        return {'commands': commands, 'preferred': preferred}
+
+# Shared by the scanner workers and /api/scan_uid
+uid_reader = UIDReader()
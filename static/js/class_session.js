@@ -1,6 +1,8 @@
 // static/js/class_session.js - minimal class session logic
 let CURRENT_SECTION = null;
+let CURRENT_SESSION_ID = null;
 let SESSION_STARTED = false;
+let socket = null;
 
 // Load available sections on page load
 window.addEventListener('DOMContentLoaded', async () => {
@@ -52,6 +54,7 @@ async function startClassSession() {
   document.getElementById('sessionMeta').textContent = `Subject: ${subject} | Section: ${section} | ${start || '—'} - ${end || '—'}`;
   document.getElementById('sessionInfo').textContent = `${subject} - ${section}`;
 
+  CURRENT_SESSION_ID = data.session_id || null;
   SESSION_STARTED = true;
   
   // Clear old data immediately
@@ -69,101 +72,158 @@ async function startClassSession() {
   // Initialize camera
   await initializeCamera();
   
-  // Prime lists with fresh data
-  await refreshLists();
+  // Both lists are drop zones (waiting -> present marks, present -> waiting removes)
+  ['waitingList', 'presentList'].forEach(id => {
+    const list = document.getElementById(id);
+    list.addEventListener('dragover', handleDragOver);
+    list.addEventListener('drop', handleDrop);
+    list.addEventListener('dragleave', handleDragLeave);
+  });
 
-  // Start polling
-  setInterval(refreshLists, 2000);
+  // Live updates; every (re)connect resyncs the full lists
+  connectSessionSocket();
 }
 
-async function refreshLists() {
-  if (!SESSION_STARTED || !CURRENT_SECTION) return;
-  try {
-    const res = await fetch(`/api/session_lists?section=${encodeURIComponent(CURRENT_SECTION)}`, { cache: 'no-store' });
-    const data = await res.json();
+function connectSessionSocket() {
+  if (socket) {
+    joinSectionRoom();
+    refreshLists(true);
+    return;
+  }
+  if (typeof io === 'undefined') {
+    // Socket.IO client unavailable (offline): fall back to polling
+    refreshLists();
+    setInterval(refreshLists, 2000);
+    return;
+  }
+  socket = io();
+  // Rooms are per connection, so rejoin after every reconnect
+  socket.on('connect', () => {
+    joinSectionRoom();
+    refreshLists(true);
+  });
+  socket.on('student_present', data => {
+    if (!isCurrentSection(data.section)) return;
+    removeRow('waitingList', data.name);
+    removeRow('presentList', data.name);
+    document.getElementById('presentList').appendChild(presentRow(data));
+    updateStats(data);
+    showLastScan(data.name);
+  });
+  socket.on('student_removed', data => {
+    if (!isCurrentSection(data.section)) return;
+    removeRow('presentList', data.name);
+    removeRow('waitingList', data.name);
+    document.getElementById('waitingList').appendChild(waitingRow(data));
+    updateStats(data);
+  });
+  socket.on('session_lists_reset', data => {
+    if (data.section && !isCurrentSection(data.section)) return;
+    // Reloaded lists come with the event; otherwise fetch them
+    if (data.waiting && data.present_list) renderLists(data);
+    else refreshLists();
+  });
+}
 
-    // Update stats
-    document.getElementById('statTotal').textContent = data.total;
-    document.getElementById('statPresent').textContent = data.present;
-    document.getElementById('statAbsent').textContent = data.absent;
+// Only receive this section's events (and this session's report)
+function joinSectionRoom() {
+  if (socket && CURRENT_SECTION) {
+    socket.emit('join_section', { section: CURRENT_SECTION, session_id: CURRENT_SESSION_ID });
+  }
+}
 
-    // Update last scan and capture photo (only once per student)
-    if (data.last_scan && data.last_scan.name) {
-      const lastScannedName = data.last_scan.name;
-      document.getElementById('lastScan').textContent = lastScannedName;
-      
-      // Only capture if this is a NEW student (prevent duplicate captures)
-      if (lastScannedName !== window.lastCapturedStudent) {
-        window.lastCapturedStudent = lastScannedName;
-        
-        // Play scan success sound
-        if (typeof soundManager !== 'undefined') {
-          soundManager.playScanSuccess();
-        }
-        
-        capturePhotoWithCountdown(lastScannedName);
-      }
+function isCurrentSection(section) {
+  return String(section || '').trim().toUpperCase() === String(CURRENT_SECTION || '').trim().toUpperCase();
+}
+
+function updateStats(data) {
+  document.getElementById('statTotal').textContent = data.total;
+  document.getElementById('statPresent').textContent = data.present;
+  document.getElementById('statAbsent').textContent = data.absent;
+}
+
+function showLastScan(lastScannedName) {
+  document.getElementById('lastScan').textContent = lastScannedName;
+  
+  // Only capture if this is a NEW student (prevent duplicate captures)
+  if (lastScannedName !== window.lastCapturedStudent) {
+    window.lastCapturedStudent = lastScannedName;
+    
+    // Play scan success sound
+    if (typeof soundManager !== 'undefined') {
+      soundManager.playScanSuccess();
     }
+    
+    capturePhotoWithCountdown(lastScannedName);
+  }
+}
 
-    // Store full data for drag operations
-    window.currentWaiting = data.waiting;
-    window.currentPresent = data.present_list;
+function removeRow(listId, name) {
+  document.querySelectorAll(`#${listId} .item`).forEach(row => {
+    if (row.dataset.name === name) row.remove();
+  });
+}
 
-    // Render waiting
-    const waiting = document.getElementById('waitingList');
-    waiting.innerHTML = '';
-    data.waiting.forEach((s, idx) => {
-      const row = document.createElement('div');
-      row.className = 'item';
-      row.draggable = true;
-      row.dataset.index = idx;
-      row.dataset.name = s.name;
-      row.dataset.rollNo = s.roll_no || '';
-      row.dataset.type = 'waiting';
-      row.innerHTML = `<div>${s.name}</div><div class="muted">${s.roll_no || ''}</div>`;
-      
-      // Drag events
-      row.addEventListener('dragstart', handleDragStart);
-      row.addEventListener('dragend', handleDragEnd);
-      
-      waiting.appendChild(row);
-    });
+function waitingRow(s) {
+  const row = document.createElement('div');
+  row.className = 'item';
+  row.draggable = true;
+  row.dataset.name = s.name;
+  row.dataset.rollNo = s.roll_no || '';
+  row.dataset.type = 'waiting';
+  row.innerHTML = `<div>${s.name}</div><div class="muted">${s.roll_no || ''}</div>`;
+  
+  // Drag events
+  row.addEventListener('dragstart', handleDragStart);
+  row.addEventListener('dragend', handleDragEnd);
+  return row;
+}
 
-    // Make present list a drop zone
-    const presentList = document.getElementById('presentList');
-    presentList.addEventListener('dragover', handleDragOver);
-    presentList.addEventListener('drop', handleDrop);
-    presentList.addEventListener('dragleave', handleDragLeave);
+function presentRow(s) {
+  const row = document.createElement('div');
+  row.className = 'item';
+  row.draggable = true;
+  row.dataset.name = s.name;
+  row.dataset.time = s.time || '';
+  row.dataset.type = 'present';
+  row.innerHTML = `<div>${s.name}</div><div class="muted">${s.time || ''}</div>`;
+  
+  // Drag events
+  row.addEventListener('dragstart', handleDragStart);
+  row.addEventListener('dragend', handleDragEnd);
+  return row;
+}
 
-    // Render present
-    const present = document.getElementById('presentList');
-    present.innerHTML = '';
-    data.present_list.forEach(s => {
-      const row = document.createElement('div');
-      row.className = 'item';
-      row.draggable = true;
-      row.dataset.name = s.name;
-      row.dataset.time = s.time || '';
-      row.dataset.type = 'present';
-      row.innerHTML = `<div>${s.name}</div><div class="muted">${s.time || ''}</div>`;
-      
-      // Drag events
-      row.addEventListener('dragstart', handleDragStart);
-      row.addEventListener('dragend', handleDragEnd);
-      
-      present.appendChild(row);
-    });
-    
-    // Make waiting list a drop zone (for removing from present)
-    const waitingList = document.getElementById('waitingList');
-    waitingList.addEventListener('dragover', handleDragOver);
-    waitingList.addEventListener('drop', handleDrop);
-    waitingList.addEventListener('dragleave', handleDragLeave);
+// Full reload of both lists (initial load and resync only)
+async function refreshLists(resync) {
+  if (!SESSION_STARTED || !CURRENT_SECTION) return;
+  try {
+    const params = `section=${encodeURIComponent(CURRENT_SECTION)}${resync ? '&resync=1' : ''}`;
+    const res = await fetch(`/api/session_lists?${params}`, { cache: 'no-store' });
+    const data = await res.json();
+
+    // Update last scan and capture photo (only once per student)
+    if (data.last_scan && data.last_scan.name) {
+      showLastScan(data.last_scan.name);
+    }
+    renderLists(data);
   } catch (e) {
     // ignore
   }
 }
 
+function renderLists(data) {
+  updateStats(data);
+
+  const waiting = document.getElementById('waitingList');
+  waiting.innerHTML = '';
+  data.waiting.forEach(s => waiting.appendChild(waitingRow(s)));
+
+  const present = document.getElementById('presentList');
+  present.innerHTML = '';
+  data.present_list.forEach(s => present.appendChild(presentRow(s)));
+}
+
 let draggedElement = null;
 
 function handleDragStart(e) {
@@ -245,8 +305,7 @@ async function handleDrop(e) {
         }
       }
       
-      // Refresh lists immediately
-      await refreshLists();
+      // Lists update from the student_present / student_removed event
       
       // Show action message
       const action = isLeftToRight ? 'marked as present' : 'removed from attendance';
@@ -304,6 +363,38 @@ async function resetSession() {
   }
 }
 
+// Resolve when a report job finishes: via the report_ready event, or by
+// polling /api/jobs/<id> when no socket is connected
+function waitForReport(jobId) {
+  return new Promise(resolve => {
+    let finished = false;
+    const finish = report => {
+      if (finished) return;
+      finished = true;
+      if (socket) socket.off('report_ready', onReady);
+      resolve(report);
+    };
+    const onReady = data => {
+      if (data.job_id === jobId) finish(data);
+    };
+    if (socket) socket.on('report_ready', onReady);
+
+    const poll = async () => {
+      if (finished) return;
+      try {
+        const res = await fetch(`/api/jobs/${jobId}`, { cache: 'no-store' });
+        const job = await res.json();
+        if (job.status === 'done' || job.status === 'failed') {
+          finish({ success: job.status === 'done', pdf_file: job.pdf_file });
+          return;
+        }
+      } catch (e) {}
+      setTimeout(poll, socket && socket.connected ? 5000 : 1000);
+    };
+    setTimeout(poll, 1000);
+  });
+}
+
 async function stopSession() {
   if (!SESSION_STARTED) {
     alert('No session started');
@@ -315,6 +406,17 @@ async function stopSession() {
     return;
   }
 
+  // Open the report tab now, while the click still counts as a user
+  // gesture; it is pointed at the PDF once the background job finishes
+  const reportWindow = window.open('', '_blank');
+  if (reportWindow) {
+    reportWindow.document.title = 'Generating report...';
+    reportWindow.document.body.textContent = 'Generating PDF report...';
+  }
+  const closeReportWindow = () => {
+    if (reportWindow && !reportWindow.closed) reportWindow.close();
+  };
+
   // Disable button during processing
   const btn = event.target;
   btn.disabled = true;
@@ -328,17 +430,26 @@ async function stopSession() {
     const data = await res.json();
 
     if (data.success) {
-      // Show success and PDF info
-      alert(`Session stopped successfully!\n\nStats:\nTotal: ${data.stats.total}\nPresent: ${data.stats.present}\nAbsent: ${data.stats.absent}\n\nPDF: ${data.pdf_file}`);
-
-      // Auto-open the PDF in new tab
-      if (data.pdf_file) {
-        window.open(`/static/reports/${data.pdf_file}`, '_blank');
+      // Show success; the PDF is rendered in the background
+      alert(`Session stopped successfully!\n\nStats:\nTotal: ${data.stats.total}\nPresent: ${data.stats.present}\nAbsent: ${data.stats.absent}\n\nPDF: ${data.pdf_file} (generating...)`);
+
+      // Show the PDF in the tab opened above once it is ready
+      if (data.job_id) {
+        waitForReport(data.job_id).then(async report => {
+          if (report.success && report.pdf_file) {
+            const url = `/static/reports/${report.pdf_file}`;
+            if (reportWindow && !reportWindow.closed) reportWindow.location.href = url;
+            else window.open(url, '_blank');
+          } else {
+            closeReportWindow();
+            alert('PDF generation failed');
+          }
+          await refreshReportsList();
+        });
+      } else {
+        closeReportWindow();
       }
 
-      // Refresh reports list
-      await refreshReportsList();
-
       // Reset UI
       SESSION_STARTED = false;
       document.getElementById('setupBox').style.display = 'flex';
@@ -353,9 +464,11 @@ async function stopSession() {
       document.getElementById('statPresent').textContent = '0';
       document.getElementById('statAbsent').textContent = '0';
     } else {
+      closeReportWindow();
       alert('Error: ' + (data.message || 'Unknown error'));
     }
   } catch (e) {
+    closeReportWindow();
     alert('Failed to stop session: ' + e.message);
   } finally {
     btn.disabled = false;
@@ -0,0 +1,96 @@
+"""
+Benchmark for resolving attendance rows to students.
+
+Compares the old nested iterrows scan with join_attendance_students (one
+hash merge on normalised UID) and the in-memory StudentIndex lookup used by
+get_recent_attendance. The nested scan is timed on a sample of attendance
+rows and extrapolated, since running it in full would take hours.
+
+    python test/benchmark_attendance_join.py [attendance_rows] [students]
+"""
+
+import os
+import sys
+import time
+import random
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from database.manager import join_attendance_students
+from database.index import StudentIndex
+
+NESTED_SAMPLE = 20
+
+def print_header(title):
+    """Print a formatted header."""
+    print(f"\n{'='*60}")
+    print(f"  {title}")
+    print(f"{'='*60}")
+
+def make_data(n_attendance, n_students):
+    """Synthetic students.xlsx / attendance.xlsx frames"""
+    rng = random.Random(42)
+    uids = [f"{rng.getrandbits(32):08X}" for _ in range(n_students)]
+    students = pd.DataFrame({
+        'Name': [f"Student {i}" for i in range(n_students)],
+        'Enrollment No': [f"EN{i:06d}" for i in range(n_students)],
+        'Roll No': [str(i) for i in range(n_students)],
+        'Section': [f"S{i % 40}" for i in range(n_students)],
+        'Subject': ['Physics'] * n_students,
+        'NFC UID': uids,
+    })
+    # Mixed case like real reader output, plus some unknown cards
+    scans = [rng.choice(uids).lower() if rng.random() < 0.5 else rng.choice(uids)
+             for _ in range(n_attendance)]
+    scans = [u if rng.random() > 0.02 else 'DEADBEEF' for u in scans]
+    attendance = pd.DataFrame({
+        'Student UID': scans,
+        'Date': ['2025-01-15'] * n_attendance,
+        'Time': [f"{9 + i % 8:02d}:{i % 60:02d}:00" for i in range(n_attendance)],
+        'Timestamp': [''] * n_attendance,
+    })
+    return attendance, students
+
+def nested_join(attendance_df, students_df):
+    """The original O(n*m) loop from export_attendance_to_excel"""
+    students_df = students_df.copy()
+    students_df.columns = [col.strip().lower() for col in students_df.columns]
+    attendance_df = attendance_df.copy()
+    attendance_df.columns = [col.strip().lower() for col in attendance_df.columns]
+    result = []
+    for _, att_row in attendance_df.iterrows():
+        uid = str(att_row.get('student uid', '')).strip()
+        for _, stu_row in students_df.iterrows():
+            if str(stu_row.get('nfc uid', '')).strip().upper() == uid.upper():
+                result.append(stu_row.get('name', ''))
+                break
+    return result
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def main(n_attendance=100_000, n_students=10_000):
+    print_header(f"{n_attendance:,} attendance rows x {n_students:,} students")
+    attendance, students = make_data(n_attendance, n_students)
+
+    sample = attendance.head(NESTED_SAMPLE)
+    nested, nested_s = timed(nested_join, sample, students)
+    print(f"Nested iterrows: {nested_s:.2f}s for {NESTED_SAMPLE} rows "
+          f"(~{nested_s / NESTED_SAMPLE * n_attendance / 60:.0f} min extrapolated)")
+
+    joined, merge_s = timed(join_attendance_students, attendance, students)
+    print(f"Hash merge:      {merge_s:.3f}s for {n_attendance:,} rows ({len(joined):,} matched)")
+    assert list(join_attendance_students(sample, students)['Name']) == nested
+
+    rows = list(students.itertuples(index=False, name=None))
+    index = StudentIndex(lambda: rows, lambda: 1)
+    _, build_s = timed(index.count)
+    names, lookup_s = timed(lambda: [index.get(u) for u in attendance['Student UID']])
+    print(f"StudentIndex:    {build_s:.3f}s build + {lookup_s:.3f}s for {n_attendance:,} lookups")
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,100 @@
+"""
+The SQLite and Excel backends answer the same queries with the same rows.
+
+Both start from the same legacy workbooks: the Excel backend reads them in
+place and the SQLite backend imports them on first run.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('openpyxl')
+
+STUDENTS = [
+    ('Asha', 'EN1', '1', 'A', 'Physics', '04A1'),
+    ('Ravi', 'EN2', '2', 'a', 'Physics', '04b2'),
+    ('Mira', 'EN3', '3', 'B', 'Physics', '04C3'),
+    ('Mira (old card)', 'EN3', '3', 'B', 'Physics', '04c3'),  # registered twice
+    ('Kiran', 'EN4', '4', 'B', 'Physics', ''),
+]
+
+ATTENDANCE = [
+    ('04A1', '2026-01-05', '09:00:00'),
+    ('04c3', '2026-01-05', '09:00:05'),
+    ('04B2', '2026-01-05', '09:00:09'),
+    ('FFFF', '2026-01-05', '09:00:10'),  # unregistered card
+    ('04a1', '2026-01-05', '09:01:00'),
+    ('04C3', '2026-01-06', '10:00:00'),
+]
+
+def write_fixture(directory):
+    os.makedirs(os.path.join(directory, 'data'))
+    pd.DataFrame(STUDENTS, columns=['Name', 'Enrollment No', 'Roll No', 'Section', 'Subject', 'NFC UID']) \
+        .to_excel(os.path.join(directory, 'data', 'students.xlsx'), index=False, sheet_name='Students')
+    pd.DataFrame([(uid, date, time, f'{date}T{time}') for uid, date, time in ATTENDANCE],
+                 columns=['Student UID', 'Date', 'Time', 'Timestamp']) \
+        .to_excel(os.path.join(directory, 'data', 'attendance.xlsx'), index=False, sheet_name='Attendance')
+
+@pytest.fixture
+def backends(tmp_path, monkeypatch):
+    from database import create_database_manager
+    dbs = {}
+    for backend in ('sqlite', 'excel'):
+        directory = tmp_path / backend
+        write_fixture(str(directory))
+        monkeypatch.chdir(directory)
+        db = create_database_manager(backend)
+        db.log_attendance('04c3')
+        db.log_attendance('04A1')
+        db.log_attendance('EEEE')
+        dbs[backend] = db
+    return dbs['sqlite'], dbs['excel']
+
+def export(db, **filters):
+    return [tuple(r) for chunk in db.iter_attendance_export(chunk_size=2, **filters) for r in chunk]
+
+def test_attendance_export_matches(backends):
+    sqlite_db, excel_db = backends
+    past = export(sqlite_db, date_to='2026-01-06')
+    assert past == export(excel_db, date_to='2026-01-06')
+    assert [r[0] for r in past] == ['Asha', 'Mira', 'Ravi', 'Asha', 'Mira']
+    for section in ('a', 'B'):
+        assert export(sqlite_db, date_from='2026-01-05', date_to='2026-01-05', section=section) == \
+            export(excel_db, date_from='2026-01-05', date_to='2026-01-05', section=section)
+
+    # Today's taps carry a wall-clock time; compare everything else
+    today = sqlite_db.today()
+    live = [r[:5] + r[6:] for r in export(sqlite_db, date_from=today)]
+    assert live == [r[:5] + r[6:] for r in export(excel_db, date_from=today)]
+    assert [r[0] for r in live] == ['Mira', 'Asha']
+
+def test_students_export_matches(backends):
+    sqlite_db, excel_db = backends
+    exported = [[tuple(r) for chunk in db.iter_students_export(section='b') for r in chunk]
+                for db in backends]
+    assert exported[0] == exported[1]
+    assert [r[0] for r in exported[0]] == ['Mira', 'Mira (old card)', 'Kiran']
+    assert sqlite_db.count_students() == excel_db.count_students() == len(STUDENTS)
+
+def test_stats_match(backends):
+    sqlite_db, excel_db = backends
+    assert sqlite_db.get_today_stats() == excel_db.get_today_stats() == (len(STUDENTS), 3)
+    for db in backends:
+        assert {u.upper() for u in db.get_present_uids_today_by_section('b')} == {'04C3'}
+        assert [row[0] for row in db.get_present_list_today_by_section('A')] == ['Asha']
+        assert db.get_student_by_uid('04C3')[0] == 'Mira'
+
+def test_attendance_workbook_export_matches(backends):
+    frames = []
+    for db, name in zip(backends, ('sqlite_out.xlsx', 'excel_out.xlsx')):
+        ok, _ = db.export_attendance_to_excel(os.path.abspath(name), date='2026-01-05')
+        assert ok
+        frames.append(pd.read_excel(name, dtype=str).fillna(''))
+    assert frames[0].values.tolist() == frames[1].values.tolist()
+    assert list(frames[0]['Name']) == ['Asha', 'Mira', 'Ravi', 'Asha']
@@ -0,0 +1,65 @@
+"""
+Tests for the reader broker shared by scanning, registration and login.
+"""
+
+import os
+import sys
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nfc.broker import ReaderBroker
+
+def fake_owner(broker, started):
+    """Stands in for the reader supervisor: runs while there is demand."""
+    def run():
+        started.set()
+        while broker.wanted():
+            threading.Event().wait(0.01)
+    return run
+
+def test_waiter_claims_tap_before_subscriber():
+    """A pending wait_for_uid gets the tap; the session does not."""
+    broker = ReaderBroker()
+    started = threading.Event()
+    broker.runner = fake_owner(broker, started)
+    taps = []
+    token = broker.subscribe(lambda reader, uid: taps.append(uid))
+
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(broker.wait_for_uid(timeout=2)))
+    waiter.start()
+    while not broker.stats()['waiting']:
+        threading.Event().wait(0.01)
+    broker.publish("Reader 0", "04A1B2C3")
+    waiter.join()
+    assert result == ["04A1B2C3"]
+    assert taps == []
+
+    broker.publish("Reader 0", "04D5E6F7")
+    assert taps == ["04D5E6F7"]
+    broker.unsubscribe(token)
+    assert started.is_set()
+
+def test_wait_times_out():
+    """With no tap, wait_for_uid returns None and stops waiting."""
+    broker = ReaderBroker()
+    assert broker.wait_for_uid(timeout=0.05) is None
+    assert broker.stats()['waiting'] == 0
+
+def test_owner_stops_without_demand():
+    """The owner thread exits once nobody needs the readers."""
+    broker = ReaderBroker()
+    started = threading.Event()
+    broker.runner = fake_owner(broker, started)
+    token = broker.subscribe(lambda reader, uid: None)
+    assert started.wait(1)
+    broker.unsubscribe(token)
+    for _ in range(100):
+        if not broker.stats()['running']:
+            break
+        threading.Event().wait(0.01)
+    assert not broker.stats()['running']
+    broker.publish("Reader 0", "AA")
+    assert broker.stats()['unclaimed'] == 1
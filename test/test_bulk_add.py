@@ -0,0 +1,80 @@
+"""
+Tests for add_students_bulk on both backends.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def make_db(backend, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from database import create_database_manager
+    db = create_database_manager(backend)
+    assert db.add_student('Asha', 'EN1', '1', 'A', 'Physics', '04A1')
+    return db
+
+class FailingConnection:
+    """sqlite3 connection whose bulk insert fails."""
+    def __init__(self, conn):
+        self.conn = conn
+
+    def executemany(self, *args):
+        raise RuntimeError("disk full")
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+def test_prepare_bulk():
+    from database.base import DatabaseManager
+    outcomes, rows = DatabaseManager._prepare_bulk([
+        (' Ravi ', 'EN2', '2', 'A', 'Physics', ' 04b2 '),
+        ('Ravi again', 'EN2', '2', 'A', 'Physics', '04B2'),
+        ('', 'EN3', '3', 'A', 'Physics', '04C3'),
+        ('Mira', 'EN4', '4', 'A', 'Physics', None),
+        ('Asha', 'EN1', '1', 'A', 'Physics', '04a1'),
+    ], lambda uid: uid == '04A1')
+    assert outcomes == ['added', 'duplicate', 'invalid', 'invalid', 'duplicate']
+    assert rows == [(0, ('Ravi', 'EN2', '2', 'A', 'Physics', '04B2'))]
+
+@pytest.mark.parametrize('backend', ['sqlite', 'excel'])
+def test_bulk_duplicates(backend, tmp_path, monkeypatch):
+    """UIDs repeated in the batch or already registered are skipped."""
+    db = make_db(backend, tmp_path, monkeypatch)
+    outcomes = db.add_students_bulk([
+        ('Ravi', 'EN2', '2', 'B', 'Physics', '04b2'),
+        ('Copy', 'EN5', '5', 'B', 'Physics', '04B2'),
+        ('Asha', 'EN1', '1', 'B', 'Physics', '04a1'),
+        ('Mira', 'EN3', '3', 'B', 'Physics', '04C3'),
+    ])
+    assert outcomes == ['added', 'duplicate', 'duplicate', 'added']
+    assert [s[0] for s in db.get_all_students()] == ['Asha', 'Ravi', 'Mira']
+    assert db.get_student_by_uid('04B2')[0] == 'Ravi'
+    assert db.add_students_bulk([('Asha', '', '', '', '', '04A1')]) == ['duplicate']
+
+@pytest.mark.parametrize('backend', ['sqlite', 'excel'])
+def test_bulk_write_failure(backend, tmp_path, monkeypatch):
+    """A failed write marks the batch as errors and leaves the store as it was."""
+    db = make_db(backend, tmp_path, monkeypatch)
+    with monkeypatch.context() as m:
+        if backend == 'sqlite':
+            m.setattr(db, 'conn', FailingConnection(db.conn))
+        else:
+            import pandas as pd
+
+            def fail(*args, **kwargs):
+                raise RuntimeError("workbook locked")
+            m.setattr(pd.DataFrame, 'to_excel', fail)
+        outcomes = db.add_students_bulk([
+            ('Ravi', 'EN2', '2', 'B', 'Physics', '04B2'),
+            ('Asha', 'EN1', '1', 'B', 'Physics', '04A1'),
+            ('Mira', 'EN3', '3', 'B', 'Physics', '04C3'),
+        ])
+    assert outcomes == ['error', 'duplicate', 'error']
+    assert db.get_student_by_uid('04B2') is None
+    assert [s[0] for s in db.get_all_students()] == ['Asha']
+    # The same rows go through once the store is writable again
+    assert db.add_students_bulk([('Ravi', 'EN2', '2', 'B', 'Physics', '04B2')]) == ['added']
@@ -0,0 +1,49 @@
+"""
+Tests for the time-window tap debouncer used by the scanner.
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nfc.debounce import Debouncer
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def test_same_reader_window():
+    """A repeat tap on the same reader is dropped until the window ends."""
+    clock = FakeClock()
+    debouncer = Debouncer(reader_window=2.0, clock=clock)
+    assert debouncer.accept("Reader 0", "04a1b2c3")
+    clock.now += 1.9
+    assert not debouncer.accept("Reader 0", "04A1B2C3")
+    clock.now += 0.2
+    assert debouncer.accept("Reader 0", "04A1B2C3")
+    assert debouncer.stats()['suppressed'] == 1
+
+def test_global_window_spans_readers():
+    """The global window suppresses the same card on another reader."""
+    clock = FakeClock()
+    debouncer = Debouncer(reader_window=2.0, global_window=1.0, clock=clock)
+    assert debouncer.accept("Reader 0", "AA")
+    clock.now += 0.5
+    assert not debouncer.accept("Reader 1", "AA")
+    clock.now += 0.6
+    assert debouncer.accept("Reader 1", "AA")
+    assert debouncer.accept("Reader 0", "BB")
+
+def test_expired_entries_are_swept():
+    """Expired entries do not accumulate."""
+    clock = FakeClock()
+    debouncer = Debouncer(reader_window=1.0, clock=clock, sweep_every=10)
+    for i in range(10):
+        debouncer.accept("Reader 0", f"UID{i}")
+        clock.now += 2.0
+    assert debouncer.stats()['tracked'] == 1
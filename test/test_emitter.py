@@ -0,0 +1,127 @@
+"""
+Tests for the Socket.IO emit layer used by WebNFCHandler.
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.emitter import Emitter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def make_emitter():
+    """Emitter on a fake clock; tests run the flusher by hand with flush_due()."""
+    sent = []
+    clock = FakeClock()
+    emitter = Emitter(lambda event, data, room: sent.append((event, data)), clock=clock,
+                      spawn=lambda target: None)
+    return emitter, sent, clock
+
+def test_identical_status_is_dropped():
+    """Repeating the last status sends nothing."""
+    emitter, sent, clock = make_emitter()
+    status = {'message': 'No NFC readers detected', 'type': 'error'}
+    assert emitter.emit('status_update', status)
+    for _ in range(5):
+        clock.now += 2.0
+        assert not emitter.emit('status_update', dict(status))
+    assert len(sent) == 1
+    assert emitter.stats()['status_update']['suppressed'] == 5
+
+def test_rate_limit_sends_newest_payload():
+    """Changes inside the interval collapse into one trailing send."""
+    emitter, sent, clock = make_emitter()
+    emitter.emit('status_update', {'message': 'a'}, min_interval=1.0)
+    emitter.emit('status_update', {'message': 'b'}, min_interval=1.0)
+    emitter.emit('status_update', {'message': 'c'}, min_interval=1.0)
+    assert sent == [('status_update', {'message': 'a'})]
+    clock.now += 0.5
+    emitter.flush_due()
+    assert len(sent) == 1
+    clock.now += 0.5
+    emitter.flush_due()
+    assert sent[-1] == ('status_update', {'message': 'c'})
+    assert len(sent) == 2
+
+def test_dashboard_burst_is_coalesced():
+    """A burst of dashboard updates reads stats once and sends once."""
+    emitter, sent, clock = make_emitter()
+    calls = []
+
+    def stats():
+        calls.append(1)
+        return {'total': 30, 'present': len(calls)}
+
+    for _ in range(20):
+        emitter.emit_coalesced('dashboard_update', stats, 0.5)
+        clock.now += 0.01
+    emitter.flush_due()
+    assert calls == []
+    clock.now += 0.5
+    emitter.flush_due()
+    assert len(calls) == 1
+    assert sent == [('dashboard_update', {'total': 30, 'present': 1})]
+
+def test_rooms_are_tracked_separately():
+    """The same status in two section rooms is sent to each once."""
+    emitter, sent, clock = make_emitter()
+    status = {'message': 'Duplicate scan', 'type': 'warning'}
+    assert emitter.emit('status_update', status, room='section:A')
+    assert emitter.emit('status_update', status, room='section:B')
+    assert not emitter.emit('status_update', status, room='section:A')
+    assert len(sent) == 2
+
+def test_one_flusher_serves_every_burst():
+    """Delayed sends share one long-lived flusher instead of a thread per burst."""
+    sent = []
+    done = threading.Event()
+    spawned = []
+
+    def spawn(target):
+        spawned.append(target)
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+
+    def send(event, data, room):
+        sent.append((event, data, room))
+        if len(sent) == 6:
+            done.set()
+
+    emitter = Emitter(send, spawn=spawn)
+    for burst in range(3):
+        for room in ('section:A', 'section:B'):
+            for _ in range(5):
+                emitter.emit_coalesced('dashboard_update', lambda: {'burst': burst}, 0.01 * (burst + 1),
+                                       room=room, dedupe=False)
+        # Let the burst go out before starting the next one
+        time.sleep(0.05 * (burst + 1))
+    assert done.wait(5)
+    assert len(spawned) == 1
+    assert [data['burst'] for _, data, _ in sent] == [0, 0, 1, 1, 2, 2]
+    assert emitter.stats()['dashboard_update']['coalesced'] == 24
+
+def test_failed_send_does_not_stop_flusher():
+    sent = []
+    done = threading.Event()
+
+    def send(event, data, room):
+        if data == 'boom':
+            raise RuntimeError("socket closed")
+        sent.append(data)
+        done.set()
+
+    emitter = Emitter(send)
+    emitter.emit_coalesced('dashboard_update', lambda: 'boom', 0.01)
+    time.sleep(0.1)
+    emitter.emit_coalesced('dashboard_update', lambda: 'ok', 0.01)
+    assert done.wait(5) and sent == ['ok']
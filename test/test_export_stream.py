@@ -0,0 +1,90 @@
+"""
+Tests for the streaming attendance/student exports of both backends and
+the /api/export_stream endpoint.
+"""
+
+import csv
+import io
+import os
+import sys
+import threading
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STUDENTS = [
+    ('Asha', 'EN1', '1', 'A', 'Physics', '04A1'),
+    ('Ravi', 'EN2', '2', 'A', 'Physics', '04B2'),
+    ('Mira', 'EN3', '3', 'B', 'Physics', '04C3'),
+]
+
+def make_db(backend, tmp_path, monkeypatch):
+    """Backend with its data files in a tmp dir (managers use relative paths)."""
+    monkeypatch.chdir(tmp_path)
+    from database import create_database_manager
+    db = create_database_manager(backend)
+    for student in STUDENTS:
+        assert db.add_student(*student)
+    return db
+
+def log_taps(db):
+    db.log_attendance('04a1')
+    if hasattr(db, 'compact_journal'):
+        # One row in attendance.xlsx, the rest still in the journal
+        db.compact_journal()
+    db.log_attendance('04C3')
+    db.log_attendance('FFFF')  # unregistered card
+
+def rows(chunks):
+    return [tuple(r) for chunk in chunks for r in chunk]
+
+@pytest.mark.parametrize('backend', ['sqlite', 'excel'])
+def test_attendance_export_filters(backend, tmp_path, monkeypatch):
+    """Taps are joined to students and filtered by section and date."""
+    db = make_db(backend, tmp_path, monkeypatch)
+    log_taps(db)
+    today = db.today()
+    exported = rows(db.iter_attendance_export(chunk_size=1))
+    assert [r[0] for r in exported] == ['Asha', 'Mira']
+    assert exported[0][:5] == STUDENTS[0][:5] and exported[0][6] == today
+    assert [r[0] for r in rows(db.iter_attendance_export(section='b'))] == ['Mira']
+    assert rows(db.iter_attendance_export(date_from='2000-01-01', date_to='2000-12-31')) == []
+
+@pytest.mark.parametrize('backend', ['sqlite', 'excel'])
+def test_students_export(backend, tmp_path, monkeypatch):
+    db = make_db(backend, tmp_path, monkeypatch)
+    assert [r[0] for r in rows(db.iter_students_export(chunk_size=2))] == ['Asha', 'Ravi', 'Mira']
+    assert [r[0] for r in rows(db.iter_students_export(section='A'))] == ['Asha', 'Ravi']
+
+def test_excel_export_does_not_hold_lock(tmp_path, monkeypatch):
+    """A paused download does not block other calls on the Excel backend."""
+    db = make_db('excel', tmp_path, monkeypatch)
+    log_taps(db)
+    gen = db.iter_attendance_export(chunk_size=1)
+    assert next(gen)
+    result = []
+    reader = threading.Thread(target=lambda: result.append(db.get_student_by_uid('04B2')))
+    reader.start()
+    reader.join(2)
+    assert result and result[0][0] == 'Ravi'
+    assert [r[0] for r in rows(gen)] == ['Mira']
+
+def test_export_stream_endpoint(tmp_path, monkeypatch):
+    """The endpoint streams a CSV of the requested rows."""
+    pytest.importorskip('smartcard')
+    db = make_db('sqlite', tmp_path, monkeypatch)
+    log_taps(db)
+    import app as app_module
+    monkeypatch.setattr(app_module, 'db', db)
+    client = app_module.app.test_client()
+    assert client.get('/api/export_stream').status_code == 401
+    with client.session_transaction() as sess:
+        sess['authenticated'] = True
+    assert client.get('/api/export_stream?format=pdf').status_code == 400
+    res = client.get('/api/export_stream?kind=attendance&format=csv&section=A')
+    assert res.status_code == 200
+    assert 'attendance_A.csv' in res.headers['Content-Disposition']
+    table = list(csv.reader(io.StringIO(res.get_data(as_text=True).lstrip('﻿'))))
+    assert table[0][0] == 'Name' and [r[0] for r in table[1:]] == ['Asha']
@@ -0,0 +1,187 @@
+"""
+Tests for the in-memory student and attendance indexes.
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.index import StudentIndex, AttendanceIndex
+
+class Store:
+    """Students and per-date scans, with a version bumped on every write."""
+    def __init__(self):
+        self.students = [('Asha', 'EN1', '1', 'A', 'Physics', '04a1'),
+                         ('Ravi', 'EN2', '2', 'B', 'Physics', '04B2')]
+        self.scans = {}
+        self.student_version = 0
+        self.scan_version = 0
+        self.student_loads = 0
+        self.day_loads = []
+
+    def load_students(self):
+        self.student_loads += 1
+        return list(self.students)
+
+    def load_day(self, date):
+        self.day_loads.append(date)
+        return list(self.scans.get(date, []))
+
+def make_indexes(store):
+    students = StudentIndex(store.load_students, lambda: store.student_version)
+    attendance = AttendanceIndex(store.load_day, students, lambda: store.scan_version)
+    return students, attendance
+
+def test_student_index_rebuilds_only_on_signature_change():
+    store = Store()
+    students, _ = make_indexes(store)
+    assert students.get('04A1')[0] == 'Asha'
+    assert ' 04b2 ' in students and students.count() == 2
+    assert store.student_loads == 1
+
+    students.add(('Mira', 'EN3', '3', 'A', 'Physics', '04C3'))
+    assert students.get('04c3')[0] == 'Mira' and store.student_loads == 1
+
+    store.students.append(('Kiran', 'EN4', '4', 'B', 'Physics', '04D4'))
+    store.student_version += 1
+    assert students.cached('04D4') == (False, None)
+    assert students.get('04D4')[0] == 'Kiran' and store.student_loads == 2
+    assert students.cached('04D4')[0]
+
+def test_cached_never_loads():
+    store = Store()
+    students, _ = make_indexes(store)
+    assert students.cached('04A1') == (False, None)
+    assert store.student_loads == 0
+    students.get('04A1')
+    assert students.cached('FFFF') == (True, None)
+    students.invalidate()
+    assert students.cached('04A1') == (False, None)
+
+def test_partitions_are_evicted_least_recently_used():
+    store = Store()
+    _, attendance = make_indexes(store)
+    dates = ['2026-01-0%d' % d for d in range(1, AttendanceIndex.MAX_PARTITIONS + 1)]
+    for date in dates:
+        attendance.present_count(date)
+    attendance.present_count(dates[0])  # keep the oldest in use
+    attendance.present_count('2026-01-09')
+    assert store.day_loads == dates + ['2026-01-09']
+    attendance.present_count(dates[0])
+    assert len(store.day_loads) == len(dates) + 1
+    attendance.present_count(dates[1])  # evicted
+    assert store.day_loads[-1] == dates[1]
+
+def test_record_and_sections():
+    store = Store()
+    _, attendance = make_indexes(store)
+    store.scans['d'] = [('04A1', '09:00:00'), ('FFFF', '09:00:01')]
+    assert attendance.present_count('d') == 2
+    attendance.record('04b2', 'd', '09:00:02')
+    attendance.record('04B2', 'd', '09:00:03')
+    assert attendance.present_uids_by_section('d', 'b') == {'04b2'}
+    assert attendance.section_rows('d', 'B') == [('Ravi', '09:00:02', '04B2'), ('Ravi', '09:00:03', '04B2')]
+    assert attendance.recent('d', 1) == [('Ravi', '09:00:03')]
+    attendance.remove('04B2', 'd')
+    assert attendance.present_count('d') == 2
+    assert store.day_loads == ['d']
+
+def test_sync_signature_keeps_partitions():
+    """Own writes adopt the new signature; outside writes drop every partition."""
+    store = Store()
+    _, attendance = make_indexes(store)
+    store.scans['d'] = [('04A1', '09:00:00')]
+    attendance.present_count('d')
+
+    store.scan_version += 1
+    attendance.sync_signature()
+    assert attendance.present_count('d') == 1
+    assert store.day_loads == ['d']
+
+    store.scans['d'].append(('04B2', '09:00:01'))
+    store.scan_version += 1
+    assert attendance.present_count('d') == 2
+    assert store.day_loads == ['d', 'd']
+
+def test_record_with_stale_students_drops_partition():
+    """record() does not reload the students; the next query rebuilds the day."""
+    store = Store()
+    students, attendance = make_indexes(store)
+    students.get('04A1')
+    attendance.present_count('d')
+    store.students.append(('Kiran', 'EN4', '4', 'B', 'Physics', '04D4'))
+    store.student_version += 1
+    store.scans['d'] = [('04D4', '09:00:00')]
+    attendance.record('04D4', 'd', '09:00:00')
+    assert store.student_loads == 1
+    assert attendance.present_uids_by_section('d', 'B') == {'04D4'}
+    assert store.day_loads == ['d', 'd']
+
+def test_failed_record_drops_partition():
+    store = Store()
+    students, attendance = make_indexes(store)
+    attendance.present_count('d')
+
+    def broken(uid):
+        raise RuntimeError("index corrupted")
+
+    students.cached = broken
+    store.scans['d'] = [('04A1', '09:00:00')]
+    with pytest.raises(RuntimeError):
+        attendance.record('04A1', 'd', '09:00:00')
+    del students.cached
+    assert attendance.present_count('d') == 1
+
+def test_excel_lookup_does_not_wait_for_manager_lock(tmp_path, monkeypatch):
+    """A fresh index serves UID lookups while a compaction holds db.lock."""
+    monkeypatch.chdir(tmp_path)
+    from database import create_database_manager
+    db = create_database_manager('excel')
+    assert db.add_student('Asha', 'EN1', '1', 'A', 'Physics', '04A1')
+    result = []
+    with db.lock:
+        reader = threading.Thread(target=lambda: result.append(db.get_student_by_uid('04a1')))
+        reader.start()
+        reader.join(2)
+        assert result and result[0][0] == 'Asha'
+        # Logging a tap does not need the manager lock either
+        tap = threading.Thread(target=db.log_attendance, args=('04A1',))
+        tap.start()
+        tap.join(2)
+        assert not tap.is_alive()
+    assert db.get_present_uids_today() == {'04A1'}
+
+@pytest.mark.parametrize('method', ['clear_attendance_for_date', 'remove_attendance_for_uid'])
+def test_excel_tap_during_rewrite_is_kept(method, tmp_path, monkeypatch):
+    """A tap logged while the workbook is rewritten survives in the index."""
+    monkeypatch.chdir(tmp_path)
+    import pandas as pd
+    from database import create_database_manager
+    db = create_database_manager('excel')
+    assert db.add_student('Asha', 'EN1', '1', 'A', 'Physics', '04A1')
+    assert db.log_attendance('04A1')
+    today = db.today()
+    assert db.get_present_uids_today() == {'04A1'}
+
+    to_excel = pd.DataFrame.to_excel
+
+    def write_with_tap(frame, *args, **kwargs):
+        # Another reader logs a tap between the rotate and the index update
+        tap = threading.Thread(target=db.log_attendance, args=('04A1',))
+        tap.start()
+        tap.join(2)
+        assert not tap.is_alive()
+        return to_excel(frame, *args, **kwargs)
+
+    with monkeypatch.context() as m:
+        m.setattr(pd.DataFrame, 'to_excel', write_with_tap)
+        args = (today,) if method == 'clear_attendance_for_date' else ('04A1', today)
+        assert getattr(db, method)(*args)
+    assert db.get_present_uids_today() == {'04A1'}
+    db.attendance_index.invalidate()
+    assert db.get_present_uids_today() == {'04A1'}
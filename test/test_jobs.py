@@ -0,0 +1,52 @@
+"""
+Tests for the background job queue used for session report PDFs.
+"""
+
+import os
+import sys
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jobs import JobQueue
+
+def run_job(queue, fn, *args, **meta):
+    finished = threading.Event()
+    done = []
+    job_id = queue.submit('test', fn, *args, on_done=lambda job: (done.append(job), finished.set()), **meta)
+    assert finished.wait(5)
+    return job_id, done[0]
+
+def test_submit_reports_result_and_meta():
+    """A finished job carries its result and the metadata it was queued with."""
+    queue = JobQueue(workers=1)
+    job_id, job = run_job(queue, lambda a, b: a + b, 2, 3, pdf_file='r.pdf')
+    assert job['status'] == 'done' and job['result'] == 5
+    assert job['pdf_file'] == 'r.pdf'
+    assert queue.get(job_id)['status'] == 'done'
+    assert queue.get('missing') is None
+
+def test_failed_job_records_error():
+    """An exception marks the job failed instead of escaping the worker."""
+    def boom():
+        raise ValueError("no roster")
+    queue = JobQueue(workers=1)
+    job_id, job = run_job(queue, boom)
+    assert job['status'] == 'failed' and job['error'] == 'no roster'
+    assert queue.get(job_id)['finished'] is not None
+
+def test_running_status():
+    """A job that has started but not finished reports running."""
+    queue = JobQueue(workers=1)
+    started, release = threading.Event(), threading.Event()
+
+    def work():
+        started.set()
+        release.wait(5)
+        return True
+
+    job_id = queue.submit('test', work)
+    assert started.wait(5)
+    assert queue.get(job_id)['status'] == 'running'
+    release.set()
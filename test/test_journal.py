@@ -0,0 +1,107 @@
+"""
+Tests for the append-only attendance journal of the Excel backend.
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import journal as journal_module
+from database.journal import AttendanceJournal
+
+def tap(uid, n=0):
+    return {'Student UID': uid, 'Date': '2026-01-05', 'Time': f'09:00:{n:02d}'}
+
+def count_fsyncs(monkeypatch):
+    calls = []
+    real = os.fsync
+    monkeypatch.setattr(journal_module.os, 'fsync', lambda fd: (calls.append(fd), real(fd)))
+    return calls
+
+def test_append_survives_reopen(tmp_path):
+    path = str(tmp_path / 'data' / 'attendance.journal')
+    journal = AttendanceJournal(path)
+    journal.append(tap('04A1'))
+    journal.append(tap('04B2', 1))
+    assert len(journal) == 2
+    journal.sync()
+    reopened = AttendanceJournal(path)
+    assert len(reopened) == 2
+    assert [r['Student UID'] for r in reopened.records()] == ['04A1', '04B2']
+
+def test_fsync_is_batched(tmp_path, monkeypatch):
+    """Appends fsync every batch_size records, not on every write."""
+    calls = count_fsyncs(monkeypatch)
+    journal = AttendanceJournal(str(tmp_path / 'j'), batch_size=3, sync_interval=3600)
+    for n in range(7):
+        journal.append(tap('04A1', n))
+    assert len(calls) == 2
+    journal.sync()
+    assert len(calls) == 3
+    journal.sync()  # nothing new to flush
+    assert len(calls) == 3
+
+def test_fsync_after_interval(tmp_path, monkeypatch):
+    calls = count_fsyncs(monkeypatch)
+    now = [1000.0]
+    monkeypatch.setattr(journal_module.time, 'monotonic', lambda: now[0])
+    journal = AttendanceJournal(str(tmp_path / 'j'), batch_size=100, sync_interval=1.0)
+    journal.append(tap('04A1'))
+    assert calls == []
+    now[0] += 1.5
+    journal.append(tap('04B2', 1))
+    assert len(calls) == 1
+
+def test_rotate_and_compaction(tmp_path):
+    """Rotated records stay visible until the compaction finishes."""
+    journal = AttendanceJournal(str(tmp_path / 'j'))
+    assert not journal.rotate()
+    journal.append(tap('04A1'))
+    assert journal.rotate()
+    assert len(journal) == 0
+    journal.append(tap('04B2', 1))
+    assert [r['Student UID'] for r in journal.compacting_records()] == ['04A1']
+    assert [r['Student UID'] for r in journal.records()] == ['04A1', '04B2']
+    journal.finish_compaction()
+    assert [r['Student UID'] for r in journal.records()] == ['04B2']
+    journal.finish_compaction()  # already gone
+
+def test_recovers_interrupted_compaction(tmp_path):
+    """A segment left by a crash mid-compaction is merged on the next rotate."""
+    path = str(tmp_path / 'j')
+    journal = AttendanceJournal(path)
+    journal.append(tap('04A1'))
+    assert journal.rotate()
+    journal.append(tap('04B2', 1))
+    journal.sync()
+    # Process dies before finish_compaction
+    restarted = AttendanceJournal(path)
+    assert [r['Student UID'] for r in restarted.records()] == ['04A1', '04B2']
+    assert restarted.rotate()
+    assert not os.path.exists(path)
+    assert [r['Student UID'] for r in restarted.compacting_records()] == ['04A1', '04B2']
+    restarted.finish_compaction()
+    assert restarted.records() == []
+
+def test_leftover_segment_alone_is_compacted(tmp_path):
+    """With no live segment, a leftover one still needs compacting."""
+    path = str(tmp_path / 'j')
+    journal = AttendanceJournal(path)
+    journal.append(tap('04A1'))
+    journal.rotate()
+    assert AttendanceJournal(path).rotate()
+
+def test_torn_line_is_skipped(tmp_path):
+    """A partial line from a crash mid-append does not hide other records."""
+    path = str(tmp_path / 'j')
+    journal = AttendanceJournal(path)
+    journal.append(tap('04A1'))
+    journal.sync()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"Student UID": "04B')
+    reopened = AttendanceJournal(path)
+    assert [r['Student UID'] for r in reopened.records()] == ['04A1']
+    reopened.append(tap('04C3', 2))
+    assert [r['Student UID'] for r in reopened.records()] == ['04A1', '04C3']
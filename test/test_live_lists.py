@@ -0,0 +1,92 @@
+"""
+The live session lists pushed over Socket.IO agree with a resync from the
+store.
+"""
+
+import os
+import sys
+import threading
+from datetime import timedelta
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('smartcard')
+
+ROSTERS = {
+    'A': [{'name': 'Asha', 'roll': '1', 'uid': '04A1'},
+          {'name': 'Ravi', 'roll': '2', 'uid': '04B2'}],
+    'B': [{'name': 'Mira', 'roll': '3', 'uid': '04C3'}],
+}
+
+class FakeSocketIO:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event, data=None, to=None):
+        self.events.append((event, data))
+
+    def start_background_task(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        return thread
+
+    def sent(self, event):
+        return [data for name, data in self.events if name == event]
+
+@pytest.fixture
+def live(tmp_path, monkeypatch):
+    """App wired to a tmp SQLite store, a fake socket and an active session for section A."""
+    monkeypatch.chdir(tmp_path)
+    import app as app_module
+    from config import Config
+    from database import create_database_manager
+    from models import session_mgr
+    from models.session_lists import SessionLists
+    from nfc import broadcom_scanner
+
+    # A clock far from any server's local time
+    monkeypatch.setattr(Config, 'TIMEZONE_OFFSET', timedelta(hours=-9, minutes=-13))
+    db = create_database_manager('sqlite')
+    for section, roster in ROSTERS.items():
+        for r in roster:
+            assert db.add_student(r['name'], '', r['roll'], section, 'Physics', r['uid'])
+    lists = SessionLists(lambda section: (ROSTERS[section], db.get_present_list_today_by_section(section)))
+    socket = FakeSocketIO()
+    handler = app_module.WebNFCHandler(socket)
+    for module in (app_module, broadcom_scanner):
+        monkeypatch.setattr(module, 'db', db)
+    monkeypatch.setattr(app_module, 'session_lists', lists)
+    monkeypatch.setattr(app_module, 'web_handler', handler)
+    monkeypatch.setattr(broadcom_scanner, 'voice_feedback', lambda text: None)
+    monkeypatch.setattr(session_mgr, 'current_session', {'id': 'test', 'section': 'A'})
+    monkeypatch.setattr(session_mgr, 'scanned_uids', set())
+    lists.snapshot('A')
+    return app_module, handler, socket, lists
+
+def test_pushed_tap_matches_resync(live):
+    """The time in student_present is the time the store recorded."""
+    app_module, handler, socket, lists = live
+    from nfc.broadcom_scanner import process_uid
+    process_uid(handler, 'reader', '04A1')
+    delta = socket.sent('student_present')[0]
+    assert socket.sent('new_attendance')[0]['time'] == delta['time']
+
+    resync = app_module.app.test_client().get('/api/session_lists?section=A&resync=1').get_json()
+    assert resync['present_list'] == [{'name': 'Asha', 'time': delta['time']}]
+    assert [s['name'] for s in resync['waiting']] == ['Ravi']
+    assert resync['last_scan']['time'] == delta['time']
+
+def test_reset_reloads_every_section(live):
+    """Clearing today's attendance drops the cached lists of other sections too."""
+    app_module, handler, socket, lists = live
+    app_module.db.log_attendance('04C3')
+    assert lists.snapshot('B')['present'] == 1
+    client = app_module.app.test_client()
+    with client.session_transaction() as sess:
+        sess['authenticated'] = True
+    assert client.post('/api/reset_session').get_json()['success']
+    assert lists.snapshot('B')['present'] == 0
+    assert socket.sent('session_lists_reset')[-1]['section'] == 'A'
@@ -0,0 +1,40 @@
+"""
+Tests for the latest-photo-per-student index used by session reports.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.photo_index import PhotoIndex, photo_key
+
+def touch(folder, name):
+    open(os.path.join(folder, name), 'wb').close()
+
+def test_rebuild_picks_newest_photo():
+    """The newest capture of a student wins, other students are separate."""
+    folder = tempfile.mkdtemp()
+    touch(folder, "20250101_090000_001_Asha_Rao.jpg")
+    touch(folder, "20250102_090000_001_Asha_Rao.jpg")
+    touch(folder, "20250103_090000_001_Asha_Raot.jpg")
+    touch(folder, "notes.txt")
+    index = PhotoIndex(folder)
+    assert index.latest("Asha Rao").endswith("20250102_090000_001_Asha_Rao.jpg")
+    assert index.latest("Nobody") is None
+
+def test_add_updates_without_rescan():
+    """Captures recorded with add() are visible immediately."""
+    folder = tempfile.mkdtemp()
+    index = PhotoIndex(folder)
+    assert index.latest("Ravi") is None
+    name = f"20250105_101010_500_{photo_key('Ravi')}.jpg"
+    touch(folder, name)
+    index.add(name)
+    assert index.latest("ravi").endswith(name)
+
+def test_key_matches_capture_filenames():
+    """Long names and punctuation map to the same truncated key."""
+    assert photo_key("Dr. Anand Krishnamurthy Iyer") == "Dr_Anand_Krishnamurt"
@@ -0,0 +1,78 @@
+"""
+Tests for the persistent per-reader connection used by the reader workers.
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nfc.connection import ReaderConnection, ConnectionPool
+
+class FakeCard:
+    def __init__(self, uid):
+        self.uid = uid
+
+class FakeConnection:
+    def __init__(self, reader):
+        self.reader = reader
+        self.handle = None
+
+    def connect(self):
+        self.reader.connects += 1
+        self.handle = self.reader.card
+
+    def disconnect(self):
+        self.handle = None
+
+    def getATR(self):
+        return [0x3B, 0x8F]
+
+    def transmit(self, apdu):
+        if self.handle is None or self.handle is not self.reader.card:
+            raise RuntimeError("card removed")
+        return list(bytes.fromhex(self.handle.uid)), 0x90, 0x00
+
+class FakeReader:
+    def __init__(self, card=None):
+        self.card = card
+        self.connects = 0
+        self.created = 0
+
+    def createConnection(self):
+        self.created += 1
+        return FakeConnection(self)
+
+    def __str__(self):
+        return "Fake Reader 0"
+
+def test_resting_card_reuses_connection():
+    """Polling a resting card connects once."""
+    reader = FakeReader(FakeCard("04A1B2C3"))
+    conn = ReaderConnection(reader)
+    for _ in range(10):
+        assert conn.read_uid() == "04A1B2C3"
+    stats = conn.stats()
+    assert reader.connects == 1 and reader.created == 1
+    assert stats['transmits'] == 10 and stats['reconnects'] == 0
+
+def test_swapped_card_reconnects():
+    """A failed read releases the handle; the next read connects to the new card."""
+    reader = FakeReader(FakeCard("04A1B2C3"))
+    conn = ReaderConnection(reader)
+    assert conn.read_uid() == "04A1B2C3"
+    reader.card = FakeCard("04D5E6F7")
+    assert conn.read_uid() is None
+    assert conn.read_uid() == "04D5E6F7"
+    assert conn.read_uid(new_card=True) == "04D5E6F7"
+    assert reader.connects == 3 and reader.created == 1
+    assert conn.stats()['reconnects'] == 2
+
+def test_pool_replaces_replugged_reader():
+    """The same reader name with a new reader object gets a new connection."""
+    pool = ConnectionPool()
+    first = pool.get(FakeReader())
+    assert pool.get(first.reader) is first
+    assert pool.get(FakeReader()) is not first
+    assert list(pool.stats()) == ["Fake Reader 0"]
@@ -0,0 +1,55 @@
+"""
+Tests for the cached reader registry used by the reader supervisor.
+"""
+
+import os
+import sys
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nfc.registry import ReaderRegistry
+
+class FakeSystem:
+    def __init__(self, *names):
+        self.names = list(names)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return list(self.names)
+
+def test_snapshot_is_cached():
+    """Repeated snapshots enumerate only once."""
+    system = FakeSystem("ACR122U PICC Contactless 0")
+    registry = ReaderRegistry(enumerate=system, use_monitor=False)
+    for _ in range(50):
+        rdrs, version = registry.snapshot()
+    assert rdrs == ["ACR122U PICC Contactless 0"]
+    assert system.calls == 1
+
+def test_refresh_bumps_version_only_on_change():
+    """An unchanged reader set keeps its version; a hot-plug bumps it."""
+    system = FakeSystem("Reader 0")
+    registry = ReaderRegistry(enumerate=system, use_monitor=False)
+    _, version = registry.snapshot()
+    assert not registry.refresh()
+    assert registry.snapshot()[1] == version
+    system.names.append("Reader 1")
+    assert registry.refresh()
+    assert registry.snapshot() == (["Reader 0", "Reader 1"], version + 1)
+
+def test_poll_mode_wakes_waiters():
+    """The background refresh wakes wait_for_change when a reader is plugged in."""
+    system = FakeSystem()
+    registry = ReaderRegistry(enumerate=system, poll_interval=0.01, use_monitor=False)
+    _, version = registry.snapshot()
+    registry.start()
+    try:
+        assert registry.mode == 'poll'
+        threading.Timer(0.05, lambda: system.names.append("Reader 0")).start()
+        assert registry.wait_for_change(version, timeout=2) == version + 1
+        assert registry.readers() == ["Reader 0"]
+    finally:
+        registry.stop()
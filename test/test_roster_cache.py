@@ -0,0 +1,102 @@
+"""
+Tests for the section roster cache and its UID -> section index.
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.roster import RosterCache
+
+def parse_lines(path, section):
+    """Stand-in for the workbook parser: one "name,uid" per line."""
+    rows = []
+    with open(path) as f:
+        for line in f.read().split():
+            name, uid = line.split(',')
+            rows.append({'name': name, 'enroll': '', 'roll': '', 'subject': '',
+                         'section': section, 'uid': uid.upper()})
+    return rows
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path, section):
+        self.calls += 1
+        return parse_lines(path, section)
+
+def write_section(base, section, rows, mtime):
+    path = os.path.join(base, f'{section}.xlsx')
+    with open(path, 'w') as f:
+        f.write('\n'.join(f'{name},{uid}' for name, uid in rows))
+    os.utime(path, ns=(mtime, mtime))
+
+def test_unchanged_workbook_is_parsed_once(tmp_path):
+    write_section(tmp_path, 'A', [('Asha', '04a1')], 10**18)
+    parser = Counter()
+    cache = RosterCache(str(tmp_path), parser)
+    for _ in range(5):
+        assert cache.find_by_uid('A', '04A1')['name'] == 'Asha'
+    assert cache.find_by_name('A', 'Asha')['uid'] == '04A1'
+    assert parser.calls == 1
+
+def test_miss_does_not_touch_filesystem(tmp_path, monkeypatch):
+    write_section(tmp_path, 'A', [('Asha', '04A1')], 10**18)
+    parser = Counter()
+    cache = RosterCache(str(tmp_path), parser)
+    cache.build_index()
+
+    def boom(*args, **kwargs):
+        raise AssertionError("filesystem touched on a miss")
+
+    with monkeypatch.context() as m:
+        for name in ('stat', 'listdir', 'scandir'):
+            m.setattr(os, name, boom)
+        m.setattr(os.path, 'isdir', boom)
+        for _ in range(3):
+            assert cache.find_in_any_section('FFFF') is None
+    assert parser.calls == 1
+
+def test_new_section_and_new_uid_are_found_after_reindex(tmp_path):
+    """Workbooks created or edited after indexing are picked up by a rebuild."""
+    write_section(tmp_path, 'A', [('Asha', '04A1')], 10**18)
+    cache = RosterCache(str(tmp_path), Counter())
+    cache.build_index()
+    assert cache.find_in_any_section('04B2') is None
+
+    write_section(tmp_path, 'B', [('Ravi', '04B2')], 10**18 + 1)
+    assert cache.find_in_any_section('04b2') is None
+    cache.build_index()
+    assert cache.find_in_any_section('04b2')['section'] == 'B'
+
+    write_section(tmp_path, 'A', [('Asha', '04A1'), ('Mira', '04C3')], 10**18 + 2)
+    cache.refresh('A')
+    assert cache.find_in_any_section('04C3')['name'] == 'Mira'
+
+def test_moved_uid_follows_latest_workbook(tmp_path):
+    """A UID moved between sections is owned by the workbook that lists it now."""
+    write_section(tmp_path, 'A', [('Asha', '04A1')], 10**18)
+    write_section(tmp_path, 'B', [('Ravi', '04B2')], 10**18)
+    cache = RosterCache(str(tmp_path), Counter())
+    assert cache.find_in_any_section('04A1')['section'] == 'A'
+
+    write_section(tmp_path, 'B', [('Ravi', '04B2'), ('Asha', '04A1')], 10**18 + 1)
+    write_section(tmp_path, 'A', [('Other', '04D4')], 10**18 + 2)
+    cache.build_index()
+    assert cache.find_in_any_section('04A1')['section'] == 'B'
+
+    # Listed in both: the most recently modified workbook wins
+    write_section(tmp_path, 'A', [('Asha', '04A1')], 10**18 + 3)
+    cache.build_index()
+    assert cache.find_in_any_section('04A1')['section'] == 'A'
+
+def test_deleted_section_is_dropped(tmp_path):
+    write_section(tmp_path, 'A', [('Asha', '04A1')], 10**18)
+    cache = RosterCache(str(tmp_path), Counter())
+    assert cache.find_in_any_section('04A1')
+    os.remove(tmp_path / 'A.xlsx')
+    assert cache.find_in_any_section('04A1') is None
+    assert cache.sections() == []
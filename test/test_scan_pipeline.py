@@ -0,0 +1,47 @@
+"""
+Tests for the scan pipeline that decouples UID reads from processing.
+"""
+
+import os
+import sys
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nfc.pipeline import ScanPipeline
+
+def test_events_processed_in_order_per_uid():
+    """Taps of the same card are handled in submission order."""
+    seen = []
+    pipeline = ScanPipeline(lambda reader, uid, ts: seen.append((uid, reader)), workers=3).start()
+    for i in range(20):
+        pipeline.submit(i, "AABBCCDD")
+    pipeline.stop()
+    assert [r for _, r in seen] == list(range(20))
+    assert pipeline.stats()['processed'] == 20
+
+def test_full_queue_drops_instead_of_blocking():
+    """A slow handler fills the queue; extra taps are dropped and counted."""
+    release = threading.Event()
+    pipeline = ScanPipeline(lambda reader, uid, ts: release.wait(), workers=1, maxsize=2).start()
+    accepted = [pipeline.submit("r", "11223344") for _ in range(6)]
+    assert not all(accepted)
+    release.set()
+    pipeline.stop()
+    stats = pipeline.stats()
+    assert stats['dropped'] == accepted.count(False)
+    assert stats['processed'] == accepted.count(True)
+
+def test_handler_errors_are_counted():
+    """An exception in one event does not stop the worker."""
+    def handler(reader, uid, ts):
+        if uid == "BAD00000":
+            raise ValueError("boom")
+    pipeline = ScanPipeline(handler, workers=1).start()
+    pipeline.submit("r", "BAD00000")
+    pipeline.submit("r", "GOOD0000")
+    pipeline.stop()
+    stats = pipeline.stats()
+    assert stats['errors'] == 1
+    assert stats['processed'] == 2
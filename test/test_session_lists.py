@@ -0,0 +1,75 @@
+"""
+Tests for the in-memory waiting/present lists behind the session page.
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.session_lists import SessionLists
+
+class FakeStore:
+    """Roster plus today's attendance rows, as load_session_lists returns them."""
+    def __init__(self):
+        self.roster = [
+            {'name': 'Asha', 'roll': '1', 'uid': '04a1'},
+            {'name': 'Ravi', 'roll': '2', 'uid': '04B2'},
+        ]
+        self.present = []
+        self.loads = 0
+
+    def __call__(self, section):
+        self.loads += 1
+        return list(self.roster), list(self.present)
+
+def test_mark_present_and_absent_deltas():
+    """Taps on a loaded section return deltas with updated counts."""
+    store = FakeStore()
+    lists = SessionLists(store)
+    assert lists.snapshot('A')['absent'] == 2
+    delta = lists.mark_present('A', '04A1', 'Asha', '09:00:00')
+    assert delta['name'] == 'Asha' and delta['roll_no'] == '1'
+    assert (delta['present'], delta['absent']) == (1, 1)
+    assert lists.mark_present('A', '04a1', 'Asha', '09:00:05') is None
+    delta = lists.mark_absent('A', '04A1')
+    assert delta['name'] == 'Asha' and delta['present'] == 0
+    assert lists.mark_absent('A', '04A1') is None
+    assert store.loads == 1
+
+def test_mark_present_after_invalidate_returns_reset():
+    """A tap already in the store when the section reloads is not lost."""
+    store = FakeStore()
+    lists = SessionLists(store)
+    lists.snapshot('A')
+    lists.invalidate('A')
+    # The caller logs the tap before telling SessionLists about it
+    store.present.append(('Ravi', '09:01:00', '04b2'))
+    result = lists.mark_present('A', '04B2', 'Ravi', '09:01:00')
+    assert result['reset'] and result['section'] == 'A'
+    assert result['present_list'] == [{'name': 'Ravi', 'time': '09:01:00'}]
+    assert [s['name'] for s in result['waiting']] == ['Asha']
+    # Later taps are plain deltas again
+    assert lists.mark_present('A', '04A1', 'Asha', '09:02:00')['present'] == 2
+
+def test_mark_absent_after_invalidate_returns_reset():
+    """A removal written before the reload is reported as full lists."""
+    store = FakeStore()
+    lists = SessionLists(store)
+    lists.mark_present('A', '04A1', 'Asha', '09:00:00')
+    lists.invalidate()
+    result = lists.mark_absent('A', '04A1')
+    assert result['reset'] and result['present'] == 0
+    assert [s['name'] for s in result['waiting']] == ['Asha', 'Ravi']
+
+def test_resync_keys_present_rows_by_uid():
+    """Two students with the same name are told apart after a reload."""
+    store = FakeStore()
+    store.roster.append({'name': 'Asha', 'roll': '3', 'uid': '04C3'})
+    store.present.append(('Asha', '09:00:00', '04c3'))
+    lists = SessionLists(store)
+    snapshot = lists.snapshot('A')
+    assert snapshot['present'] == 1
+    assert [(s['name'], s['roll_no']) for s in snapshot['waiting']] == [('Asha', '1'), ('Ravi', '2')]
+    assert lists.mark_present('A', '04A1', 'Asha', '09:00:05')['present'] == 2
@@ -0,0 +1,101 @@
+"""
+Tests for the SQLite backend against a temporary database.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STUDENTS = [
+    ('Asha', 'EN1', '1', 'A', 'Physics', '04A1'),
+    ('Ravi', 'EN2', '2', 'A', 'Physics', '04B2'),
+    ('Mira', 'EN3', '3', 'B', 'Physics', '04C3'),
+]
+
+def make_db(tmp_path, monkeypatch):
+    """SQLite backend with its database file in a tmp dir."""
+    monkeypatch.chdir(tmp_path)
+    from database import create_database_manager
+    db = create_database_manager('sqlite')
+    for student in STUDENTS:
+        assert db.add_student(*student)
+    return db
+
+def test_incomplete_backend_fails_at_construction():
+    from database.base import DatabaseManager
+
+    class Partial(DatabaseManager):
+        def get_student_by_uid(self, uid):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_add_student_rejects_duplicate_uid_in_any_case(tmp_path, monkeypatch):
+    db = make_db(tmp_path, monkeypatch)
+    assert not db.add_student('Copy', 'EN9', '9', 'A', 'Physics', '04a1')
+    assert db.count_students() == 3
+    assert db.get_student_by_uid('04a1')[0] == 'Asha'
+    assert db.get_student_by_uid('FFFF') is None
+
+def test_add_students_bulk(tmp_path, monkeypatch):
+    db = make_db(tmp_path, monkeypatch)
+    outcomes = db.add_students_bulk([
+        ('Kiran', 'EN4', '4', 'B', 'Physics', '04D4'),
+        ('Copy', 'EN5', '5', 'B', 'Physics', '04a1'),
+    ])
+    assert outcomes == ['added', 'duplicate']
+    assert db.get_student_by_uid('04d4')[0] == 'Kiran'
+    assert [s[0] for s in db.get_students_by_section('b')] == ['Mira', 'Kiran']
+
+def test_log_and_remove_attendance(tmp_path, monkeypatch):
+    db = make_db(tmp_path, monkeypatch)
+    today = db.today()
+    db.log_attendance('04A1')
+    db.log_attendance('04c3')
+    assert {u.upper() for u in db.get_present_uids_today()} == {'04A1', '04C3'}
+    assert db.get_present_uids_today_by_section('a') == {'04A1'}
+    assert db.get_present_list_today_by_section('A')[0][::2] == ('Asha', '04A1')
+    assert db.get_recent_attendance(1)[0][0] == 'Mira'
+
+    assert db.remove_attendance_for_uid('04C3', today)
+    db.attendance_index.invalidate()  # re-read the table, not the cached day
+    assert db.get_present_uids_today() == {'04A1'}
+    assert [s[0] for s in db.get_absent_students(db.get_present_uids_today())] == ['Ravi', 'Mira']
+
+    assert db.clear_attendance_for_date(today)
+    assert db.get_present_uids_today() == set()
+
+def test_today_stats_count_each_student_once(tmp_path, monkeypatch):
+    db = make_db(tmp_path, monkeypatch)
+    db.log_attendance('04A1')
+    db.log_attendance('04a1')
+    db.log_attendance('04B2')
+    assert db.get_today_stats() == (3, 2)
+
+def test_export_students_and_attendance(tmp_path, monkeypatch):
+    pytest.importorskip('openpyxl')
+    import pandas as pd
+    db = make_db(tmp_path, monkeypatch)
+    db.log_attendance('04b2')
+    ok, _ = db.export_students_to_excel('students_out.xlsx')
+    assert ok
+    assert list(pd.read_excel('students_out.xlsx')['Name']) == ['Asha', 'Ravi', 'Mira']
+    ok, _ = db.export_attendance_to_excel('attendance_out.xlsx')
+    assert ok
+    assert list(pd.read_excel('attendance_out.xlsx')['Name']) == ['Ravi']
+
+def test_remove_section_matches_case_insensitively(tmp_path, monkeypatch):
+    db = make_db(tmp_path, monkeypatch)
+    db.log_attendance('04a1')
+    db.log_attendance('04C3')
+    assert db.remove_section('a')
+    assert [s[0] for s in db.get_all_students()] == ['Mira']
+    assert db.get_student_by_uid('04A1') is None
+    db.attendance_index.invalidate()
+    assert db.get_present_uids_today() == {'04C3'}
+    assert db.get_today_stats() == (1, 1)
@@ -0,0 +1,85 @@
+"""
+Tests for report thumbnails: rendered on demand from a photo and written
+at capture time by the webcam.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+Image = pytest.importorskip('PIL.Image')
+
+from utils.photo_index import ensure_thumbnail, thumbnail_path, THUMBNAIL_PROFILES
+
+def write_photo(path, size, color, mtime=None):
+    Image.new('RGB', size, color).save(path, 'JPEG')
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+def test_thumbnail_is_built_and_reused(tmp_path):
+    photo = str(tmp_path / '20260105_090000_000_Asha.jpg')
+    write_photo(photo, (1280, 960), 'red')
+    thumb = ensure_thumbnail(photo, 'small')
+    assert thumb == thumbnail_path(photo, 'small')
+    with Image.open(thumb) as img:
+        assert img.size == THUMBNAIL_PROFILES['small'][:2]
+    mtime = os.stat(photo).st_mtime_ns
+    assert os.stat(thumb).st_mtime_ns == mtime
+    # Same mtime: the thumbnail is current and is not rendered again
+    write_photo(photo, (10, 10), 'red')
+    os.utime(photo, ns=(mtime, mtime))
+    assert ensure_thumbnail(photo, 'small') == thumb
+    with Image.open(thumb) as img:
+        assert img.size == THUMBNAIL_PROFILES['small'][:2]
+
+def test_thumbnail_follows_source_changes(tmp_path):
+    photo = str(tmp_path / '20260105_090000_000_Asha.jpg')
+    write_photo(photo, (1280, 960), 'red', mtime=1_000_000)
+    thumb = ensure_thumbnail(photo, 'pdf')
+    with Image.open(thumb) as img:
+        assert img.size == (320, 240)
+
+    write_photo(photo, (480, 960), 'blue', mtime=2_000_000)
+    assert ensure_thumbnail(photo, 'pdf') == thumb
+    with Image.open(thumb) as img:
+        assert img.size == (120, 240)
+        assert img.getpixel((60, 120))[2] > 200
+
+    # A photo restored with an older mtime is still picked up
+    write_photo(photo, (1280, 640), 'green', mtime=500_000)
+    ensure_thumbnail(photo, 'pdf')
+    with Image.open(thumb) as img:
+        assert img.size == (320, 160)
+
+def test_full_profile_and_broken_photo_fall_back(tmp_path):
+    photo = str(tmp_path / 'broken.jpg')
+    with open(photo, 'wb') as f:
+        f.write(b'not a jpeg')
+    assert ensure_thumbnail(photo, 'full') == photo
+    assert ensure_thumbnail(photo, 'pdf') == photo
+    assert not os.path.exists(thumbnail_path(photo, 'pdf'))
+
+def test_webcam_writes_thumbnail_at_capture(tmp_path, monkeypatch):
+    """The capture-time thumbnail is the one the report then reuses."""
+    np = pytest.importorskip('numpy')
+    pytest.importorskip('cv2')
+    from utils.webcam_capture import WebcamCapture
+    monkeypatch.setattr(WebcamCapture, '_initialize_camera', lambda self: False)
+    webcam = WebcamCapture(storage_dir=str(tmp_path))
+
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    photo = str(tmp_path / '20260105_090000_000_Asha.jpg')
+    write_photo(photo, (640, 480), 'black')
+    thumb = webcam._write_thumbnail(frame, photo, 'small')
+    assert thumb == thumbnail_path(photo, 'small')
+    with Image.open(thumb) as img:
+        assert img.size == (160, 120)
+    assert webcam._write_thumbnail(frame, photo, 'full') is None
+
+    # Stamped with the photo's mtime, so the report does not render it again
+    assert os.stat(thumb).st_mtime_ns == os.stat(photo).st_mtime_ns
+    assert ensure_thumbnail(photo, 'small') == thumb
@@ -0,0 +1,58 @@
+"""
+Tests for the GET UID helper that remembers the working APDU per reader.
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nfc.uid_reader import UIDReader, GET_UID_COMMANDS
+
+class FakeConnection:
+    """Card that only answers one of the GET UID commands."""
+
+    def __init__(self, working_cmd, atr=(0x3B, 0x8F)):
+        self.working_cmd = working_cmd
+        self.atr = list(atr)
+        self.sent = []
+
+    def getATR(self):
+        return self.atr
+
+    def transmit(self, cmd):
+        self.sent.append(cmd)
+        if cmd == self.working_cmd:
+            return [0x04, 0xA1, 0xB2, 0xC3], 0x90, 0x00
+        return [], 0x6A, 0x81
+
+def test_working_command_tried_first_next_time():
+    """After one success the same reader/ATR goes straight to that APDU."""
+    reader = UIDReader()
+    working = GET_UID_COMMANDS[2]
+    first = FakeConnection(working)
+    assert reader.read_uid(first, "Reader 0") == "04A1B2C3"
+    assert len(first.sent) == 3
+
+    second = FakeConnection(working)
+    assert reader.read_uid(second, "Reader 0") == "04A1B2C3"
+    assert second.sent == [working]
+
+    stats = reader.stats()
+    assert stats['commands'][2]['successes'] == 2
+    assert stats['commands'][0]['attempts'] == 1
+    assert len(stats['preferred']) == 1
+
+def test_preference_is_per_reader():
+    """A different reader does not inherit another reader's preference."""
+    reader = UIDReader()
+    reader.read_uid(FakeConnection(GET_UID_COMMANDS[2]), "Reader 0")
+    other = FakeConnection(GET_UID_COMMANDS[0])
+    assert reader.read_uid(other, "Reader 1") == "04A1B2C3"
+    assert other.sent == [GET_UID_COMMANDS[0]]
+
+def test_no_uid_returns_none():
+    """A card rejecting every command yields None."""
+    reader = UIDReader()
+    assert reader.read_uid(FakeConnection(None), "Reader 0") is None
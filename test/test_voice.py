@@ -0,0 +1,198 @@
+"""
+Tests for the voice worker queue and the rendered prompt cache, driven by a
+fake TTS engine.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('pyttsx3')
+
+from models import voice
+from models.voice import VoiceEngine, VoiceQueue, PromptCache
+
+class FakeEngine:
+    """Records speech; optionally blocks in runAndWait until released."""
+    def __init__(self, block=False, synthesize=True):
+        self.said = []
+        self.saved = []
+        self.synthesize = synthesize
+        self.speaking = threading.Event()
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def say(self, text):
+        self.said.append(text)
+
+    def save_to_file(self, text, path):
+        self.saved.append(text)
+        if self.synthesize:
+            with open(path, 'wb') as f:
+                f.write(b'RIFF')
+
+    def runAndWait(self):
+        self.speaking.set()
+        assert self.release.wait(5)
+
+@pytest.fixture
+def engine(monkeypatch):
+    fake = FakeEngine(block=True)
+    monkeypatch.setattr(VoiceEngine, '_engine', fake)
+    return fake
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+def test_burst_speaks_latest_name(engine):
+    """Queued messages with the same prefix replace each other in place."""
+    queue = VoiceQueue(maxsize=4)
+    queue.put("Welcome Asha")
+    assert engine.speaking.wait(5)
+    queue.put("Welcome Ravi")
+    queue.put("Already scanned Asha")
+    queue.put("Welcome Mira")
+    assert queue.stats()['pending'] == 2 and queue.stats()['coalesced'] == 1
+    engine.release.set()
+    wait_for(lambda: queue.stats()['spoken'] == 3)
+    assert engine.said == ["Welcome Asha", "Welcome Mira", "Already scanned Asha"]
+
+def test_full_queue_drops_oldest(engine):
+    queue = VoiceQueue(maxsize=2)
+    queue.put("Welcome Asha")
+    assert engine.speaking.wait(5)
+    for text in ("Session ended", "Unknown card detected. Please register student.", "Welcome Ravi"):
+        queue.put(text)
+    assert queue.stats()['dropped'] == 1
+    engine.release.set()
+    wait_for(lambda: queue.stats()['spoken'] == 3)
+    assert engine.said[1:] == ["Unknown card detected. Please register student.", "Welcome Ravi"]
+
+def test_worker_survives_engine_errors(monkeypatch):
+    class BrokenEngine(FakeEngine):
+        def say(self, text):
+            if text == "Welcome Asha":
+                raise RuntimeError("driver crashed")
+            super().say(text)
+
+    fake = BrokenEngine()
+    monkeypatch.setattr(VoiceEngine, '_engine', fake)
+    queue = VoiceQueue()
+    queue.put("Welcome Asha")
+    queue.put("Session ended")
+    wait_for(lambda: fake.said == ["Session ended"])
+
+def test_voice_feedback_does_not_wait_for_speech(engine, monkeypatch):
+    """Callers return at once even while the engine is busy speaking."""
+    queue = VoiceQueue()
+    monkeypatch.setattr(voice, 'voice_queue', queue)
+    monkeypatch.setattr(voice.Config, 'VOICE_ENABLED', True)
+    voice.voice_feedback("Welcome Asha")
+    assert engine.speaking.wait(5)
+    started = time.monotonic()
+    voice.voice_feedback("Welcome Ravi")
+    assert time.monotonic() - started < 0.5
+    assert queue.stats()['pending'] == 1
+    engine.release.set()
+    wait_for(lambda: queue.stats()['spoken'] == 2)
+
+def test_voice_disabled_queues_nothing(engine, monkeypatch):
+    queue = VoiceQueue()
+    monkeypatch.setattr(voice, 'voice_queue', queue)
+    monkeypatch.setattr(voice.Config, 'VOICE_ENABLED', False)
+    voice.voice_feedback("Welcome Asha")
+    voice.warm_voice_cache()
+    assert queue.stats()['pending'] == 0 and queue._thread is None
+
+def test_cache_key_includes_rate_and_volume(tmp_path, monkeypatch):
+    cache = PromptCache(str(tmp_path))
+    path = cache.path_for("Session ended")
+    assert path == cache.path_for("Session ended")
+    assert path != cache.path_for("Session started. Ready for scanning.")
+    monkeypatch.setattr(VoiceEngine, 'RATE', VoiceEngine.RATE + 10)
+    assert cache.path_for("Session ended") != path
+    monkeypatch.setattr(VoiceEngine, 'RATE', VoiceEngine.RATE - 10)
+    monkeypatch.setattr(VoiceEngine, 'VOLUME', 0.5)
+    assert cache.path_for("Session ended") != path
+
+def test_render_once_and_replay(tmp_path, monkeypatch):
+    """Warmed prompts are rendered once and then played from disk."""
+    fake = FakeEngine()
+    monkeypatch.setattr(VoiceEngine, '_engine', fake)
+    played = []
+    monkeypatch.setattr(voice, 'play_wav', lambda path: played.append(path) or True)
+    cache = PromptCache(str(tmp_path))
+    queue = VoiceQueue(prompt_cache=cache)
+    queue.warm(("Session ended",))
+    wait_for(lambda: cache.get("Session ended"))
+    assert cache.render(fake, "Session ended") == cache.get("Session ended")
+    assert fake.saved == ["Session ended"]
+    queue.warm(("Session ended",))
+    queue.put("Session ended")
+    wait_for(lambda: queue.stats()['spoken'] == 1)
+    assert played == [cache.get("Session ended")] and fake.said == []
+    assert fake.saved == ["Session ended"]
+
+def test_failed_synthesis_falls_back_to_live_speech(tmp_path, monkeypatch):
+    """A prompt that could not be rendered or played is spoken directly."""
+    fake = FakeEngine(synthesize=False)
+    monkeypatch.setattr(VoiceEngine, '_engine', fake)
+    cache = PromptCache(str(tmp_path))
+    assert cache.render(fake, "Session ended") is None
+    assert cache.get("Session ended") is None
+
+    queue = VoiceQueue(prompt_cache=cache)
+    queue.put("Session ended")
+    wait_for(lambda: queue.stats()['spoken'] == 1)
+    assert fake.said == ["Session ended"]
+
+    # A clip that exists but cannot be played also falls back
+    with open(cache.path_for("Session ended"), 'wb') as f:
+        f.write(b'RIFF')
+    monkeypatch.setattr(voice, 'play_wav', lambda path: False)
+    queue.put("Session ended")
+    wait_for(lambda: queue.stats()['spoken'] == 2)
+    assert fake.said == ["Session ended", "Session ended"]
+
+def test_speech_goes_before_cache_warming(engine, tmp_path):
+    """Warming waits behind pending speech and skips prompts already cached."""
+    cache = PromptCache(str(tmp_path))
+    with open(cache.path_for("Session ended"), 'wb') as f:
+        f.write(b'RIFF')
+    queue = VoiceQueue(prompt_cache=cache)
+    queue.put("Welcome Asha")
+    assert engine.speaking.wait(5)
+    queue.warm(("Session ended", "Unknown card detected. Please register student."))
+    queue.put("Welcome Ravi")
+    assert list(queue._renders) == ["Unknown card detected. Please register student."]
+    engine.release.set()
+    wait_for(lambda: engine.saved)
+    assert engine.said == ["Welcome Asha", "Welcome Ravi"]
+    assert engine.saved == ["Unknown card detected. Please register student."]
+
+def test_play_wav_uses_platform_player(monkeypatch):
+    monkeypatch.setattr(voice.platform, 'system', lambda: 'Linux')
+    monkeypatch.setattr(voice.shutil, 'which', lambda name: None)
+    assert voice.play_wav('prompt.wav') is False
+
+    calls = []
+
+    class Done:
+        returncode = 0
+
+    monkeypatch.setattr(voice.shutil, 'which', lambda name: '/usr/bin/' + name)
+    monkeypatch.setattr(voice.subprocess, 'run', lambda args, **kw: calls.append(args) or Done())
+    assert voice.play_wav('prompt.wav') is True
+    monkeypatch.setattr(voice.platform, 'system', lambda: 'Darwin')
+    assert voice.play_wav('prompt.wav') is True
+    assert calls == [['aplay', 'prompt.wav'], ['afplay', 'prompt.wav']]
@@ -0,0 +1,158 @@
+# utils/emitter.py - Socket.IO emit layer that only sends state changes
+import heapq
+import itertools
+import threading
+import time
+
+def _spawn_daemon(target):
+    thread = threading.Thread(target=target, daemon=True, name="emit-flusher")
+    thread.start()
+    return thread
+
+class Emitter:
+    """Wraps a `send(event, data, room)` function.
+
+    State is kept per (event, room), so each room has its own last payload,
+    interval and pending burst. `emit` drops a payload identical to the
+    last one sent for the same event and room and, given `min_interval`,
+    sends at most one message per interval: the newest payload goes out
+    when the interval ends.
+    `emit_coalesced` merges every call within `window` into a single
+    message whose payload is produced once, when the window closes.
+
+    Delayed sends are made by one flusher, started on first use with
+    `spawn(target)` (a daemon thread, or e.g. socketio.start_background_task),
+    which sleeps on a condition until the earliest pending deadline.
+    """
+
+    def __init__(self, send, clock=time.monotonic, spawn=_spawn_daemon):
+        self.send = send
+        self.clock = clock
+        self.spawn = spawn
+        self.lock = threading.Lock()
+        self._wakeup = threading.Condition(self.lock)
+        self._deadlines = []      # heap of (deadline, seq, key), one per pending key
+        self._seq = itertools.count()
+        self._flusher_started = False
+        self._last_payload = {}   # (event, room) -> last payload sent
+        self._last_sent = {}      # (event, room) -> clock() of last send
+        self._pending = {}        # (event, room) -> producer of the payload to send
+        self._stats = {}          # event -> {'sent', 'suppressed', 'coalesced'}
+
+    @staticmethod
+    def _key(event, room):
+        return (event, tuple(room) if isinstance(room, (list, tuple)) else room)
+
+    def _count(self, key, stat):
+        event = key[0]
+        stats = self._stats.setdefault(event, {'sent': 0, 'suppressed': 0, 'coalesced': 0})
+        stats[stat] += 1
+
+    def _schedule(self, key, producer, delay):
+        """Queue producer as the payload for key; caller holds self.lock"""
+        first = key not in self._pending
+        self._pending[key] = producer
+        if first:
+            heapq.heappush(self._deadlines, (self.clock() + max(0.0, delay), next(self._seq), key))
+            if not self._flusher_started:
+                self._flusher_started = True
+                self.spawn(self._run)
+            self._wakeup.notify()
+        else:
+            self._count(key, 'coalesced')
+
+    def _due(self):
+        """Pop the keys whose deadline has passed; caller holds self.lock"""
+        now = self.clock()
+        keys = []
+        while self._deadlines and self._deadlines[0][0] <= now:
+            keys.append(heapq.heappop(self._deadlines)[2])
+        return keys
+
+    def flush_due(self):
+        """Send every pending message whose deadline has passed"""
+        with self.lock:
+            keys = self._due()
+        for key in keys:
+            self._flush(key)
+
+    def _run(self):
+        """Flusher loop: sleep until the earliest deadline, then send what is due"""
+        while True:
+            with self.lock:
+                keys = self._due()
+                while not keys:
+                    timeout = self._deadlines[0][0] - self.clock() if self._deadlines else None
+                    self._wakeup.wait(timeout)
+                    keys = self._due()
+            for key in keys:
+                try:
+                    self._flush(key)
+                except Exception as e:
+                    print(f"[DEBUG] Delayed emit of {key[0]} failed: {e}")
+
+    def _accept(self, key, data, dedupe):
+        """Record a send, or return False for a repeat; caller holds self.lock"""
+        if dedupe and key in self._last_payload and self._last_payload[key] == data:
+            self._count(key, 'suppressed')
+            return False
+        self._last_payload[key] = data
+        self._last_sent[key] = self.clock()
+        self._count(key, 'sent')
+        return True
+
+    def emit(self, event, data, room=None, min_interval=0.0, dedupe=True):
+        """Send data unless it repeats the last payload or is rate limited"""
+        key = self._key(event, room)
+        with self.lock:
+            if key in self._pending:
+                # A rate-limited send is already scheduled; it takes the newest payload
+                self._schedule(key, lambda: data, 0)
+                return False
+            wait = self._last_sent.get(key, float('-inf')) + min_interval - self.clock()
+            if wait > 0:
+                if not (dedupe and self._last_payload.get(key) == data):
+                    self._schedule(key, lambda: data, wait)
+                else:
+                    self._count(key, 'suppressed')
+                return False
+            if not self._accept(key, data, dedupe):
+                return False
+        self.send(event, data, room)
+        return True
+
+    def emit_coalesced(self, event, producer, window, room=None, dedupe=True):
+        """Send producer() once, `window` seconds after the first call of a burst"""
+        with self.lock:
+            self._schedule(self._key(event, room), (producer, dedupe), window)
+
+    def _flush(self, key):
+        with self.lock:
+            producer = self._pending.pop(key, None)
+        if producer is None:
+            return
+        dedupe = True
+        if isinstance(producer, tuple):
+            producer, dedupe = producer
+        event, room = key
+        try:
+            data = producer()
+        except Exception as e:
+            print(f"[DEBUG] Emit producer for {event} failed: {e}")
+            return
+        with self.lock:
+            if not self._accept(key, data, dedupe):
+                return
+        self.send(event, data, list(room) if isinstance(room, tuple) else room)
+
+    def forget(self, event=None, room=None):
+        """Allow the next payload of event (or of every event) through even if unchanged"""
+        with self.lock:
+            if event is None:
+                self._last_payload.clear()
+            else:
+                self._last_payload.pop(self._key(event, room), None)
+
+    def stats(self):
+        with self.lock:
+            return {event: dict(stats) for event, stats in self._stats.items()}
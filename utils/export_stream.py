@@ -0,0 +1,48 @@
+# utils/export_stream.py - Incremental CSV / Excel writers for HTTP exports
+import csv
+import io
+import tempfile
+
+STUDENT_EXPORT_HEADER = ['Name', 'Enrollment No', 'Roll No', 'Section', 'Subject', 'NFC UID']
+ATTENDANCE_EXPORT_HEADER = ['Name', 'Enrollment No', 'Roll No', 'Section', 'Subject', 'Time', 'Date']
+
+CSV_MIMETYPE = 'text/csv; charset=utf-8'
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+def csv_chunks(header, row_chunks):
+    """Yield CSV text one chunk of rows at a time"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    # BOM so Excel opens UTF-8 names correctly
+    buf.write('\ufeff')
+    writer.writerow(header)
+    for rows in row_chunks:
+        writer.writerows(rows)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+def xlsx_chunks(header, row_chunks, sheet_name, block_size=64 * 1024):
+    """Yield an .xlsx file in blocks.
+
+    Rows go into an openpyxl write-only sheet, which spools them to disk,
+    so memory does not grow with the row count. The zip container can only
+    be assembled at the end, so the first block is sent after the last row.
+    """
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    ws.append(header)
+    for rows in row_chunks:
+        for row in rows:
+            ws.append(list(row))
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while True:
+            block = tmp.read(block_size)
+            if not block:
+                break
+            yield block
@@ -0,0 +1,82 @@
+# utils/jobs.py - Background job executor with pollable job status
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+class JobQueue:
+    """Runs functions on a worker thread pool and tracks them by job ID.
+
+    Threads, not processes: a spawned worker re-imports the app module
+    and rebuilds its singletons (database, journal compactor, reader
+    threads), and a forked one inherits them mid-flight. Report jobs are
+    rare, so a small thread pool is enough to keep them off request
+    threads. `on_done(job)` runs on the worker thread once a job finishes.
+    """
+
+    MAX_FINISHED = 200
+
+    def __init__(self, workers=2):
+        self.workers = workers
+        self.lock = threading.Lock()
+        self._executor = None
+        self._jobs = {}
+        self._futures = {}
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        return self._executor
+
+    def submit(self, kind, fn, *args, on_done=None, **meta):
+        """Queue fn(*args); returns the job ID"""
+        job_id = uuid.uuid4().hex[:12]
+        job = {'id': job_id, 'kind': kind, 'status': 'queued', 'result': None,
+               'error': None, 'created': time.time(), 'finished': None}
+        job.update(meta)
+        with self.lock:
+            self._jobs[job_id] = job
+            self._prune()
+            future = self._get_executor().submit(fn, *args)
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f: self._finish(job_id, f, on_done))
+        return job_id
+
+    def _finish(self, job_id, future, on_done):
+        with self.lock:
+            job = self._jobs.get(job_id)
+            self._futures.pop(job_id, None)
+            if job is None:
+                return
+            try:
+                job['result'] = future.result()
+                job['status'] = 'done'
+            except Exception as e:
+                job['error'] = str(e)
+                job['status'] = 'failed'
+            job['finished'] = time.time()
+            snapshot = dict(job)
+        if on_done:
+            try:
+                on_done(snapshot)
+            except Exception as e:
+                print(f"[DEBUG] Job callback error for {job_id}: {e}")
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j['finished']]
+        if len(finished) > self.MAX_FINISHED:
+            finished.sort(key=lambda j: j['finished'])
+            for job in finished[:len(finished) - self.MAX_FINISHED]:
+                del self._jobs[job['id']]
+
+    def get(self, job_id):
+        """Snapshot of a job, or None if unknown"""
+        with self.lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+            future = self._futures.get(job_id)
+        if job['status'] == 'queued' and future is not None and future.running():
+            job['status'] = 'running'
+        return job
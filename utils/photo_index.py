@@ -0,0 +1,123 @@
+# utils/photo_index.py - Latest attendance photo per student
+import os
+import threading
+
+# Thumbnail profiles: (max width, max height, JPEG quality). "full" embeds
+# the original capture.
+THUMBNAIL_PROFILES = {
+    'small': (160, 120, 60),
+    'pdf': (320, 240, 70),
+    'print': (640, 480, 85),
+}
+
+def thumbnail_path(photo_path, profile='pdf'):
+    """Where the thumbnail of a photo is cached: <folder>/thumbs/<profile>/<name>"""
+    folder, name = os.path.split(photo_path)
+    return os.path.join(folder, 'thumbs', profile, name)
+
+def stamp_thumbnail(photo_path, thumb):
+    """Give a thumbnail its photo's mtime, which marks it as current"""
+    mtime = os.stat(photo_path).st_mtime_ns
+    os.utime(thumb, ns=(mtime, mtime))
+
+def ensure_thumbnail(photo_path, profile='pdf'):
+    """Path of a photo's thumbnail, rendering it with Pillow if missing or
+    stale. Falls back to the photo itself for "full" or on error."""
+    if profile not in THUMBNAIL_PROFILES:
+        return photo_path
+    thumb = thumbnail_path(photo_path, profile)
+    try:
+        # Any change of the photo's mtime, even backwards, means re-render
+        if os.stat(thumb).st_mtime_ns == os.stat(photo_path).st_mtime_ns:
+            return thumb
+    except OSError:
+        pass
+    try:
+        from PIL import Image
+        width, height, quality = THUMBNAIL_PROFILES[profile]
+        os.makedirs(os.path.dirname(thumb), exist_ok=True)
+        tmp = thumb + '.tmp'
+        with Image.open(photo_path) as img:
+            img.thumbnail((width, height))
+            img.convert('RGB').save(tmp, 'JPEG', quality=quality, optimize=True)
+        stamp_thumbnail(photo_path, tmp)
+        os.replace(tmp, thumb)
+        return thumb
+    except Exception as e:
+        print(f"[WARN] Could not create thumbnail for {photo_path}: {e}")
+        return photo_path
+
+def photo_key(student_name):
+    """Filename-safe form of a student name, as used in photo filenames"""
+    safe_name = "".join(c if c.isalnum() or c in ' -_' else '' for c in str(student_name or ''))
+    return safe_name.replace(" ", "_")[:20]
+
+class PhotoIndex:
+    """Maps photo_key(name) -> newest photo filename in one photo folder.
+
+    Photo filenames are "<YYYYmmdd>_<HHMMSS>_<ms>_<key>.jpg", so the newest
+    photo of a key is the one with the greatest filename. The index is built
+    from a single directory listing and then updated by `add` on capture.
+    """
+
+    def __init__(self, storage_dir):
+        self.storage_dir = storage_dir
+        self.lock = threading.Lock()
+        self._latest = None
+
+    @staticmethod
+    def _parse(filename):
+        if not filename.lower().endswith('.jpg'):
+            return None
+        parts = filename[:-4].split('_', 3)
+        return parts[3].upper() if len(parts) == 4 and parts[3] else None
+
+    def rebuild(self):
+        """Re-scan the photo folder"""
+        latest = {}
+        try:
+            names = os.listdir(self.storage_dir)
+        except OSError:
+            names = []
+        for filename in names:
+            key = self._parse(filename)
+            if key and filename > latest.get(key, ''):
+                latest[key] = filename
+        with self.lock:
+            self._latest = latest
+        return len(latest)
+
+    def _ensure_built(self):
+        if self._latest is None:
+            self.rebuild()
+
+    def add(self, filename):
+        """Record a photo just written to the folder"""
+        key = self._parse(filename)
+        if not key:
+            return
+        self._ensure_built()
+        with self.lock:
+            if filename > self._latest.get(key, ''):
+                self._latest[key] = filename
+
+    def latest(self, student_name):
+        """Path of the newest photo of a student, or None"""
+        self._ensure_built()
+        with self.lock:
+            filename = self._latest.get(photo_key(student_name).upper())
+        if not filename:
+            return None
+        path = os.path.join(self.storage_dir, filename)
+        return path if os.path.exists(path) else None
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_photo_index(storage_dir="static/photos"):
+    """Shared PhotoIndex for a photo folder"""
+    with _indexes_lock:
+        index = _indexes.get(storage_dir)
+        if index is None:
+            index = _indexes[storage_dir] = PhotoIndex(storage_dir)
+        return index
@@ -0,0 +1,157 @@
+# utils/report_pdf.py - Session report PDF (runs on the report job threads)
+from config import Config
+from utils.photo_index import PhotoIndex, ensure_thumbnail
+
+def generate_session_pdf(session_data, present_students, absent_students, filename, photo_paths=None,
+                         thumbnail_profile=None):
+    """Generate a professional PDF report with student photos.
+
+    photo_paths maps student name -> photo path; when omitted the photo
+    folder is indexed once for the whole report. Photos are embedded as
+    thumbnails of thumbnail_profile (Config.PHOTO_THUMBNAIL_PROFILE).
+    """
+    try:
+        from reportlab.lib.pagesizes import letter, A4
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+        from datetime import datetime
+        
+        doc = SimpleDocTemplate(filename, pagesize=letter,
+                               rightMargin=0.5*inch, leftMargin=0.5*inch,
+                               topMargin=0.5*inch, bottomMargin=0.5*inch)
+        
+        elements = []
+        styles = getSampleStyleSheet()
+        
+        # Title
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#0066cc'),
+            spaceAfter=6,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        )
+        elements.append(Paragraph('NFC ATTENDANCE SYSTEM - SESSION REPORT', title_style))
+        elements.append(Spacer(1, 0.2*inch))
+        
+        # Session Info
+        info_style = ParagraphStyle(
+            'InfoStyle',
+            parent=styles['Normal'],
+            fontSize=11,
+            alignment=TA_LEFT
+        )
+        
+        session_info = f"""<b>Session Details:</b><br/>
+        <b>Section:</b> {session_data.get('section', 'N/A')}<br/>
+        <b>Subject:</b> {session_data.get('subject', 'N/A')}<br/>
+        <b>Start Time:</b> {session_data.get('start_time', 'N/A')}<br/>
+        <b>End Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br/>
+        <b>Report Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        """
+        elements.append(Paragraph(session_info, info_style))
+        elements.append(Spacer(1, 0.2*inch))
+        
+        # Statistics
+        total = len(present_students) + len(absent_students)
+        attendance_rate = (len(present_students) / total * 100) if total > 0 else 0
+        
+        stats_text = f"""<b>Attendance Statistics:</b><br/>
+        <b>Total Students:</b> {total}<br/>
+        <b>Present:</b> {len(present_students)} ({attendance_rate:.1f}%)<br/>
+        <b>Absent:</b> {len(absent_students)} ({100-attendance_rate:.1f}%)
+        """
+        elements.append(Paragraph(stats_text, info_style))
+        elements.append(Spacer(1, 0.3*inch))
+        
+        # Present Students with Photos
+        if photo_paths is None:
+            index = PhotoIndex('static/photos')
+            photo_paths = {s[0]: index.latest(s[0]) for s in present_students}
+        profile = thumbnail_profile or Config.PHOTO_THUMBNAIL_PROFILE
+        elements.append(Paragraph('<b>PRESENT STUDENTS</b>', styles['Heading2']))
+        if present_students:
+            for idx, student in enumerate(present_students):
+                # Student name and info
+                student_name = student[0]
+                student_enroll = student[1]
+                student_roll = student[2]
+                
+                student_info = f"<b>{idx + 1}. {student_name}</b><br/>Enrollment: {student_enroll} | Roll: {student_roll}"
+                
+                # Add the student's most recent photo, if any
+                photo_found = False
+                photo_path = photo_paths.get(student_name)
+                if photo_path:
+                    try:
+                        photo_img = Image(ensure_thumbnail(photo_path, profile), width=1.5*inch, height=1.125*inch)
+                        
+                        # Create table with info and photo
+                        photo_table = Table([
+                            [Paragraph(student_info, info_style), photo_img]
+                        ], colWidths=[2.5*inch, 1.8*inch])
+                        photo_table.setStyle(TableStyle([
+                            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                            ('LEFTPADDING', (0, 0), (0, 0), 10),
+                            ('RIGHTPADDING', (1, 0), (1, 0), 10),
+                            ('BORDER', (0, 0), (-1, -1), 1, colors.grey)
+                        ]))
+                        elements.append(photo_table)
+                        elements.append(Spacer(1, 0.15*inch))
+                        photo_found = True
+                    except Exception as e:
+                        print(f"[WARN] Could not add photo for {student_name}: {e}")
+                
+                # If no photo found, just add student info
+                if not photo_found:
+                    elements.append(Paragraph(student_info, info_style))
+                    elements.append(Spacer(1, 0.15*inch))
+                
+                # Add page break if too many students
+                if (idx + 1) % 5 == 0 and idx + 1 < len(present_students):
+                    elements.append(PageBreak())
+                    elements.append(Paragraph('<b>PRESENT STUDENTS (Continued)</b>', styles['Heading2']))
+                    elements.append(Spacer(1, 0.2*inch))
+        else:
+            elements.append(Paragraph('<i>No students present</i>', styles['Normal']))
+        
+        elements.append(Spacer(1, 0.3*inch))
+        
+        # Add new page for absent students
+        if absent_students:
+            elements.append(PageBreak())
+        
+        # Absent Students Table
+        elements.append(Paragraph('<b>ABSENT STUDENTS</b>', styles['Heading2']))
+        if absent_students:
+            absent_data = [['#', 'Name', 'Enrollment No', 'Roll No']]
+            for i, student in enumerate(absent_students, 1):
+                absent_data.append([str(i), student[0], student[1], student[2]])
+            
+            absent_table = Table(absent_data, colWidths=[0.5*inch, 2.5*inch, 1.5*inch, 0.8*inch])
+            absent_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#cc0000')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.lightcoral),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ffe6e6')])
+            ]))
+            elements.append(absent_table)
+        else:
+            elements.append(Paragraph('<i>All students present</i>', styles['Normal']))
+        
+        # Build PDF
+        doc.build(elements)
+        return True
+    except Exception as e:
+        print(f"[ERROR] PDF generation failed: {e}")
+        return False
@@ -10,6 +10,9 @@ from typing import Optional, Tuple
 import threading
 import time
 
+from config import Config
+from utils.photo_index import get_photo_index, photo_key, stamp_thumbnail, thumbnail_path, THUMBNAIL_PROFILES
+
 try:
     import cv2
     OPENCV_AVAILABLE = True
@@ -39,6 +42,9 @@ class WebcamCapture:
         # Create storage directory
         os.makedirs(storage_dir, exist_ok=True)
         
+        # Latest photo per student, used by the session report
+        self.photo_index = get_photo_index(storage_dir)
+        
         # Try to initialize camera
         self._initialize_camera()
     
@@ -119,8 +125,7 @@ class WebcamCapture:
         try:
             # Create filename with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
-            safe_name = "".join(c if c.isalnum() or c in ' -_' else '' for c in student_name)
-            safe_name = safe_name.replace(" ", "_")[:20]  # Limit name length
+            safe_name = photo_key(student_name)  # Filename-safe, length limited
             
             filename = f"{timestamp}_{safe_name}.jpg"
             filepath = os.path.join(self.storage_dir, filename)
@@ -142,6 +147,8 @@ class WebcamCapture:
             
             if success:
                 self.last_photo_path = filepath
+                self._write_thumbnail(frame, filepath)
+                self.photo_index.add(filename)
                 file_size = os.path.getsize(filepath) / 1024  # KB
                 print(f"[INFO] Photo captured: {filename} ({file_size:.1f} KB)")
                 return filename
@@ -153,6 +160,35 @@ class WebcamCapture:
             print(f"[ERROR] Photo capture failed: {e}")
             return None
     
+    def _write_thumbnail(self, frame, filepath: str, profile: Optional[str] = None) -> Optional[str]:
+        """
+        Save a downsized copy of a captured frame for reports.
+        
+        Args:
+            frame: Frame that was just saved to filepath
+            filepath: Path of the full-size photo
+            profile: Thumbnail profile (defaults to Config.PHOTO_THUMBNAIL_PROFILE)
+            
+        Returns:
+            Thumbnail path, or None if no thumbnail was written
+        """
+        profile = profile or Config.PHOTO_THUMBNAIL_PROFILE
+        if profile not in THUMBNAIL_PROFILES:
+            return None
+        try:
+            max_w, max_h, quality = THUMBNAIL_PROFILES[profile]
+            h, w = frame.shape[:2]
+            scale = min(max_w / w, max_h / h, 1.0)
+            thumb = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+            thumb_path = thumbnail_path(filepath, profile)
+            os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+            if cv2.imwrite(thumb_path, thumb, [cv2.IMWRITE_JPEG_QUALITY, quality]):
+                stamp_thumbnail(filepath, thumb_path)
+                return thumb_path
+        except Exception as e:
+            print(f"[WARN] Thumbnail failed: {e}")
+        return None
+    
     def get_current_frame_base64(self) -> Optional[str]:
         """
         Get current frame as base64 for streaming to web.
@@ -206,9 +242,14 @@ class WebcamCapture:
                     filepath = os.path.join(self.storage_dir, filename)
                     os.remove(filepath)
                     deleted += 1
+                    for profile in THUMBNAIL_PROFILES:
+                        thumb = thumbnail_path(filepath, profile)
+                        if os.path.exists(thumb):
+                            os.remove(thumb)
                 except Exception as e:
                     print(f"[WARN] Could not delete {filename}: {e}")
             
+            self.photo_index.rebuild()
             print(f"[INFO] Cleaned up {deleted} old photos")
             return deleted
             